@@ -1,11 +1,26 @@
+import logging
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 import google.generativeai as genai
-from typing import List, Dict, Optional
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+INITIAL_MESSAGE_FALLBACK = "Hello! I'm your physics tutor. Let's work through this problem together. To start, can you tell me: What is this problem asking you to find?"
+RESPONSE_FALLBACK = "I'm having trouble connecting right now. Let me try to help: Could you explain your thinking so far?"
+HINT_FALLBACKS = {
+    1: "💡 **Hint 1:** Think about what physical principles or laws apply to this situation.",
+    2: "💡 **Hint 2:** Consider what quantities are conserved or what equations relate the given variables.",
+    3: "💡 **Hint 3:** Look at the given information - which formula connects these quantities?"
+}
+SOLUTION_UNAVAILABLE = "I'm having trouble generating the solution right now. Please try again or ask your teacher for help."
+
 class PhysicsAITutor:
     """Socratic AI tutor for JEE Physics using Google Gemini"""
 
@@ -56,23 +71,27 @@ Remember: Your goal is to teach THINKING, not just answers!"""
     def get_initial_message(self, problem: Dict) -> str:
         """Generate the first tutoring message based on the problem"""
 
+        try:
+            response = self.model.generate_content(self._initial_prompt(problem))
+            return response.text
+        except Exception as e:
+            return INITIAL_MESSAGE_FALLBACK
+
+    def stream_initial_message(self, problem: Dict) -> Iterator[str]:
+        """get_initial_message as text chunks, yielded as Gemini produces them"""
+        return self._stream_with_fallback(self._initial_prompt(problem), INITIAL_MESSAGE_FALLBACK)
+
+    def _initial_prompt(self, problem: Dict) -> str:
         problem_text = problem.get('text', '')
-        problem_type = problem.get('type', 'numerical')
         topic = problem.get('topic', 'Physics')
 
-        prompt = f"""A student has brought this {topic} problem:
+        return f"""A student has brought this {topic} problem:
 
 "{problem_text}"
 
 This is your first interaction. Greet them warmly and ask your FIRST Socratic question to get them thinking.
 Do NOT solve the problem. Just ask what they understand about what's being asked."""
 
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"Hello! I'm your physics tutor. Let's work through this problem together. To start, can you tell me: What is this problem asking you to find?"
-
     def get_response(self,
                     problem: Dict,
                     conversation_history: List[Dict],
@@ -86,10 +105,16 @@ Do NOT solve the problem. Just ask what they understand about what's being asked
             response = self.model.generate_content(context)
             return response.text
         except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
             logger.error(f"Error generating AI response: {e}", exc_info=True)
-            return f"I'm having trouble connecting right now. Let me try to help: Could you explain your thinking so far?"
+            return RESPONSE_FALLBACK
+
+    def stream_response(self,
+                        problem: Dict,
+                        conversation_history: List[Dict],
+                        user_message: str) -> Iterator[str]:
+        """get_response as text chunks, yielded as Gemini produces them"""
+        context = self._build_context(problem, conversation_history, user_message)
+        return self._stream_with_fallback(context, RESPONSE_FALLBACK)
 
     def get_hint(self,
                 problem: Dict,
@@ -97,6 +122,24 @@ Do NOT solve the problem. Just ask what they understand about what's being asked
                 hint_level: int) -> str:
         """Generate progressive hints"""
 
+        level = min(hint_level, 3)
+        try:
+            response = self.model.generate_content(self._hint_prompt(problem, conversation_history, level))
+            return f"💡 **Hint {level}:** {response.text}"
+        except Exception as e:
+            return HINT_FALLBACKS.get(level, HINT_FALLBACKS[1])
+
+    def stream_hint(self,
+                    problem: Dict,
+                    conversation_history: List[Dict],
+                    hint_level: int) -> Iterator[str]:
+        """get_hint as text chunks, yielded as Gemini produces them"""
+        level = min(hint_level, 3)
+        return self._stream_with_fallback(self._hint_prompt(problem, conversation_history, level),
+                                          HINT_FALLBACKS.get(level, HINT_FALLBACKS[1]),
+                                          prefix=f"💡 **Hint {level}:** ")
+
+    def _hint_prompt(self, problem: Dict, conversation_history: List[Dict], level: int) -> str:
         problem_text = problem.get('text', '')
 
         hint_prompts = {
@@ -105,10 +148,9 @@ Do NOT solve the problem. Just ask what they understand about what's being asked
             3: "Give a DIRECT hint (Level 3) - suggest the exact formula or equation to use, but don't solve."
         }
 
-        level = min(hint_level, 3)
         conversation_context = self._format_conversation(conversation_history)
 
-        prompt = f"""{self.system_prompt}
+        return f"""{self.system_prompt}
 
 PROBLEM:
 {problem_text}
@@ -121,16 +163,31 @@ The student has requested a hint (Level {level}).
 
 Provide the hint in a supportive way that encourages them to keep trying."""
 
+    def _stream(self, prompt: str) -> Iterator[str]:
+        """Text chunks of a streamed Gemini response; raises if the call fails"""
+        for chunk in self.model.generate_content(prompt, stream=True):
+            text = chunk.text
+            if text:
+                yield text
+
+    def _stream_with_fallback(self, prompt: str, fallback: str, prefix: str = "") -> Iterator[str]:
+        """_stream that yields `fallback` instead if Gemini fails before the first chunk.
+
+        A failure after some text was yielded just ends the stream, so the
+        student keeps the partial answer.
+        """
+        started = False
         try:
-            response = self.model.generate_content(prompt)
-            return f"💡 **Hint {level}:** {response.text}"
+            for text in self._stream(prompt):
+                if not started:
+                    started = True
+                    if prefix:
+                        yield prefix
+                yield text
         except Exception as e:
-            fallback_hints = {
-                1: "💡 **Hint 1:** Think about what physical principles or laws apply to this situation.",
-                2: "💡 **Hint 2:** Consider what quantities are conserved or what equations relate the given variables.",
-                3: "💡 **Hint 3:** Look at the given information - which formula connects these quantities?"
-            }
-            return fallback_hints.get(level, fallback_hints[1])
+            logger.error(f"Error streaming AI response: {e}", exc_info=True)
+        if not started:
+            yield fallback
 
     def _build_context(self,
                       problem: Dict,
@@ -184,15 +241,25 @@ YOUR RESPONSE (remember: ask questions, guide thinking, don't solve directly):""
     def generate_solution(self, problem: Dict) -> str:
         """Generate complete solution (only after student has tried)"""
 
-        problem_text = problem.get('text', '')
-        topic = problem.get('topic', 'Physics')
-
         # Check if it's a curated problem with official solution
         if 'official_solution' in problem and not problem.get('user_submitted', False):
             return None  # Will use the pre-written solution from JSON
 
-        # Generate solution for user-submitted questions
-        prompt = f"""{self.system_prompt}
+        try:
+            return self.model.generate_content(self._solution_prompt(problem)).text
+        except Exception as e:
+            return SOLUTION_UNAVAILABLE
+
+    def stream_solution(self, problem: Dict) -> Iterator[str]:
+        """generate_solution as text chunks; yields nothing for curated problems with an official solution"""
+        if 'official_solution' in problem and not problem.get('user_submitted', False):
+            return iter(())
+        return self._stream_with_fallback(self._solution_prompt(problem), SOLUTION_UNAVAILABLE)
+
+    def _solution_prompt(self, problem: Dict) -> str:
+        problem_text = problem.get('text', '')
+
+        return f"""{self.system_prompt}
 
 The student has attempted this problem and is now ready to see the complete solution.
 
@@ -210,11 +277,114 @@ Provide a COMPLETE, STEP-BY-STEP solution including:
 
 Make it educational and clear."""
 
+
+class SolutionMemo:
+    """Generated solutions per problem fingerprint, shared by every session.
+
+    The first request for a problem starts generation on a small thread
+    pool and returns straight away. The solution is streamed, so requests
+    made while it is generated see the text so far. The finished text goes into `cache`
+    (anything with get(key) / put(key, solution) that evicts on its own,
+    e.g. the backend's SolutionCache) so later requests, from any session,
+    get the same solution without another Gemini call. Concurrent requests
+    for a problem share one generation. Failures are not cached; the last
+    `max_failures` are kept until they are reported, and older ones (for
+    problems nobody asked about again) are dropped.
+    """
+
+    def __init__(self, tutor: PhysicsAITutor, cache, key: Callable[[Dict], str], workers: int = 2,
+                 max_failures: int = 256):
+        self.tutor = tutor
+        self.cache = cache
+        self.key = key
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="solution")
+        self._pending: Dict[str, Future] = {}
+        self._partial: Dict[str, List[str]] = {}
+        self._failed: "OrderedDict[str, str]" = OrderedDict()
+        self.max_failures = max_failures
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "generated": 0, "joined": 0, "failures": 0}
+
+    def get(self, problem: Dict) -> Tuple[str, Optional[str]]:
+        """(state, text): ("ready", solution), ("pending", text so far) or ("failed", message).
+
+        "pending" means generation is running (started by this call if
+        needed) and text is None until the first chunk arrives; ask again
+        on a later rerun. A "failed" result is reported
+        once, and the next call retries.
+        """
+        key = self.key(problem)
+        solution = self.cache.get(key)
+        if solution is None:
+            with self._lock:
+                # A generation may have finished since the lookup above: it
+                # caches the text before leaving _pending, so look again
+                # under the lock rather than start it a second time
+                solution = self.cache.get(key)
+                if solution is None:
+                    return self._join_or_start(key, problem)
+        with self._lock:
+            self.stats["hits"] += 1
+        return "ready", solution
+
+    def _join_or_start(self, key: str, problem: Dict) -> Tuple[str, Optional[str]]:
+        """The rest of get() for a cache miss; called with _lock held"""
+        if key in self._failed:
+            return "failed", self._failed.pop(key)
+        if key in self._pending:
+            self.stats["joined"] += 1
+            partial = self._partial.get(key)
+            return "pending", "".join(partial) if partial else None
+        self._partial[key] = []
+        self._pending[key] = self._executor.submit(self._generate, key, problem)
+        return "pending", None
+
+    def progress(self, problem: Dict) -> Tuple[str, Optional[str]]:
+        """Like get(), but only looks: never starts, retries or counts a generation.
+
+        Returns ("idle", None) if nothing is cached or running for the problem.
+        """
+        key = self.key(problem)
+        solution = self.cache.get(key)
+        if solution is not None:
+            return "ready", solution
+        with self._lock:
+            solution = self.cache.get(key)
+            if solution is not None:
+                return "ready", solution
+            if key in self._failed:
+                return "failed", self._failed[key]
+            if key in self._pending:
+                partial = self._partial.get(key)
+                return "pending", "".join(partial) if partial else None
+        return "idle", None
+
+    def _generate(self, key: str, problem: Dict):
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            chunks = self._partial[key]
+            for text in self.tutor._stream(self.tutor._solution_prompt(problem)):
+                chunks.append(text)
+            if not chunks:
+                raise ValueError("empty response")
+            self.cache.put(key, "".join(chunks))
+            with self._lock:
+                self.stats["generated"] += 1
         except Exception as e:
-            return "I'm having trouble generating the solution right now. Please try again or ask your teacher for help."
+            logger.error(f"Error generating solution: {e}", exc_info=True)
+            with self._lock:
+                self._failed[key] = SOLUTION_UNAVAILABLE
+                self._failed.move_to_end(key)
+                while len(self._failed) > self.max_failures:
+                    self._failed.popitem(last=False)
+                self.stats["failures"] += 1
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+                self._partial.pop(key, None)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {"pending": len(self._pending), **self.stats}
 
 
 # Utility function for quick testing
@@ -1,6 +1,6 @@
 import streamlit as st
-from utils import ProblemLoader, format_problem_text, display_options
-from ai_tutor import PhysicsAITutor
+from utils import ProblemLoader, SolutionCache, config, format_problem_text, display_options, solution_cache_key
+from ai_tutor import PhysicsAITutor, SolutionMemo
 import os
 
 # Page configuration
@@ -11,10 +11,38 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Initialize session state
-if 'problem_loader' not in st.session_state:
-    st.session_state.problem_loader = ProblemLoader()
+# Process-wide resources, built once and shared by every browser session.
+# st.cache_resource creates each under a lock; ProblemLoader serves
+# concurrent reads from immutable snapshots and the tutor keeps no
+# per-conversation state, so sessions can use them from their own threads.
+@st.cache_resource(show_spinner="Loading problem bank...")
+def get_problem_loader() -> ProblemLoader:
+    return ProblemLoader()
 
+
+@st.cache_resource
+def get_ai_tutor():
+    """(tutor, None), or (None, error) when the tutor cannot be configured"""
+    try:
+        return PhysicsAITutor(), None
+    except Exception as e:
+        return None, str(e)
+
+
+@st.cache_resource
+def get_solution_memo(_tutor: PhysicsAITutor) -> SolutionMemo:
+    """AI solutions per problem fingerprint, generated once in the background for all sessions"""
+    cache = SolutionCache(memory_size=config.SOLUTION_CACHE_MEMORY_SIZE,
+                          ttl_seconds=config.SOLUTION_CACHE_TTL_SECONDS)
+    return SolutionMemo(_tutor, cache, key=solution_cache_key)
+
+
+problem_loader = get_problem_loader()
+ai_tutor, ai_error = get_ai_tutor()
+solution_memo = get_solution_memo(ai_tutor) if ai_tutor else None
+ai_enabled = ai_tutor is not None
+
+# Per-session state: only this student's question and conversation
 if 'selected_problem' not in st.session_state:
     st.session_state.selected_problem = None
 
@@ -34,15 +62,217 @@ if 'user_question' not in st.session_state:
 if 'question_submitted' not in st.session_state:
     st.session_state.question_submitted = False
 
-# AI Tutor instance
-if 'ai_tutor' not in st.session_state:
-    try:
-        st.session_state.ai_tutor = PhysicsAITutor()
-        st.session_state.ai_enabled = True
-    except Exception as e:
-        st.session_state.ai_tutor = None
-        st.session_state.ai_enabled = False
-        st.session_state.ai_error = str(e)
+# Most recent chat messages rendered as bubbles. Older ones are only
+# rendered on request, so a rerun costs the same however long the chat is.
+CHAT_WINDOW = 20
+
+# How often a solution being generated is redrawn with the text written so far
+SOLUTION_REFRESH_SECONDS = 1
+
+
+@st.cache_data(show_spinner=False)
+def get_sample_topics(limit: int = 5) -> list:
+    """(topic, problem count, first problem id) for the sidebar browser, computed once per process"""
+    loader = get_problem_loader()
+    samples = []
+    for topic in loader.get_all_topics()[:limit]:
+        problems = loader.filter_problems(topic=topic)
+        if problems:
+            samples.append((topic, len(problems), problems[0]['id']))
+    return samples
+
+
+# The page is split into fragments: a widget inside one reruns only that
+# fragment, and st.rerun() is used only when another part of the page must
+# change (a new problem, the solution panel opening, a reset).
+@st.fragment
+def sample_browser():
+    """Sidebar browser of curated sample problems"""
+    total = problem_loader.get_total_count()
+    if total == 0:
+        return
+    st.subheader("📋 Or Try Sample Problems")
+    st.caption(f"{total} curated problems available")
+
+    with st.expander("Browse Sample Problems"):
+        for topic, count, problem_id in get_sample_topics():
+            st.markdown(f"**{topic}** ({count})")
+            if st.button(f"Load {topic} example", key=f"sample_{topic}"):
+                # Listings hold summaries; the solution panels need the full problem
+                st.session_state.selected_problem = problem_loader.get_problem_by_id(problem_id)
+                st.session_state.question_submitted = True
+                st.session_state.show_solution = False
+                st.session_state.chat_messages = []
+                st.session_state.hint_level = 0
+                st.rerun()
+
+
+@st.fragment
+def chat_panel(problem: dict):
+    """Chat history, message input and the hint / solution / reset buttons"""
+    st.header("💬 AI Tutor Chat")
+
+    # Chat interface
+    chat_container = st.container()
+
+    with chat_container:
+        # Check if AI is enabled
+        if not ai_enabled:
+            st.error(f"⚠️ AI Tutor not available: {ai_error or 'API key missing'}")
+            st.info("Please add your GOOGLE_API_KEY to a .env file to enable AI tutoring.")
+            st.code("GOOGLE_API_KEY=your_key_here", language="bash")
+
+        # Display chat messages
+        messages = st.session_state.chat_messages
+        earlier = len(messages) - CHAT_WINDOW
+        if earlier > 0 and st.toggle(f"Show {earlier} earlier messages", key="show_earlier_messages"):
+            for message in messages[:earlier]:
+                with st.chat_message(message["role"]):
+                    st.markdown(message["content"])
+        for message in messages[-CHAT_WINDOW:]:
+            with st.chat_message(message["role"]):
+                st.markdown(message["content"])
+
+        # Initialize chat with AI's first message, streamed as it is written
+        if len(messages) == 0 and ai_enabled:
+            with st.chat_message("assistant"):
+                initial_msg = st.write_stream(ai_tutor.stream_initial_message(problem))
+            st.session_state.chat_messages.append({
+                "role": "assistant",
+                "content": initial_msg
+            })
+
+    # User input
+    user_input = st.chat_input("Type your answer or question here...", disabled=not ai_enabled)
+
+    if user_input and ai_enabled:
+        # Add user message
+        st.session_state.chat_messages.append({
+            "role": "user",
+            "content": user_input
+        })
+
+        # Stream the AI response into the chat as it arrives
+        with chat_container:
+            with st.chat_message("user"):
+                st.markdown(user_input)
+            with st.chat_message("assistant"):
+                ai_response = st.write_stream(ai_tutor.stream_response(
+                    problem=problem,
+                    conversation_history=st.session_state.chat_messages,
+                    user_message=user_input
+                ))
+
+        st.session_state.chat_messages.append({
+            "role": "assistant",
+            "content": ai_response
+        })
+
+        st.rerun(scope="fragment")
+
+    # Action buttons
+    st.markdown("---")
+
+    col_a, col_b, col_c = st.columns(3)
+
+    with col_a:
+        hint_disabled = not ai_enabled or st.session_state.hint_level >= 3
+        if st.button("💡 Request Hint", use_container_width=True, disabled=hint_disabled):
+            if ai_enabled:
+                st.session_state.hint_level += 1
+
+                with chat_container:
+                    with st.chat_message("assistant"):
+                        hint_msg = st.write_stream(ai_tutor.stream_hint(
+                            problem=problem,
+                            conversation_history=st.session_state.chat_messages,
+                            hint_level=st.session_state.hint_level
+                        ))
+
+                st.session_state.chat_messages.append({
+                    "role": "assistant",
+                    "content": hint_msg
+                })
+
+                if st.session_state.hint_level >= 3:
+                    st.session_state.chat_messages.append({
+                        "role": "assistant",
+                        "content": "You've used all 3 hints! Would you like to see the complete solution?"
+                    })
+
+                st.rerun(scope="fragment")
+
+    with col_b:
+        if st.button("📖 Show Solution", use_container_width=True, disabled=st.session_state.show_solution):
+            st.session_state.show_solution = True
+            st.rerun()
+
+    with col_c:
+        if st.button("🔄 Reset Chat", use_container_width=True):
+            st.session_state.chat_messages = []
+            st.session_state.hint_level = 0
+            st.session_state.show_solution = False
+            st.rerun()
+
+
+@st.fragment
+def solution_panel(problem: dict):
+    """The official or AI-generated solution"""
+    st.markdown("---")
+    st.header("✅ Complete Solution")
+
+    # Check if this is a curated problem with official solution
+    if 'official_solution' in problem and not problem.get('user_submitted', False):
+        solution = problem['official_solution']
+
+        if 'steps' in solution:
+            for step in solution['steps']:
+                with st.expander(f"Step {step['step_number']}: {step['description']}", expanded=True):
+                    st.markdown(f"**Formula:** `{step.get('formula', 'N/A')}`")
+                    st.markdown(f"**Calculation:** {step.get('calculation', 'N/A')}")
+                    st.markdown(f"**Explanation:** {step.get('explanation', 'N/A')}")
+                    if 'result' in step:
+                        st.success(f"**Result:** {step['result']}")
+
+        if 'answer_justification' in solution:
+            st.success(f"**Answer:** {solution['answer_justification']}")
+
+        # Common mistakes
+        if 'common_mistakes' in problem:
+            st.markdown("---")
+            st.subheader("⚠️ Common Mistakes to Avoid")
+            for mistake in problem['common_mistakes']:
+                st.warning(f"**Mistake:** {mistake['mistake']}\n\n**Correct Approach:** {mistake['correct_approach']}")
+
+    # Generate solution for user-submitted questions, once per problem
+    # and in the background so the chat stays usable meanwhile
+    elif ai_enabled:
+        state, solution_text = solution_memo.get(problem)
+        if state == "ready":
+            st.markdown(solution_text)
+        elif state == "pending":
+            pending_solution(problem)
+        else:
+            st.warning(solution_text)
+            st.button("🔁 Try again", key="retry_solution")
+    else:
+        st.warning("AI is not enabled. Please add your API key to see AI-generated solutions.")
+
+
+@st.fragment(run_every=SOLUTION_REFRESH_SECONDS)
+def pending_solution(problem: dict):
+    """A solution being generated, redrawn every SOLUTION_REFRESH_SECONDS as it is written.
+
+    Once it is finished (or failed) the page reruns once, so solution_panel
+    shows the result and this polling fragment is no longer rendered.
+    """
+    state, solution_text = solution_memo.progress(problem)
+    if state != "pending":
+        st.rerun()
+    if solution_text:
+        st.markdown(solution_text)
+    st.info("⏳ Writing the complete solution... keep chatting, it appears here as it is written.")
+
 
 # Main title
 st.title("🧠 JEE Physics AI Tutor")
@@ -89,24 +319,7 @@ with st.sidebar:
     st.markdown("---")
 
     # Optional: Sample problems from database
-    loader = st.session_state.problem_loader
-    if loader.get_total_count() > 0:
-        st.subheader("📋 Or Try Sample Problems")
-        st.caption(f"{loader.get_total_count()} curated problems available")
-
-        with st.expander("Browse Sample Problems"):
-            topics = loader.get_all_topics()
-            for topic in topics[:5]:  # Show first 5 topics
-                problems = loader.filter_problems(topic=topic)
-                if problems and len(problems) > 0:
-                    st.markdown(f"**{topic}** ({len(problems)})")
-                    if st.button(f"Load {topic} example", key=f"sample_{topic}"):
-                        st.session_state.selected_problem = problems[0]
-                        st.session_state.question_submitted = True
-                        st.session_state.show_solution = False
-                        st.session_state.chat_messages = []
-                        st.session_state.hint_level = 0
-                        st.rerun()
+    sample_browser()
 
 # Main content area
 # Check if question is submitted (either user input or sample problem)
@@ -165,138 +378,11 @@ if st.session_state.question_submitted or st.session_state.selected_problem:
             st.info("💡 AI tutor will help you identify concepts, formulas, and approach during the conversation!")
 
     with col2:
-        st.header("💬 AI Tutor Chat")
-
-        # Chat interface
-        chat_container = st.container()
-
-        with chat_container:
-            # Check if AI is enabled
-            if not st.session_state.ai_enabled:
-                st.error(f"⚠️ AI Tutor not available: {st.session_state.get('ai_error', 'API key missing')}")
-                st.info("Please add your GOOGLE_API_KEY to a .env file to enable AI tutoring.")
-                st.code("GOOGLE_API_KEY=your_key_here", language="bash")
-
-            # Initialize chat with AI's first message
-            if len(st.session_state.chat_messages) == 0 and st.session_state.ai_enabled:
-                initial_msg = st.session_state.ai_tutor.get_initial_message(problem)
-                st.session_state.chat_messages.append({
-                    "role": "assistant",
-                    "content": initial_msg
-                })
-
-            # Display chat messages
-            for message in st.session_state.chat_messages:
-                with st.chat_message(message["role"]):
-                    st.markdown(message["content"])
-
-        # User input
-        user_input = st.chat_input("Type your answer or question here...", disabled=not st.session_state.ai_enabled)
-
-        if user_input and st.session_state.ai_enabled:
-            # Add user message
-            st.session_state.chat_messages.append({
-                "role": "user",
-                "content": user_input
-            })
-
-            # Get AI response
-            with st.spinner("Thinking..."):
-                ai_response = st.session_state.ai_tutor.get_response(
-                    problem=problem,
-                    conversation_history=st.session_state.chat_messages,
-                    user_message=user_input
-                )
-
-            st.session_state.chat_messages.append({
-                "role": "assistant",
-                "content": ai_response
-            })
-
-            st.rerun()
-
-        # Action buttons
-        st.markdown("---")
-
-        col_a, col_b, col_c = st.columns(3)
-
-        with col_a:
-            hint_disabled = not st.session_state.ai_enabled or st.session_state.hint_level >= 3
-            if st.button("💡 Request Hint", use_container_width=True, disabled=hint_disabled):
-                if st.session_state.ai_enabled:
-                    st.session_state.hint_level += 1
-
-                    with st.spinner("Generating hint..."):
-                        hint_msg = st.session_state.ai_tutor.get_hint(
-                            problem=problem,
-                            conversation_history=st.session_state.chat_messages,
-                            hint_level=st.session_state.hint_level
-                        )
-
-                    st.session_state.chat_messages.append({
-                        "role": "assistant",
-                        "content": hint_msg
-                    })
-
-                    if st.session_state.hint_level >= 3:
-                        st.session_state.chat_messages.append({
-                            "role": "assistant",
-                            "content": "You've used all 3 hints! Would you like to see the complete solution?"
-                        })
-
-                    st.rerun()
-
-        with col_b:
-            if st.button("📖 Show Solution", use_container_width=True):
-                st.session_state.show_solution = True
-                st.rerun()
-
-        with col_c:
-            if st.button("🔄 Reset Chat", use_container_width=True):
-                st.session_state.chat_messages = []
-                st.session_state.hint_level = 0
-                st.session_state.show_solution = False
-                st.rerun()
+        chat_panel(problem)
 
         # Display solution if requested
         if st.session_state.show_solution:
-            st.markdown("---")
-            st.header("✅ Complete Solution")
-
-            # Check if this is a curated problem with official solution
-            if 'official_solution' in problem and not problem.get('user_submitted', False):
-                solution = problem['official_solution']
-
-                if 'steps' in solution:
-                    for step in solution['steps']:
-                        with st.expander(f"Step {step['step_number']}: {step['description']}", expanded=True):
-                            st.markdown(f"**Formula:** `{step.get('formula', 'N/A')}`")
-                            st.markdown(f"**Calculation:** {step.get('calculation', 'N/A')}")
-                            st.markdown(f"**Explanation:** {step.get('explanation', 'N/A')}")
-                            if 'result' in step:
-                                st.success(f"**Result:** {step['result']}")
-
-                if 'answer_justification' in solution:
-                    st.success(f"**Answer:** {solution['answer_justification']}")
-
-                # Common mistakes
-                if 'common_mistakes' in problem:
-                    st.markdown("---")
-                    st.subheader("⚠️ Common Mistakes to Avoid")
-                    for mistake in problem['common_mistakes']:
-                        st.warning(f"**Mistake:** {mistake['mistake']}\n\n**Correct Approach:** {mistake['correct_approach']}")
-
-            # Generate solution for user-submitted questions
-            elif st.session_state.ai_enabled:
-                with st.spinner("Generating complete solution..."):
-                    solution_text = st.session_state.ai_tutor.generate_solution(problem)
-
-                if solution_text:
-                    st.markdown(solution_text)
-                else:
-                    st.info("Solution generation is not available for this problem.")
-            else:
-                st.warning("AI is not enabled. Please add your API key to see AI-generated solutions.")
+            solution_panel(problem)
 
 else:
     # Question input form
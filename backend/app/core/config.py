@@ -0,0 +1,98 @@
+import os
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent.parent
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment"""
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment"""
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# Gemini model used by the tutor
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash-lite")
+
+# Maximum number of Gemini calls a single worker runs at the same time
+TUTOR_MAX_CONCURRENCY = _env_int("TUTOR_MAX_CONCURRENCY", 32)
+
+# AI solution cache (in-memory LRU in front of a SQLite file)
+SOLUTION_CACHE_PATH = os.getenv(
+    "SOLUTION_CACHE_PATH", str(BACKEND_DIR / "data" / "cache" / "solutions.sqlite3")
+)
+SOLUTION_CACHE_MEMORY_SIZE = _env_int("SOLUTION_CACHE_MEMORY_SIZE", 256)
+SOLUTION_CACHE_DISK_SIZE = _env_int("SOLUTION_CACHE_DISK_SIZE", 10000)
+SOLUTION_CACHE_TTL_SECONDS = _env_int("SOLUTION_CACHE_TTL_SECONDS", 30 * 24 * 3600)
+
+# Compiled problem bank (built by scripts/build_problem_bank.py)
+PROBLEM_BANK_PATH = os.getenv(
+    "PROBLEM_BANK_PATH", str(BACKEND_DIR / "data" / "build" / "problem_bank.sqlite3")
+)
+# How often to check backend/data/problems for edited files (0 disables)
+PROBLEM_RELOAD_INTERVAL_SECONDS = _env_float("PROBLEM_RELOAD_INTERVAL_SECONDS", 30)
+
+# Curated problems recommended next to a submitted question (0 disables)
+SIMILAR_PROBLEMS_LIMIT = _env_int("SIMILAR_PROBLEMS_LIMIT", 3)
+
+# Pasted questions at least this similar (shingle Jaccard) to a bank problem
+# with the same numbers are answered with its official solution
+DUPLICATE_MATCH_THRESHOLD = _env_float("DUPLICATE_MATCH_THRESHOLD", 0.8)
+
+# Problems whose listing rows are kept pre-serialized for /api/problems/samples and search
+SUMMARY_ROW_CACHE_SIZE = _env_int("SUMMARY_ROW_CACHE_SIZE", 10000)
+
+# NCERT textbook passages retrieved into chat prompts (needs pypdf; budget 0 disables)
+TEXTBOOKS_DIR = os.getenv("TEXTBOOKS_DIR", str(BACKEND_DIR / "data" / "textbooks"))
+TEXTBOOK_CACHE_DIR = os.getenv("TEXTBOOK_CACHE_DIR", str(BACKEND_DIR / "data" / "cache" / "textbooks"))
+TEXTBOOK_INGEST_WORKERS = _env_int("TEXTBOOK_INGEST_WORKERS", 2)
+TEXTBOOK_CONTEXT_TOKEN_BUDGET = _env_int("TEXTBOOK_CONTEXT_TOKEN_BUDGET", 600)
+
+# Server-side tutoring sessions
+SESSION_MAX_COUNT = _env_int("SESSION_MAX_COUNT", 10000)
+SESSION_IDLE_TIMEOUT_SECONDS = _env_int("SESSION_IDLE_TIMEOUT_SECONDS", 3600)
+
+# Conversation context: recent turns kept verbatim, older turns summarized
+CONTEXT_RECENT_TOKEN_BUDGET = _env_int("CONTEXT_RECENT_TOKEN_BUDGET", 1200)
+CONTEXT_SUMMARY_TOKEN_BUDGET = _env_int("CONTEXT_SUMMARY_TOKEN_BUDGET", 300)
+
+# Speculative prefetch of a session's next hint: at most this share of all
+# Gemini calls (0 disables) and this many prefetches in flight
+HINT_PREFETCH_MAX_SHARE = _env_float("HINT_PREFETCH_MAX_SHARE", 0.25)
+HINT_PREFETCH_MAX_IN_FLIGHT = _env_int("HINT_PREFETCH_MAX_IN_FLIGHT", 4)
+
+# Admission control in front of the tutor endpoints
+RATE_LIMIT_PER_MINUTE = _env_int("RATE_LIMIT_PER_MINUTE", 30)
+RATE_LIMIT_BURST = _env_int("RATE_LIMIT_BURST", 10)
+ADMISSION_MAX_IN_FLIGHT = _env_int("ADMISSION_MAX_IN_FLIGHT", TUTOR_MAX_CONCURRENCY)
+ADMISSION_INTERACTIVE_RESERVED = _env_int("ADMISSION_INTERACTIVE_RESERVED", 8)
+ADMISSION_MAX_QUEUE = _env_int("ADMISSION_MAX_QUEUE", 64)
+ADMISSION_QUEUE_TIMEOUT_SECONDS = _env_int("ADMISSION_QUEUE_TIMEOUT_SECONDS", 10)
+ADMISSION_RETRY_AFTER_SECONDS = _env_int("ADMISSION_RETRY_AFTER_SECONDS", 5)
+# Proxies in front of the API that append to X-Forwarded-For (1 on Render, 0 when exposed directly)
+TRUSTED_PROXY_HOPS = _env_int("TRUSTED_PROXY_HOPS", 1)
+
+# Gemini call deadlines, retries and circuit breaker
+GEMINI_TIMEOUT_SECONDS = _env_float("GEMINI_TIMEOUT_SECONDS", 20)
+GEMINI_DEADLINE_SECONDS = _env_float("GEMINI_DEADLINE_SECONDS", 30)
+GEMINI_MAX_RETRIES = _env_int("GEMINI_MAX_RETRIES", 2)
+GEMINI_RETRY_BASE_DELAY = _env_float("GEMINI_RETRY_BASE_DELAY", 0.5)
+GEMINI_RETRY_MAX_DELAY = _env_float("GEMINI_RETRY_MAX_DELAY", 4)
+CIRCUIT_FAILURE_THRESHOLD = _env_int("CIRCUIT_FAILURE_THRESHOLD", 5)
+CIRCUIT_RESET_SECONDS = _env_int("CIRCUIT_RESET_SECONDS", 30)
+
+# Request logging
+LOG_MAX_BYTES = _env_int("LOG_MAX_BYTES", 10 * 1024 * 1024)
+LOG_BACKUP_COUNT = _env_int("LOG_BACKUP_COUNT", 5)
+LOG_QUEUE_SIZE = _env_int("LOG_QUEUE_SIZE", 10000)
+LOG_BODY_MAX_BYTES = _env_int("LOG_BODY_MAX_BYTES", 2048)
+LOG_BODY_SAMPLE_RATE = _env_float("LOG_BODY_SAMPLE_RATE", 0.1)
@@ -0,0 +1,132 @@
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import time
+from datetime import datetime, timezone
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line; structured fields come from `extra={"fields": {...}}`"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(log_file: str,
+                  max_bytes: int = 10 * 1024 * 1024,
+                  backup_count: int = 5,
+                  queue_size: int = 10000) -> logging.handlers.QueueListener:
+    """Route all logging through a bounded queue to a background writer thread.
+
+    The writer appends JSON lines to a size-rotated file and echoes plain
+    text to the console, so request handlers never wait on disk I/O.
+    """
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+    )
+    file_handler.setFormatter(JsonLinesFormatter())
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(logging.INFO)
+
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    listener.start()
+    return listener
+
+
+class RequestLoggingMiddleware:
+    """ASGI middleware writing one structured log line per request.
+
+    The request body is never parsed: for a sampled fraction of POST
+    requests the raw bytes are captured as the app reads them and logged
+    truncated to `max_body_bytes`.
+    """
+
+    def __init__(self, app, logger: logging.Logger, max_body_bytes: int = 2048, body_sample_rate: float = 0.1):
+        self.app = app
+        self.logger = logger
+        self.max_body_bytes = max_body_bytes
+        self.body_sample_rate = body_sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = f"{int(time.time() * 1000)}"
+        start_time = time.perf_counter()
+        status = {"code": 500}
+        body = bytearray()
+        body_size = [0]
+        capture = (scope["method"] == "POST" and self.max_body_bytes > 0
+                   and random.random() < self.body_sample_rate)
+
+        async def logging_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                body_size[0] += len(chunk)
+                if capture and len(body) < self.max_body_bytes:
+                    body.extend(chunk[:self.max_body_bytes - len(body)])
+            return message
+
+        async def logging_send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        fields = {"event": "request", "request_id": request_id,
+                  "method": scope["method"], "path": scope["path"]}
+        try:
+            await self.app(scope, logging_receive, logging_send)
+        except Exception as e:
+            fields["duration_ms"] = round((time.perf_counter() - start_time) * 1000, 1)
+            self.logger.error(f"ERROR [{request_id}]: {e}", exc_info=True, extra={"fields": fields})
+            raise
+
+        fields["status"] = status["code"]
+        fields["duration_ms"] = round((time.perf_counter() - start_time) * 1000, 1)
+        fields["body_bytes"] = body_size[0]
+        if capture:
+            fields["body"] = body.decode("utf-8", errors="replace")
+            fields["body_truncated"] = body_size[0] > len(body)
+        self.logger.info(
+            f"{scope['method']} {scope['path']} {status['code']} {fields['duration_ms']}ms",
+            extra={"fields": fields}
+        )
@@ -0,0 +1,228 @@
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Resident fields of a problem in template.json order. Anything else a
+# problem file adds is kept in the record's `extra` dict.
+SUMMARY_FIELDS = (
+    'id', 'year', 'exam', 'date', 'chapter', 'topic', 'subtopics', 'text', 'type',
+    'options', 'correct_answer', 'numerical_answer', 'units', 'difficulty', 'marks',
+    'concepts_required', 'formulas_used', 'tags', 'has_diagram', 'diagram_essential',
+)
+
+# Bulky fields most requests never touch. They stay on disk in the compiled
+# bank and are only read when a single full problem is requested.
+HEAVY_FIELDS = (
+    'given_data',
+    'ncert_mapping',
+    'official_solution',
+    'common_mistakes',
+    'alternative_approaches',
+    'key_insights',
+    'prerequisite_knowledge',
+    'related_problems',
+    'metadata',
+)
+
+REQUIRED_FIELDS = ('id', 'text')
+
+# Short strings repeated across most of the bank, stored once per process
+INTERNED_FIELDS = frozenset({'exam', 'date', 'chapter', 'topic', 'type', 'correct_answer', 'units', 'difficulty'})
+
+# List-of-string fields, stored as tuples of interned strings
+STRING_LIST_FIELDS = frozenset({'subtopics', 'concepts_required', 'formulas_used', 'tags'})
+
+_STR, _INT, _NUMBER, _BOOL, _DICT, _LIST = "string", "integer", "number", "boolean", "object", "array"
+
+# Expected JSON type of every known field (None is accepted for any optional field)
+FIELD_TYPES = {
+    'id': _STR, 'year': _INT, 'exam': _STR, 'date': _STR, 'chapter': _STR, 'topic': _STR,
+    'subtopics': _LIST, 'text': _STR, 'type': _STR, 'options': _LIST, 'correct_answer': _STR,
+    'numerical_answer': _NUMBER, 'units': _STR, 'difficulty': _STR, 'marks': _NUMBER,
+    'concepts_required': _LIST, 'formulas_used': _LIST, 'tags': _LIST,
+    'has_diagram': _BOOL, 'diagram_essential': _BOOL,
+    'given_data': _DICT, 'ncert_mapping': _DICT, 'official_solution': _DICT,
+    'common_mistakes': _LIST, 'alternative_approaches': _LIST, 'key_insights': _LIST,
+    'prerequisite_knowledge': _LIST, 'related_problems': _LIST, 'metadata': _DICT,
+}
+
+_PY_TYPES = {_STR: str, _INT: int, _NUMBER: (int, float), _BOOL: bool, _DICT: dict, _LIST: list}
+_FIELD_CHECKS = {field: (_PY_TYPES[expected], expected) for field, expected in FIELD_TYPES.items()}
+
+_SUMMARY_SLOTS = frozenset(SUMMARY_FIELDS)
+
+
+def _is_type(value: Any, expected: str) -> bool:
+    # bool is an int subclass, but true is not a year
+    if value.__class__ is bool and expected != _BOOL:
+        return False
+    return isinstance(value, _PY_TYPES[expected])
+
+
+def _json_type(value: Any) -> str:
+    for name in (_BOOL, _STR, _INT, _NUMBER, _DICT, _LIST):
+        if _is_type(value, name):
+            return name
+    return "null" if value is None else type(value).__name__
+
+
+def _intern_items(items: list) -> tuple:
+    return tuple(sys.intern(item) if item.__class__ is str else item for item in items)
+
+
+# How each summary field is stored: repeated strings interned, lists as tuples
+_CONVERTERS = {
+    **{field: sys.intern for field in INTERNED_FIELDS},
+    **{field: _intern_items for field in STRING_LIST_FIELDS},
+    'options': tuple,
+}
+_CONVERTED_TYPES = {**{field: str for field in INTERNED_FIELDS},
+                    **{field: list for field in STRING_LIST_FIELDS}, 'options': list}
+
+
+class SchemaIssue:
+    """One reason a problem (or a whole file) was rejected"""
+
+    __slots__ = ("source", "index", "problem_id", "field", "message")
+
+    def __init__(self, source: str, index: Optional[int], problem_id: Optional[str],
+                 field: Optional[str], message: str):
+        self.source = source
+        self.index = index            # position of the problem in its file, None for file-level issues
+        self.problem_id = problem_id
+        self.field = field
+        self.message = message
+
+    def __str__(self) -> str:
+        where = self.source if self.index is None else f"{self.source}[{self.index}]"
+        if self.problem_id:
+            where += f" ({self.problem_id})"
+        return f"{where}: {self.field + ': ' if self.field else ''}{self.message}"
+
+    def to_dict(self) -> Dict:
+        return {"source": self.source, "index": self.index, "problem_id": self.problem_id,
+                "field": self.field, "message": self.message}
+
+
+class ProblemSummary(Mapping):
+    """Compact, read-only record of a problem's resident fields.
+
+    One slot per template.json summary field instead of a per-problem
+    dict, with repeated strings interned and lists stored as tuples. It is
+    a Mapping, so code (and JSON encoding) written against problem dicts
+    keeps working; hot paths can read attributes (record.topic) directly.
+    A field missing from the source problem is missing here too.
+    """
+
+    __slots__ = SUMMARY_FIELDS + ('extra',)
+
+    def __init__(self, fields: Dict):
+        extra = None
+        set_slot = object.__setattr__
+        for key, value in fields.items():
+            if key in _SUMMARY_SLOTS:
+                if key in _CONVERTERS and value.__class__ is _CONVERTED_TYPES[key]:
+                    value = _CONVERTERS[key](value)
+                set_slot(self, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        set_slot(self, 'extra', extra)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ProblemSummary is read-only")
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _SUMMARY_SLOTS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # Overridden for speed: Mapping.get goes through __getitem__ and an exception
+        if key in _SUMMARY_SLOTS:
+            return getattr(self, key, default)
+        return self.extra.get(key, default) if self.extra is not None else default
+
+    def __contains__(self, key) -> bool:
+        if key in _SUMMARY_SLOTS:
+            return hasattr(self, key)
+        return self.extra is not None and key in self.extra
+
+    def __iter__(self) -> Iterator[str]:
+        for field in SUMMARY_FIELDS:
+            if hasattr(self, field):
+                yield field
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __reduce__(self):
+        return ProblemSummary, (self.to_dict(),)
+
+    def to_dict(self) -> Dict:
+        """Plain JSON-serialisable dict (tuples back to lists)"""
+        return {key: list(value) if isinstance(value, tuple) else value for key, value in self.items()}
+
+    def __repr__(self) -> str:
+        return f"ProblemSummary({self.to_dict()!r})"
+
+
+def validate_problem(problem: Any, source: str, index: int) -> Tuple[Optional[Tuple[ProblemSummary, Dict]], List[SchemaIssue]]:
+    """Check one raw problem against the template.json schema.
+
+    Returns ((summary record, heavy fields), []) for a valid problem and
+    (None, issues) otherwise, with every problem found rather than just
+    the first.
+    """
+    if not isinstance(problem, dict):
+        return None, [SchemaIssue(source, index, None, None,
+                                  f"expected a problem object, got {_json_type(problem)}")]
+
+    problem_id = problem.get('id') if isinstance(problem.get('id'), str) else None
+    issues: List[SchemaIssue] = []
+
+    def issue(field: Optional[str], message: str):
+        issues.append(SchemaIssue(source, index, problem_id, field, message))
+
+    for field in REQUIRED_FIELDS:
+        value = problem.get(field)
+        if value is None or (isinstance(value, str) and not value.strip()):
+            issue(field, "required field is missing or empty")
+
+    for field, value in problem.items():
+        check = _FIELD_CHECKS.get(field)
+        if check is None or value is None:
+            continue
+        if not isinstance(value, check[0]) or (value.__class__ is bool and check[1] != _BOOL):
+            issue(field, f"expected {check[1]}, got {_json_type(value)}")
+        elif field in STRING_LIST_FIELDS and not all(item.__class__ is str for item in value):
+            bad = [i for i, item in enumerate(value) if not isinstance(item, str)]
+            if bad:
+                issue(field, f"items {bad} are not strings")
+
+    options = problem.get('options')
+    if isinstance(options, list):
+        option_ids = set()
+        for i, option in enumerate(options):
+            if not isinstance(option, dict) or not isinstance(option.get('id'), str) \
+                    or not isinstance(option.get('text'), str):
+                issue('options', f"option {i} needs string 'id' and 'text'")
+            else:
+                option_ids.add(option['id'])
+        answer = problem.get('correct_answer')
+        if option_ids and isinstance(answer, str) and answer not in option_ids:
+            issue('correct_answer', f"'{answer}' is not one of the option ids {sorted(option_ids)}")
+
+    if issues:
+        return None, issues
+    summary = {k: v for k, v in problem.items() if k not in HEAVY_FIELDS}
+    heavy = {k: v for k, v in problem.items() if k in HEAVY_FIELDS}
+    return (ProblemSummary(summary), heavy), []
@@ -0,0 +1,193 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Dict
+
+from fastapi.responses import JSONResponse
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+
+class TokenBucketLimiter:
+    """Per-client token bucket: `rate_per_minute` sustained, bursts up to `burst`"""
+
+    def __init__(self, rate_per_minute: float, burst: int, max_clients: int = 10000):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    def check(self, client_id: str) -> float:
+        """Take one token for client_id. Returns 0 if allowed, else seconds to wait"""
+        now = time.monotonic()
+        bucket = self._buckets.get(client_id)
+        if bucket is None:
+            bucket = [float(self.burst), now]
+            self._buckets[client_id] = bucket
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client_id)
+            tokens, last = bucket
+            bucket[0] = min(self.burst, tokens + (now - last) * self.rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / self.rate if self.rate > 0 else 60.0
+
+
+class AdmissionController:
+    """Global cap on in-flight tutor requests with a bounded wait queue.
+
+    Interactive requests (chat, hints, new questions) may use every slot;
+    bulk requests (solution generation) may only use the slots not reserved
+    for interactive traffic. Waiting interactive requests are admitted
+    before waiting bulk ones.
+    """
+
+    def __init__(self,
+                 max_in_flight: int,
+                 interactive_reserved: int,
+                 max_queue: int,
+                 queue_timeout: float):
+        self.max_in_flight = max_in_flight
+        self.bulk_limit = max(1, max_in_flight - interactive_reserved)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self.in_flight = {INTERACTIVE: 0, BULK: 0}
+        self._waiters = {INTERACTIVE: deque(), BULK: deque()}
+        self.stats = {"admitted": 0, "queued": 0, "rejected_saturated": 0,
+                      "rejected_rate_limited": 0, "timed_out": 0}
+
+    def _can_admit(self, kind: str) -> bool:
+        if sum(self.in_flight.values()) >= self.max_in_flight:
+            return False
+        return kind == INTERACTIVE or self.in_flight[BULK] < self.bulk_limit
+
+    def _admit(self, kind: str):
+        self.in_flight[kind] += 1
+        self.stats["admitted"] += 1
+
+    async def acquire(self, kind: str) -> bool:
+        """Wait for a slot. Returns False if the queue is full or the wait timed out"""
+        waiters = self._waiters[kind]
+        if not waiters and self._can_admit(kind):
+            self._admit(kind)
+            return True
+
+        if sum(len(q) for q in self._waiters.values()) >= self.max_queue:
+            self.stats["rejected_saturated"] += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        waiters.append(future)
+        self.stats["queued"] += 1
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+            return True
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # Admitted just as the wait ended - hand the slot back
+                self.release(kind)
+            if future in waiters:
+                waiters.remove(future)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.stats["timed_out"] += 1
+            return False
+
+    def release(self, kind: str):
+        self.in_flight[kind] -= 1
+        self._wake()
+
+    def _wake(self):
+        for kind in (INTERACTIVE, BULK):
+            waiters = self._waiters[kind]
+            while waiters and self._can_admit(kind):
+                future = waiters.popleft()
+                if future.done():
+                    continue
+                self._admit(kind)
+                future.set_result(True)
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        stats["in_flight"] = dict(self.in_flight)
+        stats["waiting"] = {kind: len(q) for kind, q in self._waiters.items()}
+        return stats
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying rate limiting and admission control to tutor routes.
+
+    The slot is held until the response has been fully sent, so streaming
+    responses count against the in-flight cap for their whole duration.
+    """
+
+    def __init__(self,
+                 app,
+                 controller: AdmissionController,
+                 limiter: TokenBucketLimiter,
+                 routes: Dict[str, str],
+                 retry_after: int = 5,
+                 trusted_proxy_hops: int = 1):
+        self.app = app
+        self.controller = controller
+        self.limiter = limiter
+        self.routes = routes
+        self.retry_after = retry_after
+        # Proxies in front of the app that append to X-Forwarded-For (Render: 1)
+        self.trusted_proxy_hops = trusted_proxy_hops
+
+    async def __call__(self, scope, receive, send):
+        kind = self.routes.get(scope.get("path")) if scope["type"] == "http" else None
+        if kind is None or scope.get("method") != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        wait = self.limiter.check(self._client_id(scope))
+        if wait > 0:
+            self.controller.stats["rejected_rate_limited"] += 1
+            await self._reject(scope, receive, send, math.ceil(wait),
+                               "Too many requests. Please slow down and try again shortly.")
+            return
+
+        if not await self.controller.acquire(kind):
+            await self._reject(scope, receive, send, self.retry_after,
+                               "The tutor is busy right now. Please try again in a few seconds.")
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(kind)
+
+    def _client_id(self, scope) -> str:
+        # Entries left of those our own proxies appended are whatever the
+        # client sent, so the client is the address the outermost trusted
+        # proxy saw: the trusted_proxy_hops-th entry from the right
+        if self.trusted_proxy_hops > 0:
+            forwarded = [
+                entry.strip()
+                for name, value in scope.get("headers", []) if name == b"x-forwarded-for"
+                for entry in value.decode("latin-1").split(",")
+            ]
+            forwarded = [entry for entry in forwarded if entry]
+            if len(forwarded) >= self.trusted_proxy_hops:
+                return forwarded[-self.trusted_proxy_hops]
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def _reject(self, scope, receive, send, retry_after: int, detail: str):
+        response = JSONResponse(
+            status_code=429,
+            content={"detail": detail, "timestamp": datetime.now().isoformat()},
+            headers={"Retry-After": str(retry_after)}
+        )
+        await response(scope, receive, send)
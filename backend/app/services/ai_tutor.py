@@ -1,9 +1,21 @@
 import os
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import google.generativeai as genai
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, AsyncIterator, Callable
 from dotenv import load_dotenv
 from pathlib import Path
 
+from app.core import config
+from app.services.solution_cache import SolutionCache, solution_cache_key
+from app.services.single_flight import SingleFlight, prompt_fingerprint
+from app.services.conversation_window import ConversationWindow, estimate_tokens
+from app.services.resilience import CircuitBreaker, CircuitOpenError, call_with_retry
+from app.services.textbooks import TextbookLibrary
+
 # Load environment variables from config directory
 config_dir = Path(__file__).parent.parent.parent.parent / "config"
 env_file = config_dir / ".env"
@@ -13,19 +25,11 @@ else:
     # Fallback to root directory
     load_dotenv()
 
-class PhysicsAITutor:
-    """Socratic AI tutor for JEE Physics using Google Gemini"""
-
-    def __init__(self):
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            raise ValueError("GOOGLE_API_KEY not found in environment variables")
+logger = logging.getLogger(__name__)
 
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash-lite')
-
-        # System prompt for Socratic tutoring
-        self.system_prompt = """You are an expert JEE Physics tutor who uses the Socratic method to guide students.
+# System prompt for Socratic tutoring. It is passed once as the model's system
+# instruction rather than pasted in front of every chat and hint prompt.
+SOCRATIC_SYSTEM_PROMPT = """You are an expert JEE Physics tutor who uses the Socratic method to guide students.
 
 YOUR TEACHING PHILOSOPHY:
 - NEVER give direct answers or full solutions in chat
@@ -62,51 +66,364 @@ HINT LEVELS (when student requests):
 
 Remember: Your goal is to teach THINKING through questions, not to provide answers!"""
 
+
+class PhysicsAITutor:
+    """Socratic AI tutor for JEE Physics using Google Gemini"""
+
+    def __init__(self,
+                 model=None,
+                 solution_model=None,
+                 max_concurrency: Optional[int] = None,
+                 solution_cache: Optional[SolutionCache] = None,
+                 textbooks: Optional[TextbookLibrary] = None):
+        self.system_prompt = SOCRATIC_SYSTEM_PROMPT
+        # NCERT passages retrieved into chat prompts (None = no retrieval)
+        self.textbooks = textbooks
+
+        if model is None:
+            api_key = os.getenv("GOOGLE_API_KEY")
+            if not api_key:
+                raise ValueError("GOOGLE_API_KEY not found in environment variables")
+
+            genai.configure(api_key=api_key)
+            # Chat, hints and the opening message share the Socratic system instruction;
+            # solutions use a plain model with their own teacher prompt
+            model = genai.GenerativeModel(config.GEMINI_MODEL, system_instruction=self.system_prompt)
+            solution_model = genai.GenerativeModel(config.GEMINI_MODEL)
+        self.model = model
+        self.solution_model = solution_model or model
+
+        # Bounded pool the async methods offload blocking Gemini calls to,
+        # so the event loop stays free while a generation is in flight
+        self.max_concurrency = max_concurrency or config.TUTOR_MAX_CONCURRENCY
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="gemini"
+        )
+
+        # Generated solutions are reused across students pasting the same problem
+        if solution_cache is None:
+            solution_cache = SolutionCache(
+                db_path=config.SOLUTION_CACHE_PATH,
+                memory_size=config.SOLUTION_CACHE_MEMORY_SIZE,
+                disk_size=config.SOLUTION_CACHE_DISK_SIZE,
+                ttl_seconds=config.SOLUTION_CACHE_TTL_SECONDS
+            )
+        self.solution_cache = solution_cache
+
+        # Fail fast to the fallback messages while Gemini is unhealthy
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=config.CIRCUIT_RESET_SECONDS
+        )
+
+        # Identical prompts in flight at the same time share one Gemini call
+        self.single_flight = SingleFlight()
+
+        # Recent turns within a token budget, older turns folded into a cached summary
+        self.conversation_window = ConversationWindow(
+            recent_token_budget=config.CONTEXT_RECENT_TOKEN_BUDGET,
+            summary_token_budget=config.CONTEXT_SUMMARY_TOKEN_BUDGET
+        )
+
+        # Formatted problem statements, reused across the turns of a conversation
+        self._problem_blocks: "OrderedDict[int, tuple]" = OrderedDict()
+        self._problem_blocks_size = 1024
+
+        # Prompt token accounting: what the old inline system prompt would have
+        # sent vs what is sent now, plus provider-reported counts when available
+        self._stats_lock = threading.Lock()
+        self.prompt_token_stats = {
+            "calls": 0,
+            "inline_prompt_tokens_est": 0,
+            "sent_prompt_tokens_est": 0,
+            "provider_prompt_tokens": 0,
+            "provider_cached_tokens": 0
+        }
+
+
+    def _generate(self, prompt: str, model=None, inline_system_prompt: bool = False) -> str:
+        """Run a single blocking Gemini call and return its text.
+
+        inline_system_prompt marks chat and hint prompts, which used to carry
+        the system prompt inline (see _record_prompt_tokens).
+        """
+        model = model or self.model
+        response = self._call_model(model, prompt)
+        self._record_prompt_tokens(prompt, response, inline_system_prompt)
+        return response.text
+
+    def _call_model(self, model, prompt: str, stream: bool = False):
+        """generate_content behind the circuit breaker, with deadlines and retries"""
+        self.circuit_breaker.before_call()
+        try:
+            response = call_with_retry(
+                lambda timeout: model.generate_content(
+                    prompt, stream=stream, request_options={"timeout": timeout}
+                ),
+                max_retries=config.GEMINI_MAX_RETRIES,
+                attempt_timeout=config.GEMINI_TIMEOUT_SECONDS,
+                deadline=config.GEMINI_DEADLINE_SECONDS,
+                base_delay=config.GEMINI_RETRY_BASE_DELAY,
+                max_delay=config.GEMINI_RETRY_MAX_DELAY
+            )
+        except Exception:
+            self.circuit_breaker.record_failure()
+            raise
+        if not stream:
+            self.circuit_breaker.record_success()
+        return response
+
+    async def _agenerate(self, prompt: str, model=None, inline_system_prompt: bool = False) -> str:
+        """Run a Gemini call on the bounded pool without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._generate, prompt, model, inline_system_prompt)
+
+    def _record_prompt_tokens(self, prompt: str, response=None, inline_system_prompt: bool = False):
+        """Account for the prompt tokens of one call"""
+        sent = estimate_tokens(prompt)
+        inline = sent
+        if inline_system_prompt:
+            # Before, the system prompt was pasted in front of chat and hint prompts
+            # (never in front of the opening message or a solution)
+            inline += estimate_tokens(self.system_prompt)
+
+        usage = getattr(response, 'usage_metadata', None)
+        provider_prompt = getattr(usage, 'prompt_token_count', 0) or 0
+        provider_cached = getattr(usage, 'cached_content_token_count', 0) or 0
+
+        with self._stats_lock:
+            self.prompt_token_stats["calls"] += 1
+            self.prompt_token_stats["inline_prompt_tokens_est"] += inline
+            self.prompt_token_stats["sent_prompt_tokens_est"] += sent
+            self.prompt_token_stats["provider_prompt_tokens"] += provider_prompt
+            self.prompt_token_stats["provider_cached_tokens"] += provider_cached
+
+        logger.debug(f"Prompt tokens ~{sent} (inline system prompt would be ~{inline}), "
+                     f"provider reported {provider_prompt} ({provider_cached} cached)")
+
+    def get_prompt_token_stats(self) -> Dict:
+        with self._stats_lock:
+            return dict(self.prompt_token_stats)
+
+    async def _agenerate_shared(self, prompt: str, inline_system_prompt: bool = False) -> str:
+        """Like _agenerate, but concurrent callers with the same prompt share one call"""
+        return await self.single_flight.do(
+            prompt_fingerprint(prompt),
+            lambda: self._agenerate(prompt, inline_system_prompt=inline_system_prompt)
+        )
+
+    async def _astream(self, prompt: str, model=None, inline_system_prompt: bool = False) -> AsyncIterator[str]:
+        """Stream Gemini chunks from the bounded pool as they arrive"""
+        model = model or self.model
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        finished = object()
+        stop = threading.Event()
+
+        def produce():
+            try:
+                response = self._call_model(model, prompt, stream=True)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+                loop.call_soon_threadsafe(queue.put_nowait, finished)
+                return
+
+            try:
+                chunk = None
+                for chunk in response:
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk.text)
+                self.circuit_breaker.record_success()
+                # The last chunk carries the usage metadata for the whole call
+                self._record_prompt_tokens(prompt, chunk, inline_system_prompt)
+            except Exception as e:
+                self.circuit_breaker.record_failure()
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, finished)
+
+        loop.run_in_executor(self._executor, produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is finished:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Client went away or we are done - let the worker thread stop early
+            stop.set()
+
+    async def _astream_with_fallback(self,
+                                     prompt: str,
+                                     fallback: Callable[[Exception], str],
+                                     model=None,
+                                     inline_system_prompt: bool = False) -> AsyncIterator[str]:
+        """Stream a generation, yielding the fallback text if nothing was produced"""
+        produced = False
+        try:
+            async for text in self._astream(prompt, model, inline_system_prompt):
+                produced = True
+                yield text
+        except Exception as e:
+            if not produced:
+                yield fallback(e)
+            else:
+                logger.error(f"Stream interrupted: {e}", exc_info=True)
+
     def get_initial_message(self, problem: Dict) -> str:
         """Generate the first tutoring message based on the problem"""
 
+        try:
+            return self._generate(self._initial_prompt(problem))
+        except Exception as e:
+            return self._initial_fallback()
+
+    async def aget_initial_message(self, problem: Dict) -> str:
+        """Async variant of get_initial_message"""
+
+        try:
+            return await self._agenerate_shared(self._initial_prompt(problem))
+        except Exception as e:
+            return self._initial_fallback()
+
+    def _initial_prompt(self, problem: Dict) -> str:
+        """Build the prompt for the first tutoring message"""
+
         problem_text = problem.get('text', '')
-        problem_type = problem.get('type', 'numerical')
         topic = problem.get('topic', 'Physics')
 
-        prompt = f"""A student has brought this {topic} problem:
+        return f"""A student has brought this {topic} problem:
 
 "{problem_text}"
 
 This is your first interaction. Greet them warmly and ask your FIRST Socratic question to get them thinking.
 Do NOT solve the problem. Just ask what they understand about what's being asked."""
 
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"Hello! I'm your physics tutor. Let's work through this problem together. To start, can you tell me: What is this problem asking you to find?"
+    def _initial_fallback(self) -> str:
+        return f"Hello! I'm your physics tutor. Let's work through this problem together. To start, can you tell me: What is this problem asking you to find?"
 
     def get_response(self,
                     problem: Dict,
                     conversation_history: List[Dict],
-                    user_message: str) -> str:
+                    user_message: str,
+                    conversation_id: Optional[str] = None) -> str:
         """Get AI tutor response based on conversation context"""
 
         # Build conversation context
-        context = self._build_context(problem, conversation_history, user_message)
+        context = self._build_context(problem, conversation_history, user_message, conversation_id)
 
         try:
-            response = self.model.generate_content(context)
-            return response.text
+            return self._generate(context, inline_system_prompt=True)
         except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Error generating AI response: {e}", exc_info=True)
-            return f"I'm having trouble connecting right now. Let me try to help: Could you explain your thinking so far?"
+            return self._response_fallback(e)
+
+    async def aget_response(self,
+                           problem: Dict,
+                           conversation_history: List[Dict],
+                           user_message: str,
+                           conversation_id: Optional[str] = None) -> str:
+        """Async variant of get_response"""
+
+        context = self._build_context(problem, conversation_history, user_message, conversation_id)
+
+        try:
+            return await self._agenerate_shared(context, inline_system_prompt=True)
+        except Exception as e:
+            return self._response_fallback(e)
+
+    async def astream_response(self,
+                               problem: Dict,
+                               conversation_history: List[Dict],
+                               user_message: str,
+                               conversation_id: Optional[str] = None) -> AsyncIterator[str]:
+        """Streaming variant of get_response, yielding text chunks"""
+
+        context = self._build_context(problem, conversation_history, user_message, conversation_id)
+        async for text in self._astream_with_fallback(context, self._response_fallback,
+                                                      inline_system_prompt=True):
+            yield text
+
+    def _response_fallback(self, error: Exception) -> str:
+        logger.error(f"Error generating AI response: {error}", exc_info=True)
+        return f"I'm having trouble connecting right now. Let me try to help: Could you explain your thinking so far?"
 
     def get_hint(self,
                 problem: Dict,
                 conversation_history: List[Dict],
-                hint_level: int) -> str:
+                hint_level: int,
+                conversation_id: Optional[str] = None) -> str:
         """Generate progressive hints"""
 
-        problem_text = problem.get('text', '')
+        level = min(hint_level, 3)
+        prompt = self._hint_prompt(problem, conversation_history, level, conversation_id)
+
+        try:
+            return f"💡 **Hint {level}:** {self._generate(prompt, inline_system_prompt=True)}"
+        except Exception as e:
+            return self._hint_fallback(level)
+
+    async def aget_hint(self,
+                       problem: Dict,
+                       conversation_history: List[Dict],
+                       hint_level: int,
+                       conversation_id: Optional[str] = None) -> str:
+        """Async variant of get_hint"""
+
+        level = min(hint_level, 3)
+        prompt = self._hint_prompt(problem, conversation_history, level, conversation_id)
+
+        try:
+            return f"💡 **Hint {level}:** {await self._agenerate_shared(prompt, inline_system_prompt=True)}"
+        except Exception as e:
+            return self._hint_fallback(level)
+
+    async def aspeculate_hint(self,
+                              problem: Dict,
+                              conversation_history: List[Dict],
+                              hint_level: int,
+                              conversation_id: Optional[str] = None) -> str:
+        """aget_hint for a speculative prefetch.
+
+        Errors propagate instead of becoming the fallback hint, and the call
+        is not shared through single_flight, so cancelling it while it is
+        still queued for the pool saves the Gemini call.
+        """
+
+        level = min(hint_level, 3)
+        prompt = self._hint_prompt(problem, conversation_history, level, conversation_id)
+        return f"💡 **Hint {level}:** {await self._agenerate(prompt, inline_system_prompt=True)}"
+
+    async def astream_hint(self,
+                           problem: Dict,
+                           conversation_history: List[Dict],
+                           hint_level: int,
+                           conversation_id: Optional[str] = None) -> AsyncIterator[str]:
+        """Streaming variant of get_hint, yielding text chunks"""
+
+        level = min(hint_level, 3)
+        prompt = self._hint_prompt(problem, conversation_history, level, conversation_id)
+
+        produced = False
+        try:
+            async for text in self._astream(prompt, inline_system_prompt=True):
+                if not produced:
+                    produced = True
+                    yield f"💡 **Hint {level}:** "
+                yield text
+        except Exception as e:
+            if not produced:
+                yield self._hint_fallback(level)
+
+    def _hint_prompt(self,
+                    problem: Dict,
+                    conversation_history: List[Dict],
+                    level: int,
+                    conversation_id: Optional[str] = None) -> str:
+        """Build the prompt for a hint at the given level"""
 
         hint_prompts = {
             1: "Give a GENTLE hint (Level 1) - just a subtle nudge about the general approach. Don't reveal specifics.",
@@ -114,13 +431,9 @@ Do NOT solve the problem. Just ask what they understand about what's being asked
             3: "Give a DIRECT hint (Level 3) - suggest the exact formula or equation to use, but don't solve."
         }
 
-        level = min(hint_level, 3)
-        conversation_context = self._format_conversation(conversation_history)
-
-        prompt = f"""{self.system_prompt}
+        conversation_context = self._format_conversation(conversation_history, conversation_id)
 
-PROBLEM:
-{problem_text}
+        return f"""{self._problem_block(problem)}
 
 CONVERSATION SO FAR:
 {conversation_context}
@@ -130,22 +443,61 @@ The student has requested a hint (Level {level}).
 
 Provide the hint in a supportive way that encourages them to keep trying."""
 
-        try:
-            response = self.model.generate_content(prompt)
-            return f"💡 **Hint {level}:** {response.text}"
-        except Exception as e:
-            fallback_hints = {
-                1: "💡 **Hint 1:** Think about what physical principles or laws apply to this situation.",
-                2: "💡 **Hint 2:** Consider what quantities are conserved or what equations relate the given variables.",
-                3: "💡 **Hint 3:** Look at the given information - which formula connects these quantities?"
-            }
-            return fallback_hints.get(level, fallback_hints[1])
+    def _hint_fallback(self, level: int) -> str:
+        fallback_hints = {
+            1: "💡 **Hint 1:** Think about what physical principles or laws apply to this situation.",
+            2: "💡 **Hint 2:** Consider what quantities are conserved or what equations relate the given variables.",
+            3: "💡 **Hint 3:** Look at the given information - which formula connects these quantities?"
+        }
+        return fallback_hints.get(level, fallback_hints[1])
 
     def _build_context(self,
                       problem: Dict,
                       conversation_history: List[Dict],
-                      user_message: str) -> str:
-        """Build full context for AI model"""
+                      user_message: str,
+                      conversation_id: Optional[str] = None) -> str:
+        """Build the per-turn prompt; the Socratic instructions go in the system instruction"""
+
+        # Format conversation history
+        conversation_context = self._format_conversation(conversation_history, conversation_id)
+
+        context = f"""{self._problem_block(problem)}{self._textbook_block(problem, user_message)}
+
+CONVERSATION SO FAR:
+{conversation_context}
+
+STUDENT'S LATEST MESSAGE:
+{user_message}
+
+YOUR RESPONSE (remember: ask questions, guide thinking, don't solve directly):"""
+
+        return context
+
+    def _textbook_block(self, problem: Dict, user_message: str) -> str:
+        """Textbook passages relevant to this turn, within the configured token budget"""
+        if self.textbooks is None:
+            return ""
+        query = f"{problem.get('topic', '')} {problem.get('text', '')} {user_message}"
+        passages = self.textbooks.retrieve(query, config.TEXTBOOK_CONTEXT_TOKEN_BUDGET)
+        if not passages:
+            return ""
+        block = "\n\nRELEVANT NCERT TEXTBOOK PASSAGES (background for your guidance, don't quote them as a solution):"
+        for passage in passages:
+            block += f"\n[{passage['source']}, p. {passage['page']}] {passage['text']}"
+        return block
+
+    def _problem_block(self, problem: Dict) -> str:
+        """Problem statement section of a prompt, formatted once per problem.
+
+        Sessions keep the same problem dict across turns, so the formatted
+        block is cached by object identity (holding a reference keeps the id
+        from being reused while the entry is cached).
+        """
+        with self._stats_lock:
+            entry = self._problem_blocks.get(id(problem))
+            if entry is not None and entry[0] is problem:
+                self._problem_blocks.move_to_end(id(problem))
+                return entry[1]
 
         problem_text = problem.get('text', '')
         topic = problem.get('topic', 'Physics')
@@ -158,51 +510,125 @@ Provide the hint in a supportive way that encourages them to keep trying."""
             for opt in options:
                 options_text += f"({opt['id'].upper()}) {opt['text']}\n"
 
-        # Format conversation history
-        conversation_context = self._format_conversation(conversation_history)
+        block = f"""PROBLEM ({topic}):
+{problem_text}
+{options_text}"""
 
-        context = f"""{self.system_prompt}
+        with self._stats_lock:
+            self._problem_blocks[id(problem)] = (problem, block)
+            while len(self._problem_blocks) > self._problem_blocks_size:
+                self._problem_blocks.popitem(last=False)
+        return block
 
-PROBLEM ({topic}):
-{problem_text}
-{options_text}
+    def _format_conversation(self,
+                             conversation_history: List[Dict],
+                             conversation_id: Optional[str] = None) -> str:
+        """Format conversation history for context within the token budget"""
+        return self.conversation_window.format(conversation_history, conversation_id)
 
-CONVERSATION SO FAR:
-{conversation_context}
+    def generate_solution(self, problem: Dict) -> str:
+        """Generate complete solution (only after student has tried)"""
 
-STUDENT'S LATEST MESSAGE:
-{user_message}
+        # Check if it's a curated problem with official solution
+        if 'official_solution' in problem and not problem.get('user_submitted', False):
+            return None  # Will use the pre-written solution from JSON
 
-YOUR RESPONSE (remember: ask questions, guide thinking, don't solve directly):"""
+        key = solution_cache_key(problem)
+        cached = self.solution_cache.get(key)
+        if cached is not None:
+            return cached
 
-        return context
+        try:
+            solution = self._generate(self._solution_prompt(problem), self.solution_model)
+        except Exception as e:
+            return self._solution_fallback(e)
 
-    def _format_conversation(self, conversation_history: List[Dict]) -> str:
-        """Format conversation history for context"""
+        self.solution_cache.put(key, solution)
+        return solution
 
-        if not conversation_history:
-            return "No conversation yet - this is the first interaction."
+    async def agenerate_solution(self, problem: Dict) -> str:
+        """Async variant of generate_solution"""
 
-        formatted = ""
-        for msg in conversation_history[-10:]:  # Last 10 messages for context
-            role = "Tutor" if msg['role'] == 'assistant' else "Student"
-            formatted += f"{role}: {msg['content']}\n\n"
+        if 'official_solution' in problem and not problem.get('user_submitted', False):
+            return None
 
-        return formatted.strip()
+        key = solution_cache_key(problem)
+        cached = await self._acached_solution(key)
+        if cached is not None:
+            return cached
 
-    def generate_solution(self, problem: Dict) -> str:
-        """Generate complete solution (only after student has tried)"""
+        prompt = self._solution_prompt(problem)
+
+        async def produce():
+            solution = await self._agenerate(prompt, self.solution_model)
+            await self._acache_solution(key, solution)
+            return solution
+
+        try:
+            return await self.single_flight.do(prompt_fingerprint(prompt), produce)
+        except Exception as e:
+            return self._solution_fallback(e)
+
+    async def astream_solution(self, problem: Dict) -> AsyncIterator[str]:
+        """Streaming variant of generate_solution for user-submitted problems"""
+
+        key = solution_cache_key(problem)
+        cached = await self._acached_solution(key)
+        if cached is not None:
+            yield cached
+            return
+
+        prompt = self._solution_prompt(problem)
+        fingerprint = prompt_fingerprint(prompt)
+
+        # Someone is already generating this solution - wait for their result
+        shared = self.single_flight.join(fingerprint)
+        if shared is not None:
+            try:
+                yield await shared
+            except Exception as e:
+                yield self._solution_fallback(e)
+            return
+
+        # Lead the generation; only cache a solution that streamed to completion
+        result = self.single_flight.lead(fingerprint)
+        parts = []
+        try:
+            async for text in self._astream(prompt, self.solution_model):
+                parts.append(text)
+                yield text
+            solution = "".join(parts)
+            result.set_result(solution)
+        except Exception as e:
+            result.set_exception(e)
+            if not parts:
+                yield self._solution_fallback(e)
+            return
+        finally:
+            if not result.done():
+                result.set_exception(RuntimeError("Solution stream was abandoned"))
+
+        await self._acache_solution(key, solution)
+
+    async def _acached_solution(self, key: str) -> Optional[str]:
+        """solution_cache.get on the pool: a memory miss reads SQLite"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.solution_cache.get, key)
+
+    async def _acache_solution(self, key: str, solution: str):
+        """solution_cache.put on the pool: it commits to SQLite"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.solution_cache.put, key, solution)
+
+    def _solution_prompt(self, problem: Dict) -> str:
+        """Build the prompt for a complete step-by-step solution"""
 
         problem_text = problem.get('text', '')
         topic = problem.get('topic', 'Physics')
 
-        # Check if it's a curated problem with official solution
-        if 'official_solution' in problem and not problem.get('user_submitted', False):
-            return None  # Will use the pre-written solution from JSON
-
         # Generate solution for user-submitted questions
         # Use a DIFFERENT prompt for solutions (not the Socratic one)
-        solution_prompt = f"""You are an expert JEE Physics teacher providing a complete solution.
+        return f"""You are an expert JEE Physics teacher providing a complete solution.
 
 PROBLEM ({topic}):
 {problem_text}
@@ -257,14 +683,9 @@ IMPORTANT FORMATTING RULES:
 - Add blank lines between sections
 - Make it scannable and easy to read"""
 
-        try:
-            response = self.model.generate_content(solution_prompt)
-            return response.text
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Error generating solution: {e}", exc_info=True)
-            return "I'm having trouble generating the solution right now. Please try again or ask your teacher for help."
+    def _solution_fallback(self, error: Exception) -> str:
+        logger.error(f"Error generating solution: {error}", exc_info=True)
+        return "I'm having trouble generating the solution right now. Please try again or ask your teacher for help."
 
 
 # Utility function for quick testing
@@ -0,0 +1,42 @@
+import os
+import struct
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+
+# A fingerprinted array file is a plain .npy followed by the fingerprint and
+# this footer. NumPy ignores trailing bytes, so the array still loads, and
+# memory-maps, with np.load.
+_FOOTER = struct.Struct("<I8s")
+_MAGIC = b"BANKFP01"
+
+
+def save_array(path: Path, array: np.ndarray, fingerprint: str = ""):
+    """Write `array` and `fingerprint` to `path`, replacing any previous file atomically"""
+    path = Path(path)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    encoded = fingerprint.encode('utf-8')
+    with open(tmp_path, 'wb') as f:
+        np.save(f, np.asarray(array))
+        f.write(encoded)
+        f.write(_FOOTER.pack(len(encoded), _MAGIC))
+    os.replace(tmp_path, path)
+
+
+def load_array(path: Path) -> Tuple[np.ndarray, str]:
+    """Memory-map an array written by save_array and return it with its fingerprint.
+
+    Files without a footer load with an empty fingerprint.
+    """
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        fingerprint = ""
+        if size >= _FOOTER.size:
+            f.seek(size - _FOOTER.size)
+            length, magic = _FOOTER.unpack(f.read(_FOOTER.size))
+            if magic == _MAGIC and length <= size - _FOOTER.size:
+                f.seek(size - _FOOTER.size - length)
+                fingerprint = f.read(length).decode('utf-8')
+    return np.load(path, mmap_mode='r'), fingerprint
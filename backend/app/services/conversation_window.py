@@ -0,0 +1,119 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) for prompt budgeting"""
+    return max(1, len(text) // 4) if text else 0
+
+
+def _speaker(msg: Dict) -> str:
+    return "Tutor" if msg.get('role') == 'assistant' else "Student"
+
+
+class _Summary:
+    """Rolling summary of the messages folded out of the recent window"""
+
+    __slots__ = ("covered", "lines", "tokens", "dropped")
+
+    def __init__(self):
+        self.covered = 0      # number of leading messages folded into the summary
+        self.lines: List[str] = []
+        self.tokens = 0
+        self.dropped = 0      # folded messages no longer listed individually
+
+
+class ConversationWindow:
+    """Token-budgeted view of a conversation for the tutor prompt.
+
+    The most recent messages are kept verbatim up to recent_token_budget.
+    Older messages are folded, one compressed line each, into a summary
+    capped at summary_token_budget. Summaries are cached per conversation
+    id and only extended with newly folded messages, so a turn never
+    re-summarizes the whole history and the prompt stays the same size no
+    matter how long the session runs.
+    """
+
+    def __init__(self,
+                 recent_token_budget: int = 1200,
+                 summary_token_budget: int = 300,
+                 max_conversations: int = 10000,
+                 line_chars: int = 160):
+        self.recent_token_budget = recent_token_budget
+        self.summary_token_budget = summary_token_budget
+        self.max_conversations = max_conversations
+        self.line_chars = line_chars
+        self._summaries: "OrderedDict[str, _Summary]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def format(self, conversation_history: List[Dict], conversation_id: Optional[str] = None) -> str:
+        """Format the history as summary + recent messages within the token budget"""
+        if not conversation_history:
+            return "No conversation yet - this is the first interaction."
+
+        # Walk back from the newest message until the budget is spent; the
+        # latest message is always kept even if it alone exceeds the budget
+        split = len(conversation_history)
+        used = 0
+        while split > 0:
+            msg = conversation_history[split - 1]
+            cost = estimate_tokens(f"{_speaker(msg)}: {msg.get('content', '')}")
+            if used + cost > self.recent_token_budget and split < len(conversation_history):
+                break
+            used += cost
+            split -= 1
+
+        summary = self._fold(conversation_history, split, conversation_id)
+        # The fold boundary never moves backwards, so never repeat a folded message
+        start = max(split, summary.covered)
+
+        formatted = ""
+        if summary.lines or summary.dropped:
+            formatted += "EARLIER IN THIS CONVERSATION (summary):\n"
+            if summary.dropped:
+                formatted += f"- ({summary.dropped} earlier messages omitted)\n"
+            for line in summary.lines:
+                formatted += f"- {line}\n"
+            formatted += "\nRECENT MESSAGES:\n"
+
+        for msg in conversation_history[start:]:
+            formatted += f"{_speaker(msg)}: {msg.get('content', '')}\n\n"
+
+        return formatted.strip()
+
+    def _fold(self, conversation_history: List[Dict], split: int, conversation_id: Optional[str]) -> _Summary:
+        """Extend the cached summary with messages that left the recent window"""
+        with self._lock:
+            summary = self._summaries.get(conversation_id) if conversation_id else None
+            if summary is None or summary.covered > len(conversation_history):
+                summary = _Summary()
+
+            for msg in conversation_history[summary.covered:split]:
+                line = self._compress(msg)
+                summary.lines.append(line)
+                summary.tokens += estimate_tokens(line)
+            summary.covered = max(summary.covered, split)
+
+            while summary.lines and summary.tokens > self.summary_token_budget:
+                summary.tokens -= estimate_tokens(summary.lines.pop(0))
+                summary.dropped += 1
+
+            if conversation_id:
+                self._summaries[conversation_id] = summary
+                self._summaries.move_to_end(conversation_id)
+                while len(self._summaries) > self.max_conversations:
+                    self._summaries.popitem(last=False)
+            return summary
+
+    def _compress(self, msg: Dict) -> str:
+        """One-line digest of a message for the summary"""
+        content = re.sub(r"\s+", " ", msg.get('content', '')).strip()
+        if len(content) > self.line_chars:
+            content = content[:self.line_chars].rstrip() + "..."
+        return f"{_speaker(msg)}: {content}"
+
+    def forget(self, conversation_id: str):
+        with self._lock:
+            self._summaries.pop(conversation_id, None)
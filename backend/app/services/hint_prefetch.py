@@ -0,0 +1,125 @@
+import asyncio
+from typing import Dict, Optional
+
+from app.services.session_store import TutoringSession
+
+MAX_HINT_LEVEL = 3
+
+
+class _Prefetch:
+    """A speculative hint for one session, valid for one conversation state"""
+
+    __slots__ = ("level", "version", "task")
+
+    def __init__(self, level: int, version: int, task: asyncio.Future):
+        self.level = level
+        self.version = version  # conversation length it was generated for
+        self.task = task
+
+
+class HintPrefetcher:
+    """Speculatively generates a session's next hint after each tutor turn.
+
+    schedule() starts hint level session.hint_level + 1 in the background
+    for the conversation as it stands; take() hands it to the hint request
+    if the student asks for exactly that level before saying anything else,
+    and otherwise returns None so the caller generates the hint as usual.
+    invalidate() drops it when the student sends a new message: a call
+    still queued for the tutor's pool is cancelled outright, one already
+    running is left to finish. Either way, and for a finished hint nobody
+    asked for, the prefetch counts as wasted.
+
+    Speculative calls are capped at max_share of all Gemini calls the tutor
+    has made, and at max_in_flight at a time, so prefetching never takes
+    more than that share of quota or crowds out requests a student is
+    waiting for.
+    """
+
+    def __init__(self, tutor, max_share: float = 0.25, max_in_flight: int = 4):
+        self.tutor = tutor
+        self.max_share = max_share
+        self.max_in_flight = max_in_flight
+        self._in_flight = 0
+        self.stats = {"started": 0, "hits": 0, "misses": 0, "wasted": 0, "failures": 0,
+                      "skipped_budget": 0}
+
+    def schedule(self, session: TutoringSession):
+        """Prefetch the next hint level for the session's current conversation"""
+        self.invalidate(session)
+        level = session.hint_level + 1
+        if self.max_share <= 0 or level > MAX_HINT_LEVEL:
+            return
+        if not self._within_budget():
+            self.stats["skipped_budget"] += 1
+            return
+
+        task = asyncio.ensure_future(self.tutor.aspeculate_hint(
+            problem=session.problem,
+            conversation_history=list(session.conversation_history),
+            hint_level=level,
+            conversation_id=session.id
+        ))
+        self.stats["started"] += 1
+        self._in_flight += 1
+        task.add_done_callback(self._finished)
+        session.hint_prefetch = _Prefetch(level, len(session.conversation_history), task)
+
+    def invalidate(self, session: TutoringSession):
+        """Drop the session's prefetched hint, e.g. because the student said something new"""
+        prefetch = session.hint_prefetch
+        session.hint_prefetch = None
+        if prefetch is not None:
+            self._discard(prefetch)
+
+    async def take(self, session: TutoringSession, level: int) -> Optional[str]:
+        """The prefetched hint for `level`, if it is still valid, else None.
+
+        A prefetch that is still running is awaited rather than started again.
+        """
+        prefetch = session.hint_prefetch
+        session.hint_prefetch = None
+        if prefetch is None:
+            self.stats["misses"] += 1
+            return None
+        if prefetch.level != min(level, MAX_HINT_LEVEL) or prefetch.version != len(session.conversation_history):
+            self._discard(prefetch)
+            self.stats["misses"] += 1
+            return None
+
+        try:
+            hint = await asyncio.shield(prefetch.task)
+        except Exception:
+            # Counted in failures; the caller falls back to a normal hint call
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return hint
+
+    def _within_budget(self) -> bool:
+        if self._in_flight >= self.max_in_flight:
+            return False
+        calls = self.tutor.get_prompt_token_stats()["calls"]
+        return self.stats["started"] + 1 <= self.max_share * (calls + 1)
+
+    def _discard(self, prefetch: _Prefetch):
+        task = prefetch.task
+        if task.done():
+            if task.cancelled() or task.exception() is not None:
+                return
+        else:
+            task.cancel()
+        self.stats["wasted"] += 1
+
+    def _finished(self, task: asyncio.Future):
+        self._in_flight -= 1
+        if not task.cancelled() and task.exception() is not None:
+            self.stats["failures"] += 1
+
+    def get_stats(self) -> Dict:
+        requests = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "in_flight": self._in_flight,
+            "hit_rate": round(self.stats["hits"] / requests, 3) if requests else None,
+            "max_share": self.max_share
+        }
@@ -0,0 +1,198 @@
+import zlib
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.services.array_file import load_array, save_array
+from app.services.search_index import tokenize
+
+NUM_PERMUTATIONS = 64
+BANDS = 16               # 16 bands x 4 rows: pairs above ~0.5 Jaccard collide in some band
+SHINGLE_SIZE = 3
+# How far below a threshold a MinHash estimate may fall and still be checked
+# exactly (about three standard deviations of a 64-permutation estimate)
+ESTIMATE_SLACK = 0.15
+_PRIME = np.uint64(4294967311)   # smallest prime above 2**32
+_EMPTY = np.iinfo(np.uint64).max
+
+_rng = np.random.RandomState(20240611)
+_A = _rng.randint(1, 2 ** 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.randint(0, 2 ** 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def text_shingles(text: str) -> FrozenSet[int]:
+    """Hashed word 3-gram shingles of normalized problem text"""
+    tokens = tokenize(text)
+    if len(tokens) < SHINGLE_SIZE:
+        grams = [" ".join(tokens)] if tokens else []
+    else:
+        grams = [" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)]
+    return frozenset(zlib.crc32(gram.encode('utf-8')) for gram in grams)
+
+
+def numbers(text: str) -> Tuple[str, ...]:
+    """The numeric tokens of a text; variants of a problem usually differ only here"""
+    return tuple(sorted(token for token in tokenize(text) if token[0].isdigit()))
+
+
+def option_set(problem: Dict) -> FrozenSet[str]:
+    """Normalized option texts, ignoring labels and order"""
+    return frozenset(
+        " ".join(tokenize(str(option.get('text', ''))))
+        for option in problem.get('options') or [] if isinstance(option, dict)
+    )
+
+
+def jaccard(a: Set, b: Set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def duplicate_features(problem: Dict) -> Tuple[FrozenSet[int], Tuple[str, ...], FrozenSet[str]]:
+    """What duplicate_similarity compares: text shingles, numbers and option set"""
+    text = problem.get('text', '')
+    return text_shingles(text), numbers(text), option_set(problem)
+
+
+def duplicate_similarity(features: Tuple, candidate_features: Tuple, threshold: float) -> Optional[float]:
+    """Text similarity of two problems (as duplicate_features) if one is a
+    near-verbatim copy of the other, else None.
+
+    A copy has a shingle Jaccard of at least `threshold`, exactly the same
+    numbers and, when both have options, matching options.
+    """
+    shingles, values, options = features
+    candidate_shingles, candidate_values, candidate_options = candidate_features
+    similarity = jaccard(shingles, candidate_shingles)
+    if similarity < threshold or candidate_values != values:
+        return None
+    if options and candidate_options and jaccard(options, candidate_options) < threshold:
+        return None
+    return similarity
+
+
+def minhash(shingles: FrozenSet[int]) -> np.ndarray:
+    """MinHash signature over NUM_PERMUTATIONS universal hash functions"""
+    if not shingles:
+        return np.full(NUM_PERMUTATIONS, _EMPTY, dtype=np.uint64)
+    values = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+    hashed = (values[:, None] * _A[None, :] + _B[None, :]) % _PRIME
+    return hashed.min(axis=0)
+
+
+def _band_keys(signatures: np.ndarray) -> np.ndarray:
+    """(BANDS, n) keys, each combining one band's rows of each signature"""
+    rows = NUM_PERMUTATIONS // BANDS
+    banded = signatures.reshape(len(signatures), BANDS, rows)
+    keys = np.zeros((len(signatures), BANDS), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for r in range(rows):
+            keys = keys * np.uint64(1099511628211) + banded[:, :, r]
+    return keys.T
+
+
+class NearDuplicateIndex:
+    """MinHash LSH over problem text for finding pasted copies of bank problems.
+
+    Signatures are split into bands; problems sharing any whole band with
+    the query are candidates. Each band's keys are kept sorted, so a lookup
+    is one binary search per band. Candidates are then checked by exact
+    shingle Jaccard by the caller.
+    """
+
+    def __init__(self, signatures: np.ndarray, fingerprint: str = ""):
+        self.signatures = signatures
+        self.fingerprint = fingerprint
+        keys = _band_keys(np.asarray(signatures))
+        self._order = np.argsort(keys, axis=1, kind='stable')
+        self._sorted_keys = np.take_along_axis(keys, self._order, axis=1)
+        self.origin = "built"
+        self.computed = 0
+
+    @classmethod
+    def build(cls, problems: List[Optional[Dict]],
+              previous: Optional[Tuple[List[Optional[Dict]], "NearDuplicateIndex"]] = None,
+              fingerprint: str = "") -> "NearDuplicateIndex":
+        """Signatures for a snapshot's problems (None = removed).
+
+        Problems carried over unchanged from `previous` (same dict objects)
+        reuse their old signature.
+        """
+        signatures = np.full((len(problems), NUM_PERMUTATIONS), _EMPTY, dtype=np.uint64)
+        reuse: Dict[int, int] = {}
+        if previous is not None:
+            reuse = {id(problem): row for row, problem in enumerate(previous[0]) if problem is not None}
+        computed = 0
+        for position, problem in enumerate(problems):
+            if problem is None:
+                continue
+            row = reuse.get(id(problem))
+            if row is not None:
+                signatures[position] = previous[1].signatures[row]
+            else:
+                signatures[position] = minhash(text_shingles(problem.get('text', '')))
+                computed += 1
+        index = cls(signatures, fingerprint)
+        index.computed = computed
+        return index
+
+    def candidates(self, signature: np.ndarray) -> Set[int]:
+        """Positions sharing at least one band with `signature`"""
+        if not len(self.signatures) or signature[0] == _EMPTY:
+            return set()
+        keys = _band_keys(signature[None, :])[:, 0]
+        found: Set[int] = set()
+        for band, key in enumerate(keys):
+            sorted_keys = self._sorted_keys[band]
+            lo = np.searchsorted(sorted_keys, key, side='left')
+            hi = np.searchsorted(sorted_keys, key, side='right')
+            found.update(self._order[band, lo:hi].tolist())
+        return found
+
+    def candidate_pairs(self, min_similarity: float = 0.0, max_lag: int = 8) -> np.ndarray:
+        """(earlier, later) position pairs sharing at least one band, as an (n, 2) array.
+
+        Within each band, a position is paired with the up to `max_lag`
+        positions before it that have the same key, so a very common key
+        cannot blow up into a quadratic number of pairs. Pairs whose
+        signatures estimate a Jaccard similarity below min_similarity (less
+        ESTIMATE_SLACK) are dropped.
+        """
+        signatures = np.asarray(self.signatures)
+        present = signatures[:, 0] != _EMPTY if len(signatures) else np.zeros(0, dtype=bool)
+        found = []
+        for band in range(BANDS):
+            keys, order = self._sorted_keys[band], self._order[band]
+            for lag in range(1, min(max_lag, len(keys) - 1) + 1):
+                same = np.flatnonzero(keys[lag:] == keys[:-lag])
+                if not len(same):
+                    break
+                found.append(np.stack([order[same], order[same + lag]], axis=1))
+        if not found:
+            return np.zeros((0, 2), dtype=np.int64)
+        pairs = np.unique(np.sort(np.concatenate(found), axis=1), axis=0)
+        pairs = pairs[present[pairs[:, 0]] & present[pairs[:, 1]]]
+        if min_similarity > ESTIMATE_SLACK and len(pairs):
+            keep = np.concatenate([
+                (signatures[chunk[:, 0]] == signatures[chunk[:, 1]]).mean(axis=1) >= min_similarity - ESTIMATE_SLACK
+                for chunk in np.array_split(pairs, -(-len(pairs) // 100000))
+            ])
+            pairs = pairs[keep]
+        return pairs
+
+    def save(self, path: Path):
+        """Write the signatures and fingerprint to `path` (.npy), replacing any previous file atomically"""
+        save_array(path, self.signatures, self.fingerprint)
+
+    @classmethod
+    def load(cls, path: Path) -> "NearDuplicateIndex":
+        signatures, fingerprint = load_array(path)
+        index = cls(signatures, fingerprint)
+        index.origin = "loaded"
+        return index
+
+    def get_stats(self) -> Dict:
+        return {"signatures": int(len(self.signatures)), "origin": self.origin,
+                "computed_last_build": self.computed}
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.models.problem import ProblemSummary, SchemaIssue, validate_problem
+from app.services.near_duplicates import NearDuplicateIndex
+from app.services.search_index import SearchIndex
+from app.services.similarity import HashedNgramEmbedder, VectorIndex
+
+SCHEMA_VERSION = "2"
+
+
+def source_files(problems_dir: Path) -> List[Path]:
+    return sorted(Path(problems_dir).glob("*.json"))
+
+
+def source_fingerprint(problems_dir: Path) -> str:
+    """Cheap fingerprint of the JSON sources from file names, sizes and mtimes"""
+    digest = hashlib.sha256()
+    for path in source_files(problems_dir):
+        stat = path.stat()
+        digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def parse_source(data: bytes) -> List[Dict]:
+    """Parse the contents of one JSON problem file into a list of problems"""
+    problems = json.loads(data.decode('utf-8'))
+    return problems if isinstance(problems, list) else [problems]
+
+
+def validate_source(name: str, problems: List) -> Tuple[List[Tuple[int, ProblemSummary, Dict]], List[SchemaIssue]]:
+    """Validate the parsed problems of one file.
+
+    Returns (index in file, summary, heavy fields) for the valid problems
+    and the issues that rejected the others.
+    """
+    valid, issues = [], []
+    for index, problem in enumerate(problems):
+        record, problem_issues = validate_problem(problem, name, index)
+        if record is None:
+            issues.extend(problem_issues)
+        else:
+            valid.append((index, *record))
+    return valid, issues
+
+
+def unreadable_source(name: str, error: Exception) -> SchemaIssue:
+    """The issue recorded for a file that could not be read or parsed at all"""
+    return SchemaIssue(name, None, None, None, f"could not be read as JSON: {error}")
+
+
+def iter_source_problems(problems_dir: Path,
+                         issues: List[SchemaIssue]) -> Iterator[Tuple[str, int, ProblemSummary, Dict]]:
+    """Yield (source file name, index in file, summary, heavy fields) for every valid problem in the JSON sources.
+
+    Unreadable files and invalid problems are skipped and appended to `issues`.
+    """
+    for json_file in source_files(problems_dir):
+        try:
+            problems = parse_source(json_file.read_bytes())
+        except Exception as e:
+            issues.append(unreadable_source(json_file.name, e))
+            continue
+        valid, file_issues = validate_source(json_file.name, problems)
+        issues.extend(file_issues)
+        for index, summary, heavy in valid:
+            yield json_file.name, index, summary, heavy
+
+
+def duplicate_id_issue(source: str, index: int, problem_id: str, first_source: str) -> SchemaIssue:
+    return SchemaIssue(source, index, problem_id, 'id', f"duplicate id, already used in {first_source}")
+
+
+def search_index_path(bank_path: Path) -> Path:
+    """Where the search index compiled alongside a bank is stored"""
+    return Path(bank_path).with_suffix(".search.npz")
+
+
+def vector_index_path(bank_path: Path) -> Path:
+    """Where the problem embeddings compiled alongside a bank are stored"""
+    return Path(bank_path).with_suffix(".vectors.npy")
+
+
+def minhash_index_path(bank_path: Path) -> Path:
+    """Where the near-duplicate signatures compiled alongside a bank are stored"""
+    return Path(bank_path).with_suffix(".minhash.npy")
+
+
+def compile_problem_bank(problems_dir: Path, output_path: Path) -> Dict:
+    """Compile the valid problems of the JSON files into a single SQLite bank file.
+
+    Each row holds the compact JSON summary and the heavy fields separately,
+    so a loader can read all summaries in one pass and fetch heavy fields by
+    id. The file is written next to the target and renamed into place, so
+    readers never see a half-written bank. The BM25 search index over the
+    same problems, their embeddings and their MinHash signatures are saved
+    next to it. Problems that fail validation or reuse an earlier problem's
+    id are left out and listed in the result's `issues` (and in the bank,
+    so the loader reports them too).
+    """
+    fingerprint = source_fingerprint(problems_dir)
+    issues: List[SchemaIssue] = []
+    rows, first_source = [], {}
+    for source, index, summary, heavy in iter_source_problems(problems_dir, issues):
+        if summary.id in first_source:
+            issues.append(duplicate_id_issue(source, index, summary.id, first_source[summary.id]))
+            continue
+        first_source[summary.id] = f"{source}[{index}]"
+        rows.append((source, summary, heavy))
+    summaries = [summary for _, summary, _ in rows]
+    return write_problem_bank(
+        output_path, rows, fingerprint, issues,
+        SearchIndex.build(enumerate(summaries), len(summaries), fingerprint=fingerprint),
+        VectorIndex.build(summaries, HashedNgramEmbedder(), fingerprint=fingerprint),
+        NearDuplicateIndex.build(summaries, fingerprint=fingerprint),
+    )
+
+
+def _compact_json(value) -> str:
+    if isinstance(value, ProblemSummary):
+        value = value.to_dict()
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def write_problem_bank(output_path: Path, rows: Sequence[Tuple[str, Dict, Dict]], fingerprint: str,
+                       issues: List[SchemaIssue], search: SearchIndex, vectors: VectorIndex,
+                       duplicates: NearDuplicateIndex) -> Dict:
+    """Write (source, summary, heavy fields) rows and their prebuilt indexes as a compiled bank.
+
+    `fingerprint` is source_fingerprint() of the JSON files the rows were
+    read from, and the indexes must cover the rows in the same order and
+    carry the same fingerprint. Every file is written under a temporary name
+    first and the bank is renamed into place last, so a bank on disk never
+    sits next to side files from another build.
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    db = sqlite3.connect(str(tmp_path))
+    db.execute("PRAGMA journal_mode=OFF")
+    db.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    db.execute(
+        "CREATE TABLE problems ("
+        " position INTEGER PRIMARY KEY,"
+        " id TEXT UNIQUE,"
+        " source TEXT NOT NULL,"
+        " summary TEXT NOT NULL,"
+        " heavy TEXT NOT NULL)"
+    )
+    db.executemany(
+        "INSERT INTO problems (position, id, source, summary, heavy) VALUES (?, ?, ?, ?, ?)",
+        ((position, summary['id'], source, _compact_json(summary), _compact_json(heavy))
+         for position, (source, summary, heavy) in enumerate(rows))
+    )
+    db.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+        ("schema_version", SCHEMA_VERSION),
+        ("source_fingerprint", fingerprint),
+        ("problem_count", str(len(rows))),
+        ("schema_issues", json.dumps([issue.to_dict() for issue in issues], ensure_ascii=False)),
+    ])
+    db.commit()
+    db.execute("VACUUM")
+    db.close()
+
+    staged = []
+    for index, path in ((search, search_index_path(output_path)), (vectors, vector_index_path(output_path)),
+                        (duplicates, minhash_index_path(output_path))):
+        staged_path = path.with_suffix(path.suffix + ".tmp")
+        index.save(staged_path)
+        staged.append((staged_path, path))
+    staged.append((tmp_path, output_path))
+    for staged_path, path in staged:
+        os.replace(staged_path, path)
+    return {"problems": len(rows), "path": str(output_path), "bytes": output_path.stat().st_size,
+            "search_terms": len(search.terms), "issues": issues}
+
+
+class CompiledProblemBank:
+    """Read-only, memory-mapped view of a compiled problem bank"""
+
+    def __init__(self, path: Path, mmap_bytes: int = 256 * 1024 * 1024):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        self._db.execute(f"PRAGMA mmap_size={int(mmap_bytes)}")
+        self.meta = dict(self._db.execute("SELECT key, value FROM meta").fetchall())
+
+    def is_fresh(self, problems_dir: Path) -> bool:
+        """True if the bank was compiled from the current JSON sources"""
+        return (self.meta.get("schema_version") == SCHEMA_VERSION
+                and self.meta.get("source_fingerprint") == source_fingerprint(problems_dir))
+
+    def iter_summaries(self) -> Iterator[Tuple[str, ProblemSummary]]:
+        """Yield (source file name, summary) in bank order.
+
+        Summaries were validated when the bank was compiled, so they are
+        only turned into records here.
+        """
+        with self._lock:
+            for source, summary in self._db.execute("SELECT source, summary FROM problems ORDER BY position"):
+                yield source, ProblemSummary(json.loads(summary))
+
+    def schema_issues(self) -> List[SchemaIssue]:
+        """Problems left out of the bank when it was compiled"""
+        return [SchemaIssue(**issue) for issue in json.loads(self.meta.get("schema_issues", "[]"))]
+
+    def fetch_heavy(self, problem_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._db.execute("SELECT heavy FROM problems WHERE id = ?", (problem_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,313 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.models.problem import HEAVY_FIELDS, SchemaIssue, validate_problem
+from app.services.near_duplicates import (
+    NUM_PERMUTATIONS, NearDuplicateIndex, duplicate_features, duplicate_similarity, minhash, option_set,
+    text_shingles
+)
+from app.services.problem_bank import (
+    duplicate_id_issue, parse_source, source_files, source_fingerprint, unreadable_source, write_problem_bank
+)
+from app.services.search_index import SearchIndex, document_terms, tokenize
+from app.services.similarity import HashedNgramEmbedder, VectorIndex, problem_similarity_text
+
+INPUT_SUFFIXES = ('.json', '.jsonl')
+
+# JSONL lines per worker task
+BATCH_SIZE = 2000
+
+# Most problems per JSON file in the problems directory; smaller files keep hot reloads cheap
+SHARD_SIZE = 2000
+
+
+def stable_problem_id(problem: Dict) -> str:
+    """Content-derived id for a problem submitted without one.
+
+    The same question (up to case, spacing and notation) always gets the
+    same id, so importing a dump twice does not add it twice.
+    """
+    digest = hashlib.sha1(" ".join(tokenize(str(problem.get('text', '')))).encode('utf-8'))
+    for option in sorted(option_set(problem)):
+        digest.update(b"\x1f" + option.encode('utf-8'))
+    return f"JEE_{digest.hexdigest()[:12].upper()}"
+
+
+def expand_inputs(paths: Sequence[Path]) -> List[Path]:
+    """Input files: given .json/.jsonl files, plus all of them under given directories"""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*") if p.suffix in INPUT_SUFFIXES and p.is_file()))
+        elif path.is_file():
+            files.append(path)
+        else:
+            raise FileNotFoundError(f"No such file or directory: {path}")
+    return files
+
+
+def process_batch(source: str, first_index: int, lines: Optional[List[bytes]] = None,
+                  path: Optional[str] = None) -> Dict:
+    """Parse, validate and pre-index one batch of problems.
+
+    Runs in a worker process. Takes either `lines` of a JSONL file (the
+    first being line `first_index`) or the `path` of a JSON file. Problems
+    without an id get stable_problem_id(). Returns the valid problems with
+    their MinHash signatures, embeddings and search terms, so the parent
+    only has to deduplicate and write them.
+    """
+    issues: List[SchemaIssue] = []
+    if path is not None:
+        try:
+            items = list(enumerate(parse_source(Path(path).read_bytes())))
+        except Exception as e:
+            items = []
+            issues.append(unreadable_source(source, e))
+    else:
+        items = []
+        for index, line in enumerate(lines, start=first_index):
+            if not line.strip():
+                continue
+            try:
+                items.append((index, json.loads(line)))
+            except ValueError as e:
+                issues.append(SchemaIssue(source, index, None, None, f"not valid JSON: {e}"))
+
+    problems, indexes, generated_ids = [], [], 0
+    for index, problem in items:
+        if isinstance(problem, dict) and not problem.get('id'):
+            problem['id'] = stable_problem_id(problem)
+            generated_ids += 1
+        record, problem_issues = validate_problem(problem, source, index)
+        if record is None:
+            issues.extend(problem_issues)
+            continue
+        problems.append(problem)
+        indexes.append(index)
+
+    signatures = np.zeros((len(problems), NUM_PERMUTATIONS), dtype=np.uint64)
+    for row, problem in enumerate(problems):
+        signatures[row] = minhash(text_shingles(problem.get('text', '')))
+    return {
+        "problems": problems,
+        "indexes": indexes,
+        "issues": [issue.to_dict() for issue in issues],
+        "generated_ids": generated_ids,
+        "signatures": signatures,
+        "vectors": HashedNgramEmbedder().embed([problem_similarity_text(p) for p in problems]),
+        "terms": [document_terms(problem) for problem in problems],
+    }
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
+
+
+def _write_json_atomically(path: Path, data):
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class _Row:
+    """One valid problem read during ingestion"""
+
+    __slots__ = ("problem", "source", "index", "batch_row", "new")
+
+    def __init__(self, problem: Dict, source: str, index: int, batch_row: int, new: bool):
+        self.problem = problem
+        self.source = source        # file it came from (a problems-directory file name for existing rows)
+        self.index = index          # position (JSON) or line (JSONL) in that file
+        self.batch_row = batch_row  # row in the concatenated worker arrays
+        self.new = new
+
+
+def ingest_problems(inputs: Sequence[Path], problems_dir: Path, bank_path: Optional[Path],
+                    workers: int = 1, shard_size: int = SHARD_SIZE, duplicate_threshold: float = 0.8,
+                    check_near_duplicates: bool = True, dry_run: bool = False) -> Dict:
+    """Import problems from JSON/JSONL files and directories into the problem bank.
+
+    The problems already in `problems_dir` and the new ones are validated
+    and pre-indexed together on a process pool. New problems are rejected
+    (and reported) when invalid, when their id is taken by a different
+    problem, or when they are a near-verbatim copy of an earlier problem;
+    identical re-imports are skipped. Accepted problems are appended to
+    per-chapter JSON shards of at most `shard_size` problems, and the
+    compiled bank and its indexes are written from the same pass, so the
+    backend picks everything up without a separate build.
+    """
+    timings = {}
+    start = time.perf_counter()
+    problems_dir = Path(problems_dir)
+    problems_root = problems_dir.resolve()
+    new_files = [path for path in expand_inputs(inputs) if path.resolve().parent != problems_root]
+    existing_files = source_files(problems_dir) if problems_dir.exists() else []
+
+    # (source, first index, lines, path, new) per worker task, existing problems first
+    tasks = [(path.name, 0, None, str(path), False) for path in existing_files]
+    for path in new_files:
+        if path.suffix == '.jsonl':
+            lines = path.read_bytes().splitlines()
+            for first in range(0, len(lines), BATCH_SIZE):
+                tasks.append((str(path), first, lines[first:first + BATCH_SIZE], None, True))
+        else:
+            tasks.append((str(path), 0, None, str(path), True))
+
+    if workers > 1 and len(tasks) > 1:
+        # spawn, not fork, so this is also safe to call from the (threaded) server process
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [pool.submit(process_batch, source, first, lines, path)
+                       for source, first, lines, path, _ in tasks]
+            results = [future.result() for future in futures]
+    else:
+        results = [process_batch(source, first, lines, path) for source, first, lines, path, _ in tasks]
+    timings["validate_seconds"] = time.perf_counter() - start
+
+    # Duplicate ids: the first definition wins; an identical copy of a new problem is just skipped
+    phase = time.perf_counter()
+    stats = {"read": 0, "accepted": 0, "invalid": 0, "duplicate_ids": 0, "near_duplicates": 0,
+             "unchanged": 0, "generated_ids": 0}
+    issues: List[SchemaIssue] = []
+    bank_issues: List[SchemaIssue] = []
+    rows: List[_Row] = []
+    by_id: Dict[str, _Row] = {}
+    batch_row = 0
+    for (source, _, _, _, new), result in zip(tasks, results):
+        result_issues = [SchemaIssue(**issue) for issue in result["issues"]]
+        (issues if new else bank_issues).extend(result_issues)
+        if new:
+            invalid = len({issue.index for issue in result_issues if issue.index is not None})
+            stats["read"] += len(result["problems"]) + invalid
+            stats["invalid"] += invalid
+            stats["generated_ids"] += result["generated_ids"]
+        for problem, index in zip(result["problems"], result["indexes"]):
+            row = _Row(problem, source, index, batch_row, new)
+            batch_row += 1
+            first = by_id.get(problem['id'])
+            if first is None:
+                by_id[problem['id']] = row
+                rows.append(row)
+            elif new and first.problem == problem:
+                stats["unchanged"] += 1
+            else:
+                issue = duplicate_id_issue(source, index, problem['id'], f"{first.source}[{first.index}]")
+                if new:
+                    stats["duplicate_ids"] += 1
+                    issues.append(issue)
+                else:
+                    bank_issues.append(issue)
+    signatures = np.concatenate([r["signatures"] for r in results]) if results else \
+        np.zeros((0, NUM_PERMUTATIONS), dtype=np.uint64)
+    vectors = np.concatenate([r["vectors"] for r in results]) if results else \
+        np.zeros((0, HashedNgramEmbedder().dim), dtype=np.float32)
+    terms = [t for r in results for t in r["terms"]]
+    del results
+
+    # Near-duplicates: new problems that copy an earlier problem's text, numbers and options
+    rejected = set()
+    if check_near_duplicates and rows:
+        index = NearDuplicateIndex(signatures[[row.batch_row for row in rows]])
+        features: Dict[int, tuple] = {}
+        for a, b in index.candidate_pairs(duplicate_threshold).tolist():
+            if not rows[b].new or a in rejected or b in rejected:
+                continue
+            for position in (a, b):
+                if position not in features:
+                    features[position] = duplicate_features(rows[position].problem)
+            similarity = duplicate_similarity(features[b], features[a], duplicate_threshold)
+            if similarity is not None:
+                rejected.add(b)
+                issues.append(SchemaIssue(rows[b].source, rows[b].index, rows[b].problem['id'], 'text',
+                                          f"near-duplicate of {rows[a].problem['id']} "
+                                          f"({similarity:.2f} text similarity)"))
+        stats["near_duplicates"] = len(rejected)
+    timings["dedup_seconds"] = time.perf_counter() - phase
+
+    # Shards: new problems join their chapter's file until it is full
+    phase = time.perf_counter()
+    readable = {name for name in (path.name for path in existing_files)
+                if not any(i.source == name and i.index is None for i in bank_issues)}
+    counts: Dict[str, float] = {path.name: float('inf') for path in existing_files if path.name not in readable}
+    chapter_files: Dict[str, str] = {}
+    for row in rows:
+        if not row.new:
+            counts[row.source] = counts.get(row.source, 0) + 1
+            chapter_files.setdefault(row.problem.get('chapter'), row.source)
+
+    def shard_for(chapter: Optional[str]) -> str:
+        name = chapter_files.get(chapter)
+        if name is None or counts.get(name, 0) >= shard_size:
+            base, n = (_slug(chapter) if chapter else "") or "problems", 1
+            name = f"{base}_questions.json"
+            while counts.get(name, 0) >= shard_size:
+                n += 1
+                name = f"{base}_questions_{n}.json"
+            chapter_files[chapter] = name
+        counts[name] = counts.get(name, 0) + 1
+        return name
+
+    appended: Dict[str, List[_Row]] = {}
+    for position, row in enumerate(rows):
+        if row.new and position not in rejected:
+            appended.setdefault(shard_for(row.problem.get('chapter')), []).append(row)
+    stats["accepted"] = sum(len(shard) for shard in appended.values())
+
+    if not dry_run and appended:
+        problems_dir.mkdir(parents=True, exist_ok=True)
+        for name, shard in appended.items():
+            path = problems_dir / name
+            data = parse_source(path.read_bytes()) if path.exists() else []
+            data.extend(row.problem for row in shard)
+            _write_json_atomically(path, data)
+    timings["write_shards_seconds"] = time.perf_counter() - phase
+
+    # Bank: every accepted problem, in the order compile_problem_bank would read the shards
+    phase = time.perf_counter()
+    bank = None
+    if not dry_run and bank_path is not None:
+        by_file: Dict[str, List[_Row]] = {}
+        for row in rows:
+            if not row.new:
+                by_file.setdefault(row.source, []).append(row)
+        for name, shard in appended.items():
+            by_file.setdefault(name, []).extend(shard)
+        ordered = [(path.name, row) for path in source_files(problems_dir) for row in by_file.get(path.name, [])]
+        batch_rows = [row.batch_row for _, row in ordered]
+        fingerprint = source_fingerprint(problems_dir)
+        embedder = HashedNgramEmbedder()
+        bank = write_problem_bank(
+            bank_path,
+            [(name,
+              {k: v for k, v in row.problem.items() if k not in HEAVY_FIELDS},
+              {k: v for k, v in row.problem.items() if k in HEAVY_FIELDS}) for name, row in ordered],
+            fingerprint, bank_issues,
+            SearchIndex.build_from_terms(((position, terms[r]) for position, r in enumerate(batch_rows)),
+                                         len(ordered), fingerprint=fingerprint),
+            VectorIndex(vectors[batch_rows], embedder, fingerprint),
+            NearDuplicateIndex(signatures[batch_rows], fingerprint),
+        )
+    timings["write_bank_seconds"] = time.perf_counter() - phase
+    timings["total_seconds"] = time.perf_counter() - start
+
+    return {
+        **stats,
+        "inputs": len(new_files),
+        "existing": sum(1 for row in rows if not row.new),
+        "workers": workers,
+        "shards": {name: len(shard) for name, shard in sorted(appended.items())},
+        "bank": bank,
+        "issues": issues,
+        "timings": {name: round(seconds, 2) for name, seconds in timings.items()},
+        "problems_per_second": round(stats["read"] / timings["total_seconds"]) if timings["total_seconds"] else None,
+    }
@@ -0,0 +1,119 @@
+import random
+import threading
+import time
+from typing import Callable, Dict, TypeVar
+
+from google.api_core import exceptions as google_exceptions
+
+T = TypeVar("T")
+
+# Provider errors worth retrying: overload, rate limiting, timeouts, 5xx
+TRANSIENT_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.GatewayTimeout,
+    google_exceptions.DeadlineExceeded,
+    TimeoutError,
+    ConnectionError,
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while the circuit is open"""
+
+
+class CircuitBreaker:
+    """Fail fast when the upstream model keeps failing.
+
+    After `failure_threshold` consecutive failed calls the circuit opens and
+    calls are rejected immediately for `reset_timeout` seconds. Then a single
+    trial call is let through (half-open): success closes the circuit again,
+    failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.stats = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through now"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    self.stats["rejected"] += 1
+                    raise CircuitOpenError("Gemini circuit is open")
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+
+            if self.state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    self.stats["rejected"] += 1
+                    raise CircuitOpenError("Gemini circuit is half-open, trial call in flight")
+                self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self.stats["successes"] += 1
+            self.consecutive_failures = 0
+            self.state = self.CLOSED
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.stats["failures"] += 1
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.stats["opened"] += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def get_state(self) -> Dict:
+        with self._lock:
+            state = {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                **self.stats
+            }
+            if self.state == self.OPEN:
+                remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+                state["retry_in_seconds"] = round(max(0.0, remaining), 1)
+        return state
+
+
+def call_with_retry(fn: Callable[[float], T],
+                    max_retries: int,
+                    attempt_timeout: float,
+                    deadline: float,
+                    base_delay: float = 0.5,
+                    max_delay: float = 4.0) -> T:
+    """Call fn(timeout) and retry transient errors with full-jitter exponential backoff.
+
+    Each attempt gets at most `attempt_timeout` seconds and all attempts
+    together stay within `deadline` seconds.
+    """
+    start = time.monotonic()
+    attempt = 0
+    while True:
+        remaining = deadline - (time.monotonic() - start)
+        try:
+            return fn(max(0.1, min(attempt_timeout, remaining)))
+        except TRANSIENT_ERRORS:
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            attempt += 1
+            if attempt > max_retries or time.monotonic() - start + delay >= deadline:
+                raise
+            time.sleep(delay)
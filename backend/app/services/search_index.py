@@ -0,0 +1,227 @@
+import os
+import re
+import time
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Problem fields that are searched and how much a match in each one counts
+FIELD_WEIGHTS = {
+    'text': 1.0,
+    'subtopics': 2.0,
+    'concepts_required': 1.5,
+    'formulas_used': 1.0,
+}
+
+STOP_WORDS = frozenset("""
+a an and are as at be by for from has in is it its of on or that the this to was were which with
+""".split())
+
+_GREEK = {
+    'α': 'alpha', 'β': 'beta', 'γ': 'gamma', 'δ': 'delta', 'ε': 'epsilon', 'ζ': 'zeta',
+    'η': 'eta', 'θ': 'theta', 'ϑ': 'theta', 'κ': 'kappa', 'λ': 'lambda', 'μ': 'mu',
+    'ν': 'nu', 'ξ': 'xi', 'π': 'pi', 'ρ': 'rho', 'σ': 'sigma', 'ς': 'sigma', 'τ': 'tau',
+    'φ': 'phi', 'ϕ': 'phi', 'χ': 'chi', 'ψ': 'psi', 'ω': 'omega',
+}
+
+# British spellings, spelled-out units and alternative unit notations mapped to one token
+_ALIASES = {
+    'centre': 'center', 'fibre': 'fiber', 'vapour': 'vapor', 'aluminium': 'aluminum',
+    'meter': 'm', 'metre': 'm', 'second': 's', 'kilogram': 'kg', 'newton': 'n',
+    'joule': 'j', 'watt': 'w', 'radian': 'rad', 'kelvin': 'k',
+    'ms^-1': 'm/s', 'ms^-2': 'm/s^2', 'm/s2': 'm/s^2', 'm/sec': 'm/s',
+    'kmph': 'km/h', 'km/hr': 'km/h', 'kmh^-1': 'km/h', 'rads^-1': 'rad/s', 'rad/sec': 'rad/s',
+}
+
+_SUPERSCRIPT_RE = re.compile(r"[⁰¹²³⁴⁵⁶⁷⁸⁹⁻⁺]+")
+_SUPERSCRIPTS = str.maketrans("⁰¹²³⁴⁵⁶⁷⁸⁹⁻⁺", "0123456789-+")
+# Subscripts to digits, plus look-alike characters common in PDF and pasted text
+_CHAR_FOLD = str.maketrans({**{c: str(d) for d, c in enumerate("₀₁₂₃₄₅₆₇₈₉")},
+                            'µ': 'μ', '–': '-', '−': '-'})
+_EXPONENT = r"(?:\^[-+]?\d+)?"
+_TOKEN_RE = re.compile(
+    rf"[α-ωϑϕ]\d*{_EXPONENT}"
+    rf"|[a-z0-9]+(?:\.\d+)?{_EXPONENT}(?:/[a-z]+{_EXPONENT})?"
+)
+
+
+@lru_cache(maxsize=200000)
+def _normalize_token(token: str) -> str:
+    """Canonical form of one raw token, or '' for a stop word"""
+    if token[0] in _GREEK:
+        token = _GREEK[token[0]] + token[1:]
+    elif token.isalpha():
+        if token in STOP_WORDS:
+            return ""
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+    return _ALIASES.get(token, token)
+
+
+def tokenize(text: str) -> List[str]:
+    """Physics-aware tokenizer shared by indexing and queries.
+
+    Superscripts become exponents (r² -> r^2, s⁻¹ -> s^-1), subscripts
+    plain digits (v₀ -> v0), Greek letters their names (ω -> omega), and
+    unit and British spellings one canonical token (ms^-1, m/sec -> m/s;
+    centre -> center). Plurals are crudely folded by dropping a trailing 's'.
+    """
+    if not text:
+        return []
+    text = text.lower()
+    if not text.isascii():
+        text = _SUPERSCRIPT_RE.sub(lambda m: "^" + m.group().translate(_SUPERSCRIPTS),
+                                   text.translate(_CHAR_FOLD))
+    return [token for token in map(_normalize_token, _TOKEN_RE.findall(text)) if token]
+
+
+def _field_text(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(item) for item in value)
+    return str(value) if value is not None else ""
+
+
+def document_terms(problem: Dict) -> Dict[str, float]:
+    """Field-weighted term frequencies of one problem, as indexed"""
+    counts: Dict[str, float] = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in tokenize(_field_text(problem.get(field))):
+            counts[token] = counts.get(token, 0.0) + weight
+    return counts
+
+
+class SearchIndex:
+    """BM25 inverted index over problem positions.
+
+    Postings are stored per term as contiguous numpy slices of document
+    positions and precomputed BM25 impacts (idf * saturated tf), so a query
+    is one vectorised scatter-add per query term plus a partial sort.
+    """
+
+    def __init__(self, terms: List[str], offsets: np.ndarray, doc_ids: np.ndarray,
+                 impacts: np.ndarray, size: int, docs: int, fingerprint: str = ""):
+        self.terms = {term: i for i, term in enumerate(terms)}
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.impacts = impacts
+        self.size = size
+        self.docs = docs
+        self.fingerprint = fingerprint
+        self.origin = "built"
+        self.build_ms: Optional[float] = None
+
+    @classmethod
+    def build(cls, docs: Iterable[Tuple[int, Dict]], size: int,
+              k1: float = 1.2, b: float = 0.75, fingerprint: str = "") -> "SearchIndex":
+        """Index (position, problem) pairs; `size` is one past the largest position"""
+        return cls.build_from_terms(((position, document_terms(problem)) for position, problem in docs),
+                                    size, k1, b, fingerprint)
+
+    @classmethod
+    def build_from_terms(cls, docs: Iterable[Tuple[int, Dict[str, float]]], size: int,
+                         k1: float = 1.2, b: float = 0.75, fingerprint: str = "") -> "SearchIndex":
+        """Index (position, document_terms(problem)) pairs computed elsewhere, e.g. in worker processes"""
+        start = time.perf_counter()
+        vocab: Dict[str, int] = {}
+        post_terms, post_docs, post_tfs = array('i'), array('i'), array('f')
+        doc_len = np.zeros(size, dtype=np.float32)
+        count = 0
+        for position, counts in docs:
+            doc_len[position] = sum(counts.values())
+            count += 1
+            post_terms.extend([vocab.setdefault(token, len(vocab)) for token in counts])
+            post_docs.extend([position] * len(counts))
+            post_tfs.extend(counts.values())
+
+        # Group postings by term (in sorted term order), then by position
+        terms = sorted(vocab)
+        rank = np.empty(len(vocab), dtype=np.int64)
+        rank[[vocab[term] for term in terms]] = np.arange(len(terms))
+        term_ranks = rank[np.frombuffer(post_terms, dtype=np.int32)] if post_terms else np.zeros(0, np.int64)
+        doc_ids = np.frombuffer(post_docs, dtype=np.int32)
+        order = np.lexsort((doc_ids, term_ranks))
+        term_ranks, doc_ids = term_ranks[order], doc_ids[order]
+        tfs = np.frombuffer(post_tfs, dtype=np.float32)[order]
+
+        df = np.bincount(term_ranks, minlength=len(terms))
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(df, out=offsets[1:])
+        avgdl = float(doc_len.sum()) / count if count else 1.0
+        idf = np.log(1 + (count - df + 0.5) / (df + 0.5)).astype(np.float32)
+        norm = k1 * (1 - b + b * doc_len[doc_ids] / avgdl)
+        impacts = (idf[term_ranks] * tfs * (k1 + 1) / (tfs + norm)).astype(np.float32)
+
+        index = cls(terms, offsets, doc_ids.copy(), impacts, size, count, fingerprint)
+        index.build_ms = round((time.perf_counter() - start) * 1000, 1)
+        return index
+
+    def search(self, query: str, limit: int = 10, offset: int = 0,
+               allowed: Optional[np.ndarray] = None) -> Tuple[int, List[Tuple[int, float]]]:
+        """Rank documents for `query`. Returns (total matches, [(position, score)]) for one page.
+
+        `allowed` optionally restricts results to the given positions.
+        """
+        term_ids = [self.terms[t] for t in dict.fromkeys(tokenize(query)) if t in self.terms]
+        if not term_ids or self.size == 0:
+            return 0, []
+
+        scores = np.zeros(self.size, dtype=np.float32)
+        for i in term_ids:
+            start, end = self.offsets[i], self.offsets[i + 1]
+            scores[self.doc_ids[start:end]] += self.impacts[start:end]
+
+        candidates = np.flatnonzero(scores)
+        if allowed is not None:
+            candidates = np.intersect1d(candidates, allowed, assume_unique=True)
+        total = len(candidates)
+        wanted = offset + limit
+        if total == 0 or offset >= total:
+            return total, []
+
+        candidate_scores = scores[candidates]
+        if total > wanted:
+            # Keep everything scoring at least the page's last score, ties included
+            threshold = np.partition(candidate_scores, total - wanted)[total - wanted]
+            keep = candidate_scores >= threshold
+            candidates, candidate_scores = candidates[keep], candidate_scores[keep]
+        # Highest score first; candidates are in bank order, which the stable sort keeps for ties
+        order = np.argsort(-candidate_scores, kind='stable')[offset:wanted]
+        return total, [(int(candidates[i]), float(candidate_scores[i])) for i in order]
+
+    def save(self, path: Path):
+        """Write the index to `path` (.npz), replacing any previous file atomically"""
+        path = Path(path)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        terms = sorted(self.terms, key=self.terms.get)
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                terms=np.array(terms, dtype=np.str_),
+                offsets=self.offsets,
+                doc_ids=self.doc_ids,
+                impacts=self.impacts,
+                shape=np.array([self.size, self.docs], dtype=np.int64),
+                fingerprint=np.array(self.fingerprint),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "SearchIndex":
+        with np.load(path, allow_pickle=False) as data:
+            size, docs = (int(v) for v in data['shape'])
+            index = cls(data['terms'].tolist(), data['offsets'], data['doc_ids'],
+                        data['impacts'], size, docs, str(data['fingerprint']))
+        index.origin = "loaded"
+        return index
+
+    def get_stats(self) -> Dict:
+        return {
+            "documents": self.docs,
+            "terms": len(self.terms),
+            "postings": int(len(self.doc_ids)),
+            "origin": self.origin,
+            "build_ms": self.build_ms,
+        }
@@ -0,0 +1,86 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+class TutoringSession:
+    """Server-side state of one tutoring conversation"""
+
+    __slots__ = ("id", "problem", "conversation_history", "hint_level", "hint_prefetch", "created_at",
+                 "last_active")
+
+    def __init__(self, session_id: str, problem: Dict):
+        self.id = session_id
+        self.problem = problem
+        self.conversation_history: List[Dict] = []
+        self.hint_level = 0
+        self.hint_prefetch = None  # speculative next hint, see hint_prefetch.HintPrefetcher
+        self.created_at = time.time()
+        self.last_active = self.created_at
+
+    def add_message(self, role: str, content: str):
+        self.conversation_history.append({"role": role, "content": content})
+
+
+class SessionStore:
+    """Bounded in-memory store of tutoring sessions.
+
+    Sessions are kept in least-recently-used order; the oldest one is
+    dropped when max_sessions is exceeded, and sessions idle for longer
+    than idle_timeout seconds are dropped on access.
+    """
+
+    def __init__(self, max_sessions: int = 10000, idle_timeout: float = 3600):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions: "OrderedDict[str, TutoringSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"created": 0, "expired": 0, "evicted": 0}
+
+    def create(self, problem: Dict) -> TutoringSession:
+        """Start a new session for a problem"""
+        session = TutoringSession(uuid.uuid4().hex, problem)
+        with self._lock:
+            self._expire_idle(session.created_at)
+            self._sessions[session.id] = session
+            self.stats["created"] += 1
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.stats["evicted"] += 1
+        return session
+
+    def get(self, session_id: str) -> Optional[TutoringSession]:
+        """Return a live session and mark it active, or None if unknown/expired"""
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if now - session.last_active > self.idle_timeout:
+                del self._sessions[session_id]
+                self.stats["expired"] += 1
+                return None
+            session.last_active = now
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _expire_idle(self, now: float):
+        # Least recently active sessions sit at the front
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_active <= self.idle_timeout:
+                break
+            self._sessions.popitem(last=False)
+            self.stats["expired"] += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["active"] = len(self._sessions)
+        return stats
@@ -0,0 +1,160 @@
+import math
+import zlib
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.array_file import load_array, save_array
+from app.services.search_index import tokenize
+
+# 128 dimensions keep a 100k-problem bank at ~50 MB and a lookup at a few ms
+EMBEDDING_DIM = 128
+
+# Problem fields that describe what a problem is about, for similarity
+SIMILARITY_FIELDS = ('topic', 'subtopics', 'concepts_required', 'text')
+
+
+@lru_cache(maxsize=500000)
+def _bucket(feature: str, dim: int) -> Tuple[int, float]:
+    """Stable hashed bucket and sign for a feature (crc32, not the salted str hash)"""
+    h = zlib.crc32(feature.encode('utf-8'))
+    return h % dim, (1.0 if h & 0x80000000 else -1.0)
+
+
+def problem_similarity_text(problem: Dict) -> str:
+    parts = []
+    for field in SIMILARITY_FIELDS:
+        value = problem.get(field)
+        if isinstance(value, (list, tuple)):
+            parts.extend(str(item) for item in value)
+        elif value:
+            parts.append(str(value))
+    return " ".join(parts)
+
+
+class HashedNgramEmbedder:
+    """Local, deterministic text embedder - no model download or network.
+
+    Physics-aware word unigrams and bigrams plus character trigrams of
+    each word are hashed (with a sign bit) into a fixed number of
+    dimensions, weighted by log term frequency and L2-normalised, so the
+    dot product of two embeddings is their cosine similarity.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM, char_ngram_weight: float = 0.5):
+        self.dim = dim
+        self.char_ngram_weight = char_ngram_weight
+
+    def _features(self, text: str) -> Dict[str, float]:
+        tokens = tokenize(text)
+        features: Dict[str, float] = {}
+        counts = Counter(tokens)
+        counts.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+        for feature, count in counts.items():
+            features[feature] = 1.0 + math.log(count)
+        for token in set(tokens):
+            if len(token) > 3:
+                padded = f"#{token}#"
+                for i in range(len(padded) - 2):
+                    gram = "~" + padded[i:i + 3]
+                    features[gram] = features.get(gram, 0.0) + self.char_ngram_weight
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed a batch of texts into a (len(texts), dim) float32 matrix"""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            vector = matrix[row]
+            for feature, weight in self._features(text).items():
+                bucket, sign = _bucket(feature, self.dim)
+                vector[bucket] += sign * weight
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+class VectorIndex:
+    """Row-per-position embedding matrix with batched cosine top-k.
+
+    Rows of removed problems are all zeros and never match.
+    """
+
+    def __init__(self, matrix: np.ndarray, embedder: HashedNgramEmbedder, fingerprint: str = ""):
+        self.matrix = matrix
+        self.embedder = embedder
+        self.fingerprint = fingerprint
+        self.origin = "built"
+        self.embedded = 0
+
+    @classmethod
+    def build(cls, problems: List[Optional[Dict]], embedder: HashedNgramEmbedder,
+              previous: Optional[Tuple[List[Optional[Dict]], "VectorIndex"]] = None,
+              fingerprint: str = "") -> "VectorIndex":
+        """Embed a snapshot's problems (None = removed).
+
+        `previous` is the (problems, index) pair of the snapshot this one
+        was derived from: problems carried over unchanged (the same dict
+        objects) reuse their old row instead of being embedded again.
+        """
+        matrix = np.zeros((len(problems), embedder.dim), dtype=np.float32)
+        reuse: Dict[int, int] = {}
+        if previous is not None and previous[1].matrix.shape[1] == embedder.dim:
+            reuse = {id(problem): row for row, problem in enumerate(previous[0]) if problem is not None}
+
+        copy_to, copy_from, fresh = [], [], []
+        for position, problem in enumerate(problems):
+            if problem is None:
+                continue
+            row = reuse.get(id(problem))
+            if row is None:
+                fresh.append(position)
+            else:
+                copy_to.append(position)
+                copy_from.append(row)
+        if copy_to:
+            matrix[copy_to] = previous[1].matrix[copy_from]
+        if fresh:
+            matrix[fresh] = embedder.embed([problem_similarity_text(problems[p]) for p in fresh])
+
+        index = cls(matrix, embedder, fingerprint)
+        index.embedded = len(fresh)
+        return index
+
+    def top_k(self, queries: np.ndarray, k: int,
+              exclude: Optional[Sequence[Optional[int]]] = None) -> List[List[Tuple[int, float]]]:
+        """Best k (position, cosine) pairs for each row of a (n, dim) query matrix.
+
+        exclude[i], if given, is a position to leave out of row i's results.
+        """
+        if len(self.matrix) == 0 or k <= 0:
+            return [[] for _ in range(len(queries))]
+        scores = queries @ self.matrix.T
+        for row, position in enumerate(exclude or []):
+            if position is not None:
+                scores[row, position] = -np.inf
+        k = min(k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in enumerate(top):
+            candidates = candidates[np.argsort(-scores[row, candidates], kind='stable')]
+            results.append([(int(p), float(scores[row, p])) for p in candidates if scores[row, p] > 0])
+        return results
+
+    def save(self, path: Path):
+        """Write the matrix and fingerprint to `path` (.npy), replacing any previous file atomically"""
+        save_array(path, self.matrix, self.fingerprint)
+
+    @classmethod
+    def load(cls, path: Path, embedder: HashedNgramEmbedder) -> "VectorIndex":
+        """Memory-map a saved matrix, so workers share its pages"""
+        matrix, fingerprint = load_array(path)
+        index = cls(matrix, embedder, fingerprint)
+        index.origin = "loaded"
+        return index
+
+    def get_stats(self) -> Dict:
+        return {"rows": int(self.matrix.shape[0]), "dim": int(self.matrix.shape[1]),
+                "origin": self.origin, "embedded_last_build": self.embedded}
@@ -0,0 +1,72 @@
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+def prompt_fingerprint(prompt: str) -> str:
+    """Key identifying an LLM call by the exact prompt it sends"""
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+
+class SingleFlight:
+    """Coalesce identical concurrent async calls into one shared execution.
+
+    The first caller for a key starts the work as an independent task;
+    callers arriving while it is still running await the same task instead
+    of starting their own. Because the task is shielded, a caller that goes
+    away (client disconnect) does not cancel the work for everyone else.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"calls": 0, "executions": 0, "deduplicated": 0}
+
+    def _register(self, key: str, future: asyncio.Future):
+        self._inflight[key] = future
+        self.stats["executions"] += 1
+
+        def forget(done: asyncio.Future):
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+            # Mark a failure as retrieved even when nobody else was waiting
+            if not done.cancelled():
+                done.exception()
+
+        future.add_done_callback(forget)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() for key, or wait for the identical call already running"""
+        self.stats["calls"] += 1
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._register(key, future)
+        else:
+            self.stats["deduplicated"] += 1
+        return await asyncio.shield(future)
+
+    def join(self, key: str) -> Optional[Awaitable[Any]]:
+        """Awaitable for a call already running under key, or None"""
+        future = self._inflight.get(key)
+        if future is None:
+            return None
+        self.stats["calls"] += 1
+        self.stats["deduplicated"] += 1
+        return asyncio.shield(future)
+
+    def lead(self, key: str) -> asyncio.Future:
+        """Register the caller as the producer for key.
+
+        Used when the result is assembled incrementally (streaming); the
+        caller must resolve the returned future with the final result or an
+        exception so that joined callers are released.
+        """
+        self.stats["calls"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._register(key, future)
+        return future
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        stats["in_flight"] = len(self._inflight)
+        return stats
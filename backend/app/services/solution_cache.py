@@ -0,0 +1,162 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace so trivially different pastes match"""
+    return re.sub(r"\s+", " ", (text or "")).strip().lower()
+
+
+def solution_cache_key(problem: Dict) -> str:
+    """Stable key for a problem from its normalized text, topic and options"""
+    options = sorted(
+        (normalize_text(str(opt.get('id', ''))), normalize_text(opt.get('text', '')))
+        for opt in problem.get('options') or []
+    )
+    payload = json.dumps([
+        normalize_text(problem.get('text', '')),
+        normalize_text(problem.get('topic', '')),
+        options
+    ], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SolutionCache:
+    """Two-tier cache for AI-generated solutions.
+
+    Recent entries live in an in-memory LRU; everything is also written to
+    a SQLite file so solutions survive restarts and are shared by workers.
+    Both tiers honour the same TTL, and each tier has its own size limit.
+    Disk eviction counts rows inside the writing transaction, so the limit
+    holds however many processes share the file.
+    """
+
+    def __init__(self,
+                 db_path: Optional[str] = None,
+                 memory_size: int = 256,
+                 disk_size: int = 10000,
+                 ttl_seconds: float = 30 * 24 * 3600):
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.ttl_seconds = ttl_seconds
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        self._db = None
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS solutions ("
+                " key TEXT PRIMARY KEY,"
+                " solution TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_solutions_accessed ON solutions(accessed_at)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_solutions_created ON solutions(created_at)"
+            )
+            self._db.commit()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached solution for key, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                solution, created_at = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return solution
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT solution, created_at FROM solutions WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    solution, created_at = row
+                    if not self._expired(created_at, now):
+                        self._db.execute(
+                            "UPDATE solutions SET accessed_at = ? WHERE key = ?", (now, key)
+                        )
+                        self._db.commit()
+                        self._remember(key, solution, created_at)
+                        self.stats["disk_hits"] += 1
+                        return solution
+                    self._db.execute("DELETE FROM solutions WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key: str, solution: str):
+        """Store a solution in both tiers"""
+        now = time.time()
+        with self._lock:
+            self._remember(key, solution, now)
+
+            if self._db is not None:
+                # Take the write lock up front so no other worker writes between the count and the eviction
+                self._db.execute("BEGIN IMMEDIATE")
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO solutions (key, solution, created_at, accessed_at)"
+                        " VALUES (?, ?, ?, ?)",
+                        (key, solution, now, now)
+                    )
+                    self._evict_disk(now)
+                except Exception:
+                    self._db.rollback()
+                    raise
+                self._db.commit()
+
+    def _remember(self, key: str, solution: str, created_at: float):
+        self._memory[key] = (solution, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _evict_disk(self, now: float):
+        """Drop expired rows, then the least recently used ones above disk_size"""
+        self._db.execute("DELETE FROM solutions WHERE created_at < ?", (now - self.ttl_seconds,))
+
+        overflow = self._disk_rows() - self.disk_size
+        if overflow > 0:
+            cursor = self._db.execute(
+                "DELETE FROM solutions WHERE key IN ("
+                " SELECT key FROM solutions ORDER BY accessed_at LIMIT ?)",
+                (overflow,)
+            )
+            self.stats["evictions"] += max(cursor.rowcount, 0)
+
+    def _disk_rows(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters plus current tier sizes"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_entries"] = self._disk_rows() if self._db is not None else 0
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
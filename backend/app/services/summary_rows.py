@@ -0,0 +1,63 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.models.problem import ProblemSummary
+
+
+def _fragment(field: str, value) -> str:
+    return f"{json.dumps(field)}:{json.dumps(value, ensure_ascii=False)}"
+
+
+class SummaryRowCache:
+    """LRU of problem summaries pre-serialized to JSON, one fragment per field.
+
+    A listing row is then just its fragments joined, for any projection,
+    so encoding a page costs the same however large the bank is. Entries
+    are keyed by problem id and remember the record they were made from,
+    so a problem changed by a reload is serialized again.
+    """
+
+    def __init__(self, max_problems: int = 10000):
+        self.max_problems = max_problems
+        self._rows: "OrderedDict[str, Tuple[ProblemSummary, Dict[str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _fragments(self, summary: ProblemSummary) -> Dict[str, str]:
+        with self._lock:
+            entry = self._rows.get(summary.id)
+            if entry is not None and entry[0] is summary:
+                self._rows.move_to_end(summary.id)
+                self.stats["hits"] += 1
+                return entry[1]
+            self.stats["misses"] += 1
+
+        fragments = {field: _fragment(field, value) for field, value in summary.items()}
+        with self._lock:
+            self._rows[summary.id] = (summary, fragments)
+            self._rows.move_to_end(summary.id)
+            while len(self._rows) > self.max_problems:
+                self._rows.popitem(last=False)
+        return fragments
+
+    def rows(self, summaries: Iterable[ProblemSummary], fields: Optional[Sequence[str]] = None,
+             extra: Optional[Sequence[Dict]] = None) -> List[str]:
+        """JSON objects for `summaries` with only `fields` (all if None), in that order.
+
+        extra[i], if given, holds per-request values (e.g. a score) added to row i.
+        """
+        rows = []
+        for i, summary in enumerate(summaries):
+            fragments = self._fragments(summary)
+            parts = [fragments[field] for field in fields if field in fragments] if fields is not None \
+                else list(fragments.values())
+            if extra is not None:
+                parts.extend(_fragment(field, value) for field, value in extra[i].items()
+                             if fields is None or field in fields)
+            rows.append("{" + ",".join(parts) + "}")
+        return rows
+
+    def get_stats(self) -> Dict:
+        return {"problems": len(self._rows), "max_problems": self.max_problems, **self.stats}
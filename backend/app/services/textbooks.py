@@ -0,0 +1,186 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.services.conversation_window import estimate_tokens
+from app.services.search_index import SearchIndex
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # optional - without it the tutor runs without textbook passages
+    PdfReader = None
+
+logger = logging.getLogger(__name__)
+
+# Bump when chunking changes so cached chunks are re-extracted
+CHUNKER_VERSION = 1
+CHUNK_WORDS = 160
+CHUNK_OVERLAP_WORDS = 40
+MIN_CHUNK_WORDS = 30
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _iter_page_words(path: Path) -> Iterator[tuple]:
+    """Yield (page number, word) one page at a time, so a whole book is never held as text"""
+    reader = PdfReader(str(path))
+    for page_number, page in enumerate(reader.pages, start=1):
+        text = page.extract_text() or ""
+        # Re-join words hyphenated across line breaks
+        text = re.sub(r"-\n(\w)", r"\1", text)
+        for word in text.split():
+            yield page_number, word
+
+
+def extract_chunks(path: str) -> List[Dict]:
+    """Split a PDF into overlapping word-window passages tagged with their start page.
+
+    Runs in a worker process during ingestion.
+    """
+    logging.getLogger("pypdf").setLevel(logging.ERROR)
+    source = Path(path).name
+    chunks = []
+    window: List[tuple] = []
+
+    def emit():
+        if len(window) >= MIN_CHUNK_WORDS:
+            chunks.append({
+                "source": source,
+                "page": window[0][0],
+                "text": " ".join(word for _, word in window),
+            })
+
+    for page_word in _iter_page_words(Path(path)):
+        window.append(page_word)
+        if len(window) >= CHUNK_WORDS:
+            emit()
+            window = window[CHUNK_WORDS - CHUNK_OVERLAP_WORDS:]
+    if len(window) > CHUNK_OVERLAP_WORDS:
+        emit()
+    return chunks
+
+
+class TextbookLibrary:
+    """Passages from the bundled NCERT textbooks, retrievable by BM25.
+
+    ingest() extracts every PDF in textbooks_dir, in parallel worker
+    processes, and caches the passages per file content hash, so only new
+    or changed PDFs are extracted again. Until ingestion finishes,
+    retrieve() simply returns no passages.
+    """
+
+    def __init__(self, textbooks_dir: Path, cache_dir: Path, max_workers: int = 2):
+        self.textbooks_dir = Path(textbooks_dir)
+        self.cache_dir = Path(cache_dir)
+        self.max_workers = max_workers
+        # (passages, index over them), published in one assignment so a
+        # concurrent retrieve() never pairs an index with other passages
+        self._corpus: Optional[Tuple[List[Dict], SearchIndex]] = None
+        self.stats = {"files": 0, "extracted": 0, "cached": 0, "chunks": 0,
+                      "ingest_seconds": None, "retrievals": 0, "error": None}
+        self._thread: Optional[threading.Thread] = None
+
+    def _cache_path(self, digest: str) -> Path:
+        return self.cache_dir / f"{digest}.v{CHUNKER_VERSION}.json"
+
+    def ingest(self):
+        """Extract (or load from cache) all textbook passages and index them"""
+        start = time.perf_counter()
+        if PdfReader is None:
+            self.stats["error"] = "pypdf is not installed"
+            logger.warning("pypdf is not installed - textbook passages are disabled")
+            return
+        pdfs = sorted(self.textbooks_dir.glob("*.pdf"))
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        chunks_by_file: Dict[Path, List[Dict]] = {}
+        pending: Dict[Path, str] = {}
+        for pdf in pdfs:
+            digest = file_digest(pdf)
+            cache_path = self._cache_path(digest)
+            if cache_path.exists():
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    chunks_by_file[pdf] = json.load(f)
+                self.stats["cached"] += 1
+            else:
+                pending[pdf] = digest
+
+        if pending:
+            # spawn, not fork: the server process already runs threads
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(pending)),
+                                     mp_context=multiprocessing.get_context("spawn")) as pool:
+                futures = {pdf: pool.submit(extract_chunks, str(pdf)) for pdf in pending}
+                for pdf, future in futures.items():
+                    try:
+                        chunks_by_file[pdf] = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to extract {pdf.name}: {e}")
+                        continue
+                    self._write_cache(self._cache_path(pending[pdf]), chunks_by_file[pdf])
+                    self.stats["extracted"] += 1
+
+        chunks = [chunk for pdf in pdfs for chunk in chunks_by_file.get(pdf, [])]
+        index = SearchIndex.build(enumerate(chunks), len(chunks))
+        self._corpus = (chunks, index)
+        self.stats["files"] = len(pdfs)
+        self.stats["chunks"] = len(chunks)
+        self.stats["ingest_seconds"] = round(time.perf_counter() - start, 2)
+        logger.info(f"Textbooks ingested: {len(chunks)} passages from {len(pdfs)} files "
+                    f"({self.stats['extracted']} extracted, {self.stats['cached']} cached) "
+                    f"in {self.stats['ingest_seconds']}s")
+
+    def _write_cache(self, path: Path, chunks: List[Dict]):
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(chunks, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def start_ingest(self):
+        """Run ingest() in a background thread so startup is not delayed"""
+        if self._thread is not None:
+            return
+
+        def run():
+            try:
+                self.ingest()
+            except Exception as e:
+                self.stats["error"] = str(e)
+                logger.error(f"Textbook ingestion failed: {e}", exc_info=True)
+
+        self._thread = threading.Thread(target=run, name="textbook-ingest", daemon=True)
+        self._thread.start()
+
+    def retrieve(self, query: str, token_budget: int, limit: int = 3) -> List[Dict]:
+        """Best-matching passages for `query`, as many as fit in `token_budget`"""
+        corpus = self._corpus
+        if corpus is None or not query or token_budget <= 0:
+            return []
+        chunks, index = corpus
+        self.stats["retrievals"] += 1
+        _, hits = index.search(query, limit=limit)
+        passages, used = [], 0
+        for position, _ in hits:
+            chunk = chunks[position]
+            cost = estimate_tokens(chunk["text"])
+            if used + cost > token_budget:
+                continue
+            passages.append(chunk)
+            used += cost
+        return passages
+
+    def get_stats(self) -> Dict:
+        return dict(self.stats, ready=self._corpus is not None)
@@ -1,82 +1,702 @@
+import base64
+import bisect
+import hashlib
 import json
+import logging
 import os
+import threading
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Any, Tuple
+
+import numpy as np
+
+from app.models.problem import ProblemSummary, SchemaIssue
+from app.services.problem_bank import (
+    CompiledProblemBank, minhash_index_path, parse_source, search_index_path, source_files,
+    unreadable_source, validate_source, vector_index_path
+)
+from app.services.near_duplicates import (
+    NUM_PERMUTATIONS, NearDuplicateIndex, duplicate_features, duplicate_similarity, minhash
+)
+from app.services.search_index import SearchIndex
+from app.services.similarity import HashedNgramEmbedder, VectorIndex, problem_similarity_text
+from app.services.summary_rows import SummaryRowCache
+
+logger = logging.getLogger(__name__)
+
+# Fields with a hash index built at load time. List-valued fields (subtopics)
+# are indexed under each of their values.
+INDEXED_FIELDS = {
+    'chapter': 'chapter',
+    'topic': 'topic',
+    'subtopic': 'subtopics',
+    'difficulty': 'difficulty',
+    'year': 'year',
+    'exam': 'exam',
+}
+
+# Deepest search result a page may start at, whether asked for by offset or cursor
+MAX_SEARCH_OFFSET = 10000
+
+class _FileState:
+    """What the current snapshot holds for one JSON source file"""
+
+    __slots__ = ("mtime_ns", "size", "digest", "positions")
+
+    def __init__(self, mtime_ns: int, size: int, digest: Optional[str], positions: List[int]):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = digest        # sha256 of the file contents, None until first read
+        self.positions = positions  # positions of this file's problems in the snapshot
+
+
+class _Snapshot:
+    """Immutable view of the problem bank.
+
+    Never modified once published: reloads build a new snapshot and swap
+    it in with a single assignment, so a request that grabbed the old one
+    keeps a consistent view until it finishes. Problems removed by a
+    reload leave a None tombstone until the next compaction, so positions
+    held in the indexes stay valid. `numbering` only changes when
+    positions are renumbered (a full load or a compaction); until then a
+    position always refers to the same problem or its tombstone.
+    """
+
+    __slots__ = ("problems", "by_id", "indexes", "heavy", "files", "tombstones", "search", "vectors",
+                 "duplicates", "numbering")
+
+    def __init__(self):
+        self.problems: List[Optional[ProblemSummary]] = []
+        self.by_id: Dict[str, int] = {}
+        self.indexes: Dict[str, Dict[Any, List[int]]] = {name: {} for name in INDEXED_FIELDS}
+        self.heavy: Dict[str, Dict] = {}
+        self.files: Dict[str, _FileState] = {}
+        self.tombstones = 0
+        self.search: Optional[SearchIndex] = None
+        self.vectors: Optional[VectorIndex] = None
+        self.duplicates: Optional[NearDuplicateIndex] = None
+        self.numbering = ""
+
+
+def _numbering(snapshot: _Snapshot) -> str:
+    """Identifies how a freshly numbered snapshot assigned its positions.
+
+    Positions are assigned file by file, so the same files (by name, size
+    and mtime) number their problems the same way in every worker.
+    """
+    layout = [(name, state.size, state.mtime_ns, len(state.positions)) for name, state in snapshot.files.items()]
+    return hashlib.sha1(json.dumps(layout).encode()).hexdigest()[:12]
+
+
+def _index_values(problem: ProblemSummary, field: str) -> List:
+    value = problem.get(field)
+    values = value if isinstance(value, (list, tuple)) else [value]
+    return [item for item in values if item is not None]
+
+
+def _check_filters(filters: Dict):
+    unknown = set(filters) - set(INDEXED_FIELDS)
+    if unknown:
+        raise ValueError(f"Unsupported filters: {', '.join(sorted(unknown))}")
+
+
+def _encode_cursor(*parts) -> str:
+    """Opaque pagination cursor (URL-safe) for the given JSON-able parts"""
+    return base64.urlsafe_b64encode(json.dumps(parts, separators=(',', ':')).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> list:
+    try:
+        kind, position, key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor") from None
+    if not isinstance(position, int) or position < 0:
+        raise ValueError("Invalid cursor")
+    return [kind, position, key]
+
+
+def _query_hash(query: str, filters: Dict) -> str:
+    active = sorted((name, str(value)) for name, value in filters.items() if value is not None and value != '')
+    return hashlib.sha1(json.dumps([query, active]).encode()).hexdigest()[:12]
+
 
 class ProblemLoader:
-    """Utility class to load and manage JEE physics problems"""
+    """Utility class to load and manage JEE physics problems.
 
-    def __init__(self, problems_dir: str = None):
+    Only compact problem summary records (see app.models.problem for the
+    schema and what is left out) are kept in memory and returned by
+    listings and queries. Problems that fail schema validation are skipped
+    and reported, per file, in schema_issues.
+    get_problem_by_id returns the full problem. When a compiled bank that
+    matches the JSON sources is available, heavy fields are read from it on
+    demand instead of being held in memory.
+
+    reload() picks up edited, added and removed JSON files without a
+    restart; start_watching() runs it periodically in a background thread.
+    """
+
+    # Compact (renumber positions) once tombstones exceed this share of the bank
+    COMPACT_RATIO = 0.25
+
+    def __init__(self, problems_dir: str = None, bank_path: str = None, duplicate_threshold: float = 0.8,
+                 row_cache_size: int = 10000):
         if problems_dir is None:
             # Default to backend/data/problems
             backend_dir = Path(__file__).parent.parent.parent
             problems_dir = backend_dir / "data" / "problems"
         self.problems_dir = Path(problems_dir)
-        self.problems = []
+        self.bank_path = Path(bank_path) if bank_path else None
+        self._snapshot = _Snapshot()
+        self._bank: Optional[CompiledProblemBank] = None
+        self.embedder = HashedNgramEmbedder()
+        self.duplicate_threshold = duplicate_threshold
+        self.row_cache = SummaryRowCache(row_cache_size)
+        self.source = "json"
+        self._reload_lock = threading.Lock()
+        self._watch_stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.schema_issues: Dict[str, List[SchemaIssue]] = {}
+        self.reload_stats = {"reloads": 0, "errors": 0, "last_reload_ms": None,
+                             "last_reload_at": None, "last_changed_files": []}
         self.load_all_problems()
 
+    @property
+    def problems(self) -> List[ProblemSummary]:
+        return [p for p in self._snapshot.problems if p is not None]
+
     def load_all_problems(self):
-        """Load all problems from JSON files in the problems directory"""
-        self.problems = []
+        """Load problem summaries from the compiled bank, or from the JSON files"""
+        with self._reload_lock:
+            if self._bank is not None:
+                self._bank.close()
+                self._bank = None
+
+            snapshot = _Snapshot()
+            self.schema_issues = {}
+            if not self.problems_dir.exists():
+                self._snapshot = snapshot
+                return
+
+            bank = self._open_bank()
+            if bank is not None:
+                self._bank = bank
+                self.source = "compiled"
+                for path in source_files(self.problems_dir):
+                    stat = path.stat()
+                    snapshot.files[path.name] = _FileState(stat.st_mtime_ns, stat.st_size, None, [])
+                for source, summary in bank.iter_summaries():
+                    self._add(snapshot, source, summary, None)
+                for issue in bank.schema_issues():
+                    self.schema_issues.setdefault(issue.source, []).append(issue)
+            else:
+                self.source = "json"
+                for path in source_files(self.problems_dir):
+                    try:
+                        stat = path.stat()
+                        data = path.read_bytes()
+                        problems = parse_source(data)
+                    except Exception as e:
+                        self.schema_issues[path.name] = [unreadable_source(path.name, e)]
+                        continue
+                    snapshot.files[path.name] = _FileState(
+                        stat.st_mtime_ns, stat.st_size, hashlib.sha256(data).hexdigest(), [])
+                    valid, issues = validate_source(path.name, problems)
+                    if issues:
+                        self.schema_issues[path.name] = issues
+                    for _, summary, heavy in valid:
+                        self._add(snapshot, path.name, summary, heavy)
+            for issues in self.schema_issues.values():
+                self._report_issues(issues)
+
+            snapshot.search = self._load_search_index(snapshot) if bank is not None else None
+            if snapshot.search is None:
+                snapshot.search = self._build_search_index(snapshot)
+            snapshot.vectors = self._load_vector_index(snapshot) if bank is not None else None
+            if snapshot.vectors is None:
+                snapshot.vectors = VectorIndex.build(snapshot.problems, self.embedder)
+            snapshot.duplicates = self._load_minhash_index(snapshot) if bank is not None else None
+            if snapshot.duplicates is None:
+                snapshot.duplicates = NearDuplicateIndex.build(snapshot.problems)
+            snapshot.numbering = _numbering(snapshot)
+            self._snapshot = snapshot
+
+    @staticmethod
+    def _report_issues(issues: List[SchemaIssue]):
+        skipped = sum(1 for issue in issues if issue.index is not None)
+        header = (f"Skipped {skipped} invalid problems in {issues[0].source}:" if skipped
+                  else f"Skipped {issues[0].source}:")
+        logger.warning("\n  ".join([header] + [str(issue) for issue in issues]))
+
+    def _open_bank(self) -> Optional[CompiledProblemBank]:
+        """Open the compiled bank if it exists and was built from the current sources"""
+        if self.bank_path is None or not self.bank_path.exists():
+            return None
+        try:
+            bank = CompiledProblemBank(self.bank_path)
+        except Exception as e:
+            logger.error(f"Error opening compiled problem bank {self.bank_path}: {e}")
+            return None
+        if not bank.is_fresh(self.problems_dir):
+            logger.warning(f"Compiled problem bank {self.bank_path} is out of date, loading JSON files instead. "
+                           f"Rebuild it with scripts/build_problem_bank.py")
+            bank.close()
+            return None
+        return bank
+
+    def _load_search_index(self, snapshot: _Snapshot) -> Optional[SearchIndex]:
+        """The search index compiled with the bank, if it matches the loaded problems"""
+        path = search_index_path(self.bank_path)
+        if not path.exists():
+            return None
+        try:
+            index = SearchIndex.load(path)
+        except Exception as e:
+            logger.error(f"Error loading search index {path}: {e}")
+            return None
+        if (index.fingerprint != self._bank.meta.get("source_fingerprint")
+                or index.size != len(snapshot.problems)):
+            return None
+        return index
+
+    def _load_vector_index(self, snapshot: _Snapshot) -> Optional[VectorIndex]:
+        """The embeddings compiled with the bank, if they match the loaded problems"""
+        path = vector_index_path(self.bank_path)
+        if not path.exists():
+            return None
+        try:
+            index = VectorIndex.load(path, self.embedder)
+        except Exception as e:
+            logger.error(f"Error loading problem embeddings {path}: {e}")
+            return None
+        if (index.fingerprint != self._bank.meta.get("source_fingerprint")
+                or index.matrix.shape != (len(snapshot.problems), self.embedder.dim)):
+            return None
+        return index
+
+    def _load_minhash_index(self, snapshot: _Snapshot) -> Optional[NearDuplicateIndex]:
+        """The MinHash signatures compiled with the bank, if they match the loaded problems"""
+        path = minhash_index_path(self.bank_path)
+        if not path.exists():
+            return None
+        try:
+            index = NearDuplicateIndex.load(path)
+        except Exception as e:
+            logger.error(f"Error loading near-duplicate signatures {path}: {e}")
+            return None
+        if (index.fingerprint != self._bank.meta.get("source_fingerprint")
+                or index.signatures.shape != (len(snapshot.problems), NUM_PERMUTATIONS)):
+            return None
+        return index
+
+    @staticmethod
+    def _build_search_index(snapshot: _Snapshot) -> SearchIndex:
+        docs = ((position, problem) for position, problem in enumerate(snapshot.problems)
+                if problem is not None)
+        return SearchIndex.build(docs, len(snapshot.problems))
+
+    def _add(self, snapshot: _Snapshot, source: str, summary: ProblemSummary, heavy: Optional[Dict],
+             copied: Optional[set] = None):
+        """Append one problem to a snapshot under construction and index it.
+
+        heavy=None means the heavy fields live in the compiled bank. See
+        _index_list for `copied`.
+        """
+        position = len(snapshot.problems)
+        snapshot.problems.append(summary)
+        snapshot.files[source].positions.append(position)
+        snapshot.by_id[summary.id] = position
+        if heavy is not None:
+            snapshot.heavy[summary.id] = heavy
+        for name, field in INDEXED_FIELDS.items():
+            for item in _index_values(summary, field):
+                self._index_list(snapshot, name, item, copied).append(position)
 
-        if not self.problems_dir.exists():
+    @staticmethod
+    def _index_list(snapshot: _Snapshot, name: str, item: Any, copied: Optional[set]) -> List[int]:
+        """Position list for one index value that is safe to modify.
+
+        During a reload the index lists are still shared with the published
+        snapshot, so each one is copied on first modification; `copied`
+        tracks which ones already belong to the new snapshot.
+        """
+        values = snapshot.indexes[name]
+        if copied is not None and (name, item) not in copied:
+            values[item] = list(values.get(item, ()))
+            copied.add((name, item))
+        return values.setdefault(item, [])
+
+    def reload(self) -> Dict:
+        """Re-read JSON files that changed since the last load and swap in a new snapshot.
+
+        Files are compared by mtime and size first and by content hash
+        second, so only files that really changed are parsed. Their old
+        problems are dropped from the indexes and the new valid ones
+        appended; everything else is shared with the previous snapshot. A
+        file that fails to parse keeps its previous contents.
+        """
+        with self._reload_lock:
+            start = time.perf_counter()
+            old = self._snapshot
+            current = {path.name: path for path in source_files(self.problems_dir)}
+
+            changed: Dict[str, Optional[tuple]] = {name: None for name in old.files.keys() - current.keys()}
+            touched: Dict[str, _FileState] = {}
+            issues: Dict[str, List[SchemaIssue]] = {}
+            errors = 0
+            for name, path in current.items():
+                state = old.files.get(name)
+                try:
+                    stat = path.stat()
+                    if state and state.mtime_ns == stat.st_mtime_ns and state.size == stat.st_size:
+                        continue
+                    data = path.read_bytes()
+                    digest = hashlib.sha256(data).hexdigest()
+                    if state and state.digest == digest:
+                        touched[name] = _FileState(stat.st_mtime_ns, stat.st_size, digest, state.positions)
+                        continue
+                    valid, issues[name] = validate_source(name, parse_source(data))
+                    changed[name] = (_FileState(stat.st_mtime_ns, stat.st_size, digest, []), valid)
+                except Exception as e:
+                    issues[name] = [unreadable_source(name, e)]
+                    errors += 1
+
+            # Replaced, not modified, so get_stats never sees it half-updated
+            schema_issues = dict(self.schema_issues)
+            for name in changed.keys() - current.keys():
+                schema_issues.pop(name, None)
+            for name, file_issues in issues.items():
+                if file_issues:
+                    schema_issues[name] = file_issues
+                    self._report_issues(file_issues)
+                else:
+                    schema_issues.pop(name, None)
+            self.schema_issues = schema_issues
+
+            if changed or touched:
+                snapshot = self._apply_changes(old, changed, touched)
+                # Touched-only files keep every position, so the derived indexes still fit
+                if changed:
+                    snapshot.search = self._build_search_index(snapshot)
+                    snapshot.vectors = VectorIndex.build(snapshot.problems, self.embedder,
+                                                         previous=(old.problems, old.vectors))
+                    snapshot.duplicates = NearDuplicateIndex.build(snapshot.problems,
+                                                                   previous=(old.problems, old.duplicates))
+                else:
+                    snapshot.search, snapshot.vectors = old.search, old.vectors
+                    snapshot.duplicates = old.duplicates
+                self._snapshot = snapshot
+
+            elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+            self.reload_stats["reloads"] += 1
+            self.reload_stats["errors"] += errors
+            self.reload_stats["last_reload_ms"] = elapsed_ms
+            self.reload_stats["last_reload_at"] = datetime.now().isoformat()
+            self.reload_stats["last_changed_files"] = sorted(changed)
+            return {"changed_files": sorted(changed), "errors": errors, "duration_ms": elapsed_ms}
+
+    def _apply_changes(self, old: _Snapshot, changed: Dict[str, Optional[tuple]],
+                       touched: Dict[str, _FileState]) -> _Snapshot:
+        """Build the next snapshot from the previous one plus the changed files"""
+        snapshot = _Snapshot()
+        snapshot.problems = list(old.problems)
+        snapshot.by_id = dict(old.by_id)
+        snapshot.heavy = dict(old.heavy)
+        snapshot.files = {**old.files, **touched}
+        snapshot.tombstones = old.tombstones
+        snapshot.numbering = old.numbering
+        snapshot.indexes = {name: dict(values) for name, values in old.indexes.items()}
+        copied = set()
+
+        for name, update in changed.items():
+            previous = snapshot.files.pop(name, None)
+            for position in previous.positions if previous else []:
+                problem = snapshot.problems[position]
+                snapshot.problems[position] = None
+                snapshot.tombstones += 1
+                if snapshot.by_id.get(problem.id) == position:
+                    del snapshot.by_id[problem.id]
+                    snapshot.heavy.pop(problem.id, None)
+                for index_name, field in INDEXED_FIELDS.items():
+                    for item in _index_values(problem, field):
+                        positions = self._index_list(snapshot, index_name, item, copied)
+                        positions.remove(position)
+                        if not positions:
+                            del snapshot.indexes[index_name][item]
+
+            if update is None:
+                continue
+            state, problems = update
+            snapshot.files[name] = state
+            for _, summary, heavy in problems:
+                self._add(snapshot, name, summary, heavy, copied=copied)
+
+        if snapshot.tombstones > self.COMPACT_RATIO * max(1, len(snapshot.problems)):
+            snapshot = self._compact(snapshot)
+        return snapshot
+
+    def _compact(self, snapshot: _Snapshot) -> _Snapshot:
+        """Renumber a snapshot without tombstones, keeping file order"""
+        compacted = _Snapshot()
+        compacted.heavy = snapshot.heavy
+        for name in sorted(snapshot.files):
+            state = snapshot.files[name]
+            compacted.files[name] = _FileState(state.mtime_ns, state.size, state.digest, [])
+            for position in state.positions:
+                summary = snapshot.problems[position]
+                self._add(compacted, name, summary, None)
+        compacted.numbering = _numbering(compacted)
+        return compacted
+
+    def start_watching(self, interval: float):
+        """Poll the problems directory every `interval` seconds in a daemon thread"""
+        if self._watcher is not None:
             return
+        self._watch_stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch_loop, args=(interval,), name="problem-bank-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._watch_stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
 
-        for json_file in self.problems_dir.glob("*.json"):
+    def _watch_loop(self, interval: float):
+        while not self._watch_stop.wait(interval):
             try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    problems = json.load(f)
-                    if isinstance(problems, list):
-                        self.problems.extend(problems)
-                    else:
-                        self.problems.append(problems)
+                result = self.reload()
+                if result["changed_files"]:
+                    logger.info(f"Reloaded problem files {', '.join(result['changed_files'])} "
+                                f"in {result['duration_ms']}ms")
             except Exception as e:
-                print(f"Error loading {json_file}: {e}")
+                logger.error(f"Problem bank reload failed: {e}", exc_info=True)
+
+    def get_schema_issues(self) -> List[SchemaIssue]:
+        """Why problems (or whole files) were skipped, in file order"""
+        schema_issues = self.schema_issues
+        return [issue for name in sorted(schema_issues) for issue in schema_issues[name]]
+
+    def get_stats(self) -> Dict:
+        snapshot = self._snapshot
+        issues = self.get_schema_issues()
+        return {
+            "source": self.source,
+            "problems": len(snapshot.problems) - snapshot.tombstones,
+            "files": len(snapshot.files),
+            "watching": self._watcher is not None,
+            "search_index": snapshot.search.get_stats() if snapshot.search else None,
+            "vector_index": snapshot.vectors.get_stats() if snapshot.vectors else None,
+            "near_duplicate_index": snapshot.duplicates.get_stats() if snapshot.duplicates else None,
+            "invalid_problems": sum(1 for issue in issues if issue.index is not None),
+            "unreadable_files": sum(1 for issue in issues if issue.index is None),
+            "schema_issues": [str(issue) for issue in issues[:20]],
+            "row_cache": self.row_cache.get_stats(),
+            **self.reload_stats,
+        }
 
     def get_all_topics(self) -> List[str]:
         """Get unique list of all topics"""
-        topics = set()
-        for problem in self.problems:
-            if 'topic' in problem:
-                topics.add(problem['topic'])
-        return sorted(list(topics))
+        return sorted(self._snapshot.indexes['topic'])
 
     def get_all_chapters(self) -> List[str]:
         """Get unique list of all chapters"""
-        chapters = set()
-        for problem in self.problems:
-            if 'chapter' in problem:
-                chapters.add(problem['chapter'])
-        return sorted(list(chapters))
+        return sorted(self._snapshot.indexes['chapter'])
 
-    def filter_problems(self,
-                       chapter: Optional[str] = None,
-                       topic: Optional[str] = None,
-                       difficulty: Optional[str] = None) -> List[Dict]:
-        """Filter problems by chapter, topic, or difficulty"""
-        filtered = self.problems
+    def get_field_values(self, name: str) -> List:
+        """Distinct values of an indexed field (see INDEXED_FIELDS)"""
+        return sorted(self._snapshot.indexes[name])
+
+    def query(self, **filters) -> List[ProblemSummary]:
+        """Compound equality query over indexed fields, e.g. query(topic=..., year=2019).
 
-        if chapter:
-            filtered = [p for p in filtered if p.get('chapter') == chapter]
+        Each filter is resolved through its hash index and the position sets
+        are intersected starting from the smallest, so the cost depends on
+        the number of matches rather than the size of the bank.
+        """
+        _check_filters(filters)
+        snapshot = self._snapshot
+        positions = self._match_positions(snapshot, filters)
+        if positions is None:
+            return [p for p in snapshot.problems if p is not None]
+        return [snapshot.problems[i] for i in positions]
 
-        if topic:
-            filtered = [p for p in filtered if p.get('topic') == topic]
+    def list_page(self, limit: int, cursor: Optional[str] = None,
+                  **filters) -> Tuple[int, List[ProblemSummary], Optional[str]]:
+        """One page of query(**filters) in bank order.
 
-        if difficulty:
-            filtered = [p for p in filtered if p.get('difficulty') == difficulty]
+        `cursor` is the next_cursor of the previous page. It holds the last
+        position returned rather than an offset, so a reload between two
+        requests does not skip problems: removed ones leave a tombstone in
+        place and added ones are appended, so they come on a later page
+        (as do edited ones, with their new contents). A compaction
+        renumbers positions, after which an older cursor is rejected with
+        ValueError and the listing has to start again. Returns (total
+        matches, page, next_cursor or None on the last page).
+        """
+        _check_filters(filters)
+        snapshot = self._snapshot
+        after = self._cursor_position(snapshot, cursor) if cursor else -1
+        positions = self._match_positions(snapshot, filters)
 
-        return filtered
+        if positions is None:
+            total = len(snapshot.problems) - snapshot.tombstones
+            page = []
+            position = after + 1
+            while position < len(snapshot.problems) and len(page) <= limit:
+                if snapshot.problems[position] is not None:
+                    page.append(position)
+                position += 1
+        else:
+            total = len(positions)
+            start = bisect.bisect_right(positions, after)
+            page = positions[start:start + limit + 1]
+
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            last = page[-1]
+            next_cursor = _encode_cursor("after", last, snapshot.numbering)
+        return total, [snapshot.problems[i] for i in page], next_cursor
+
+    @staticmethod
+    def _cursor_position(snapshot: _Snapshot, cursor: str) -> int:
+        kind, position, numbering = _decode_cursor(cursor)
+        if kind != "after":
+            raise ValueError("Invalid cursor")
+        if numbering != snapshot.numbering:
+            raise ValueError("Cursor has expired because the problem bank was reorganized; "
+                             "start again from the first page")
+        # Positions are only ever appended between renumberings
+        if position >= len(snapshot.problems):
+            raise ValueError("Invalid cursor")
+        return position
+
+    @staticmethod
+    def _match_positions(snapshot: _Snapshot, filters: Dict) -> Optional[List[int]]:
+        """Ascending positions matching all non-empty filters, or None if there are none.
+
+        The list may be one of the snapshot's own index lists; callers must
+        not modify it.
+        """
+        active = [(name, value) for name, value in filters.items() if value is not None and value != '']
+        if not active:
+            return None
+
+        candidates = sorted(
+            (snapshot.indexes[name].get(value, []) for name, value in active), key=len
+        )
+        if len(candidates) == 1:
+            return candidates[0]
+        positions = set(candidates[0])
+        for other in candidates[1:]:
+            if not positions:
+                break
+            positions.intersection_update(other)
+        return sorted(positions)
+
+    def search(self, query: str, limit: int = 10, offset: int = 0, **filters) -> Tuple[int, List[Dict]]:
+        """BM25 full-text search, optionally restricted by indexed-field filters.
+
+        Returns (total matches, one page of problem summaries with a `score`).
+        """
+        total, hits = self._search_hits(query, limit, offset, filters)
+        return total, [{**summary, "score": score} for summary, score in hits]
+
+    def search_page(self, query: str, limit: int = 10, offset: int = 0, cursor: Optional[str] = None,
+                    **filters) -> Tuple[int, int, List[Tuple[ProblemSummary, float]], Optional[str]]:
+        """search() returning (total, offset, [(summary, score)], next_cursor).
+
+        A cursor from a previous page overrides `offset`; it is only valid
+        for the same query.
+        """
+        if cursor:
+            kind, offset, query_hash = _decode_cursor(cursor)
+            if kind != "offset" or query_hash != _query_hash(query, filters):
+                raise ValueError("Cursor does not belong to this query")
+            if offset > MAX_SEARCH_OFFSET:
+                raise ValueError("Invalid cursor")
+        total, hits = self._search_hits(query, limit, offset, filters)
+        next_cursor = None
+        if offset + len(hits) < total:
+            next_cursor = _encode_cursor("offset", offset + len(hits), _query_hash(query, filters))
+        return total, offset, hits, next_cursor
+
+    def _search_hits(self, query: str, limit: int, offset: int,
+                     filters: Dict) -> Tuple[int, List[Tuple[ProblemSummary, float]]]:
+        _check_filters(filters)
+        snapshot = self._snapshot
+        positions = self._match_positions(snapshot, filters)
+        allowed = None
+        if positions is not None:
+            allowed = np.fromiter(positions, dtype=np.int64, count=len(positions))
+        total, hits = snapshot.search.search(query, limit, offset, allowed)
+        return total, [(snapshot.problems[position], round(score, 4)) for position, score in hits]
+
+    def similar_problems(self, problems: List[Dict], limit: int = 5) -> List[List[Dict]]:
+        """Curated problems most similar to each of `problems` (batched cosine top-k).
+
+        A problem from the bank is never listed as similar to itself.
+        Results are summaries with a `similarity` score.
+        """
+        snapshot = self._snapshot
+        queries = self.embedder.embed([problem_similarity_text(p) for p in problems])
+        exclude = [snapshot.by_id.get(p.get('id')) if p.get('id') is not None else None for p in problems]
+        return [
+            [{**snapshot.problems[position], "similarity": round(score, 4)} for position, score in hits]
+            for hits in snapshot.vectors.top_k(queries, limit, exclude)
+        ]
+
+    def find_duplicate(self, problem: Dict) -> Optional[Tuple[Dict, float]]:
+        """The bank problem `problem` is a (near-)verbatim copy of, if any.
+
+        MinHash LSH narrows the bank to a few candidates, which must then
+        pass near_duplicates.duplicate_similarity at duplicate_threshold.
+        Returns (summary, text similarity) for the best match.
+        """
+        snapshot = self._snapshot
+        features = duplicate_features(problem)
+        candidates = snapshot.duplicates.candidates(minhash(features[0]))
+        if not candidates:
+            return None
+
+        best = None
+        for position in candidates:
+            candidate = snapshot.problems[position]
+            if candidate is None:
+                continue
+            similarity = duplicate_similarity(features, duplicate_features(candidate), self.duplicate_threshold)
+            if similarity is None:
+                continue
+            if best is None or similarity > best[1]:
+                best = (candidate, similarity)
+        return best
+
+    def filter_problems(self,
+                       chapter: Optional[str] = None,
+                       topic: Optional[str] = None,
+                       difficulty: Optional[str] = None) -> List[ProblemSummary]:
+        """Filter problems by chapter, topic, or difficulty"""
+        return self.query(chapter=chapter, topic=topic, difficulty=difficulty)
 
     def get_problem_by_id(self, problem_id: str) -> Optional[Dict]:
-        """Get a specific problem by its ID"""
-        for problem in self.problems:
-            if problem.get('id') == problem_id:
-                return problem
-        return None
+        """Get a specific problem by its ID, including its heavy fields"""
+        snapshot = self._snapshot
+        position = snapshot.by_id.get(problem_id)
+        if position is None:
+            return None
+        heavy = snapshot.heavy.get(problem_id)
+        if heavy is None:
+            heavy = (self._bank.fetch_heavy(problem_id) if self._bank is not None else None) or {}
+        return {**snapshot.problems[position], **heavy}
 
     def get_total_count(self) -> int:
         """Get total number of problems"""
-        return len(self.problems)
+        snapshot = self._snapshot
+        return len(snapshot.problems) - snapshot.tombstones
 
 
 def format_problem_text(problem: Dict) -> str:
@@ -1,10 +1,11 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from typing import List, Optional, Dict
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, AsyncIterator, Callable, Tuple
+import asyncio
 import logging
-import time
 import json
 from datetime import datetime
 import sys
@@ -13,21 +14,29 @@ import os
 # Add backend directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from app.core import config
+from app.core.request_logging import RequestLoggingMiddleware, setup_logging
+from app.services.admission import (
+    AdmissionController, AdmissionMiddleware, TokenBucketLimiter, INTERACTIVE, BULK
+)
 from app.services.ai_tutor import PhysicsAITutor
-from app.services.utils import ProblemLoader
+from app.services.hint_prefetch import HintPrefetcher
+from app.services.session_store import SessionStore, TutoringSession
+from app.services.textbooks import TextbookLibrary
+from app.models.problem import SUMMARY_FIELDS
+from app.services.utils import MAX_SEARCH_OFFSET, ProblemLoader
 
 # Configure logging
 log_dir = os.path.join(os.path.dirname(__file__), 'logs')
 os.makedirs(log_dir, exist_ok=True)
 log_file = os.path.join(log_dir, 'api_requests.log')
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ]
+# JSON-lines log file written by a background thread, rotated by size
+log_listener = setup_logging(
+    log_file,
+    max_bytes=config.LOG_MAX_BYTES,
+    backup_count=config.LOG_BACKUP_COUNT,
+    queue_size=config.LOG_QUEUE_SIZE
 )
 logger = logging.getLogger(__name__)
 
@@ -38,6 +47,35 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Admission control - per-client rate limit plus a global cap on in-flight
+# Gemini-backed requests, with part of the capacity reserved for chat
+rate_limiter = TokenBucketLimiter(
+    rate_per_minute=config.RATE_LIMIT_PER_MINUTE,
+    burst=config.RATE_LIMIT_BURST
+)
+admission = AdmissionController(
+    max_in_flight=config.ADMISSION_MAX_IN_FLIGHT,
+    interactive_reserved=config.ADMISSION_INTERACTIVE_RESERVED,
+    max_queue=config.ADMISSION_MAX_QUEUE,
+    queue_timeout=config.ADMISSION_QUEUE_TIMEOUT_SECONDS
+)
+app.add_middleware(
+    AdmissionMiddleware,
+    controller=admission,
+    limiter=rate_limiter,
+    routes={
+        "/api/question/submit": INTERACTIVE,
+        "/api/chat": INTERACTIVE,
+        "/api/chat/stream": INTERACTIVE,
+        "/api/hint": INTERACTIVE,
+        "/api/hint/stream": INTERACTIVE,
+        "/api/solution": BULK,
+        "/api/solution/stream": BULK,
+    },
+    retry_after=config.ADMISSION_RETRY_AFTER_SECONDS,
+    trusted_proxy_hops=config.TRUSTED_PROXY_HOPS
+)
+
 # CORS middleware - Allow localhost + production frontend
 app.add_middleware(
     CORSMiddleware,
@@ -51,16 +89,78 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize AI tutor and problem loader
+# Request logging - one structured line per request, bodies sampled and truncated
+app.add_middleware(
+    RequestLoggingMiddleware,
+    logger=logger,
+    max_body_bytes=config.LOG_BODY_MAX_BYTES,
+    body_sample_rate=config.LOG_BODY_SAMPLE_RATE
+)
+
+@app.on_event("shutdown")
+def flush_logs():
+    log_listener.stop()
+
+# NCERT passages for chat prompts, ingested in the background after startup
+textbook_library = TextbookLibrary(
+    config.TEXTBOOKS_DIR, config.TEXTBOOK_CACHE_DIR, max_workers=config.TEXTBOOK_INGEST_WORKERS
+) if config.TEXTBOOK_CONTEXT_TOKEN_BUDGET > 0 else None
+
+@app.on_event("startup")
+def ingest_textbooks():
+    if textbook_library:
+        textbook_library.start_ingest()
+
+# Initialize AI tutor and problem loader (the problem bank does not need an API key)
 try:
-    ai_tutor = PhysicsAITutor()
-    problem_loader = ProblemLoader()
-    logger.info("AI Tutor and Problem Loader initialized successfully")
+    ai_tutor = PhysicsAITutor(textbooks=textbook_library)
+    logger.info("AI Tutor initialized successfully")
 except Exception as e:
-    logger.error(f"Failed to initialize: {e}")
+    logger.error(f"Failed to initialize AI Tutor: {e}")
     ai_tutor = None
+
+try:
+    problem_loader = ProblemLoader(bank_path=config.PROBLEM_BANK_PATH,
+                                   duplicate_threshold=config.DUPLICATE_MATCH_THRESHOLD,
+                                   row_cache_size=config.SUMMARY_ROW_CACHE_SIZE)
+    logger.info(f"Problem Loader initialized with {problem_loader.get_total_count()} problems "
+                f"(source: {problem_loader.source})")
+except Exception as e:
+    logger.error(f"Failed to initialize Problem Loader: {e}")
     problem_loader = None
 
+# Pick up edited problem files without a restart (which would drop live sessions)
+@app.on_event("startup")
+def watch_problem_bank():
+    if problem_loader and config.PROBLEM_RELOAD_INTERVAL_SECONDS > 0:
+        problem_loader.start_watching(config.PROBLEM_RELOAD_INTERVAL_SECONDS)
+
+@app.on_event("shutdown")
+def stop_watching_problem_bank():
+    if problem_loader:
+        problem_loader.stop_watching()
+
+# Tutoring sessions, so clients send only a session id and the new message per turn
+session_store = SessionStore(
+    max_sessions=config.SESSION_MAX_COUNT,
+    idle_timeout=config.SESSION_IDLE_TIMEOUT_SECONDS
+)
+
+# After each tutor turn, the session's next hint is generated speculatively
+hint_prefetcher = HintPrefetcher(
+    ai_tutor,
+    max_share=config.HINT_PREFETCH_MAX_SHARE,
+    max_in_flight=config.HINT_PREFETCH_MAX_IN_FLIGHT
+) if ai_tutor else None
+
+def _prefetch_next_hint(session: TutoringSession):
+    if hint_prefetcher:
+        hint_prefetcher.schedule(session)
+
+def _invalidate_hint_prefetch(session: TutoringSession):
+    if hint_prefetcher:
+        hint_prefetcher.invalidate(session)
+
 # Pydantic models
 class QuestionSubmission(BaseModel):
     text: str
@@ -69,59 +169,46 @@ class QuestionSubmission(BaseModel):
     difficulty: Optional[str] = "medium"
     options: Optional[List[Dict[str, str]]] = None
 
+class SimilarProblemsRequest(BaseModel):
+    text: str
+    topic: Optional[str] = None
+    limit: int = Field(5, ge=1, le=50)
+
 class ChatMessage(BaseModel):
     role: str  # "user" or "assistant"
     content: str
 
+# Clients either send the session_id returned by /api/question/submit, or
+# (stateless, older clients) the full problem and conversation history
 class ChatRequest(BaseModel):
-    problem: Dict
-    conversation_history: List[Dict]
     user_message: str
+    session_id: Optional[str] = None
+    problem: Optional[Dict] = None
+    conversation_history: Optional[List[Dict]] = None
 
 class HintRequest(BaseModel):
-    problem: Dict
-    conversation_history: List[Dict]
     hint_level: int
+    session_id: Optional[str] = None
+    problem: Optional[Dict] = None
+    conversation_history: Optional[List[Dict]] = None
 
 class SolutionRequest(BaseModel):
-    problem: Dict
-
-# Logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    request_id = f"{int(time.time() * 1000)}"
-    start_time = time.time()
-
-    # Log request
-    logger.info(f"REQUEST [{request_id}] {request.method} {request.url.path}")
-
-    try:
-        # Get request body for POST requests
-        if request.method == "POST":
-            body = await request.body()
-            if body:
-                try:
-                    body_json = json.loads(body)
-                    logger.info(f"REQUEST BODY [{request_id}]: {json.dumps(body_json, indent=2)}")
-                except:
-                    pass
-                # Re-create request with body
-                from starlette.requests import Request as StarletteRequest
-                async def receive():
-                    return {"type": "http.request", "body": body}
-                request = StarletteRequest(request.scope, receive)
-
-        response = await call_next(request)
-
-        # Log response
-        duration = time.time() - start_time
-        logger.info(f"RESPONSE [{request_id}] Status: {response.status_code} Duration: {duration:.2f}s")
-
-        return response
-
-    except Exception as e:
-        logger.error(f"ERROR [{request_id}]: {str(e)}", exc_info=True)
-        raise
+    session_id: Optional[str] = None
+    problem: Optional[Dict] = None
+
+def _resolve_conversation(session_id: Optional[str],
+                          problem: Optional[Dict],
+                          conversation_history: Optional[List[Dict]] = None
+                          ) -> Tuple[Optional[TutoringSession], Dict, List[Dict]]:
+    """Look up the session for a request, or fall back to the problem it carries"""
+    if session_id:
+        session = session_store.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Session not found or expired. Please submit the question again.")
+        return session, session.problem, session.conversation_history
+    if problem is None:
+        raise HTTPException(status_code=422, detail="Either session_id or problem is required")
+    return None, problem, conversation_history or []
 
 # Health check
 @app.get("/")
@@ -135,21 +222,167 @@ async def root():
 
 @app.get("/health")
 async def health_check():
+    circuit = ai_tutor.circuit_breaker.get_state() if ai_tutor else None
     return {
-        "status": "healthy",
+        # Still 200 while Gemini is down - the API itself is up and serves fallbacks
+        "status": "degraded" if circuit and circuit["state"] != "closed" else "healthy",
         "ai_tutor": ai_tutor is not None,
+        "gemini_circuit": circuit,
         "problem_loader": problem_loader is not None,
+        "problem_bank": problem_loader.get_stats() if problem_loader else None,
+        "solution_cache": ai_tutor.solution_cache.get_stats() if ai_tutor else None,
+        "single_flight": ai_tutor.single_flight.get_stats() if ai_tutor else None,
+        "sessions": session_store.get_stats(),
+        "textbooks": textbook_library.get_stats() if textbook_library else None,
+        "admission": admission.get_stats(),
+        "prompt_tokens": ai_tutor.get_prompt_token_stats() if ai_tutor else None,
+        "hint_prefetch": hint_prefetcher.get_stats() if hint_prefetcher else None,
         "timestamp": datetime.now().isoformat()
     }
 
-# Endpoints for topics/chapters/samples removed - not needed for simplified UI
-# Students just paste their questions directly
+# Problem bank browsing
+def _require_loader() -> ProblemLoader:
+    if not problem_loader:
+        raise HTTPException(status_code=503, detail="Problem bank not available.")
+    return problem_loader
+
+@app.get("/api/topics")
+async def get_topics():
+    return {"topics": _require_loader().get_all_topics()}
+
+@app.get("/api/chapters")
+async def get_chapters():
+    return {"chapters": _require_loader().get_all_chapters()}
+
+def _parse_fields(fields: Optional[str], available: Tuple[str, ...]) -> Optional[List[str]]:
+    """Comma-separated `fields=` projection, None for all fields"""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise HTTPException(status_code=400,
+                            detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(available)}")
+    return names
+
+def _rows_response(key: str, rows: List[str], **envelope) -> Response:
+    """JSON object with pre-serialized `rows` under `key`; only the small envelope is encoded here"""
+    body = f'{{"{key}":[{",".join(rows)}],{json.dumps(envelope, ensure_ascii=False)[1:]}'
+    return Response(content=body, media_type="application/json")
+
+@app.get("/api/problems/samples")
+async def get_sample_problems(chapter: Optional[str] = None,
+                              topic: Optional[str] = None,
+                              subtopic: Optional[str] = None,
+                              difficulty: Optional[str] = None,
+                              year: Optional[int] = None,
+                              exam: Optional[str] = None,
+                              limit: int = Query(10, ge=1, le=100),
+                              cursor: Optional[str] = Query(None, max_length=200),
+                              fields: Optional[str] = Query(None, max_length=500)):
+    loader = _require_loader()
+    projection = _parse_fields(fields, SUMMARY_FIELDS)
+    try:
+        total, problems, next_cursor = loader.list_page(
+            limit, cursor, chapter=chapter, topic=topic, subtopic=subtopic,
+            difficulty=difficulty, year=year, exam=exam
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _rows_response("problems", loader.row_cache.rows(problems, projection),
+                          total=total, next_cursor=next_cursor)
+
+@app.get("/api/problems/search")
+async def search_problems(q: str = Query(..., min_length=1, max_length=500),
+                          chapter: Optional[str] = None,
+                          topic: Optional[str] = None,
+                          subtopic: Optional[str] = None,
+                          difficulty: Optional[str] = None,
+                          year: Optional[int] = None,
+                          exam: Optional[str] = None,
+                          limit: int = Query(10, ge=1, le=100),
+                          offset: int = Query(0, ge=0, le=MAX_SEARCH_OFFSET),
+                          cursor: Optional[str] = Query(None, max_length=200),
+                          fields: Optional[str] = Query(None, max_length=500)):
+    loader = _require_loader()
+    projection = _parse_fields(fields, SUMMARY_FIELDS + ("score",))
+    try:
+        total, offset, hits, next_cursor = loader.search_page(
+            q, limit=limit, offset=offset, cursor=cursor,
+            chapter=chapter, topic=topic, subtopic=subtopic,
+            difficulty=difficulty, year=year, exam=exam
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    rows = loader.row_cache.rows([summary for summary, _ in hits], projection,
+                                 extra=[{"score": score} for _, score in hits])
+    return _rows_response("results", rows, query=q, total=total, offset=offset, limit=limit,
+                          next_cursor=next_cursor)
+
+@app.get("/api/problems/{problem_id}")
+async def get_problem(problem_id: str):
+    problem = _require_loader().get_problem_by_id(problem_id)
+    if problem is None:
+        raise HTTPException(status_code=404, detail=f"Problem {problem_id} not found")
+    return problem
+
+@app.get("/api/problems/{problem_id}/similar")
+async def get_similar_problems(problem_id: str, limit: int = Query(5, ge=1, le=50)):
+    loader = _require_loader()
+    problem = loader.get_problem_by_id(problem_id)
+    if problem is None:
+        raise HTTPException(status_code=404, detail=f"Problem {problem_id} not found")
+    similar = await run_in_threadpool(loader.similar_problems, [problem], limit)
+    return {"problem_id": problem_id, "similar_problems": similar[0]}
+
+@app.post("/api/problems/similar")
+async def find_similar_problems(request: SimilarProblemsRequest):
+    loader = _require_loader()
+    problem = {"text": request.text, "topic": request.topic}
+    similar = await run_in_threadpool(loader.similar_problems, [problem], request.limit)
+    return {"similar_problems": similar[0]}
+
+async def _find_curated_match(problem: Dict) -> Optional[Dict]:
+    """The bank problem a submitted question is a pasted copy of, if any"""
+    if not problem_loader:
+        return None
+    try:
+        match = await run_in_threadpool(problem_loader.find_duplicate, problem)
+    except Exception as e:
+        logger.error(f"Near-duplicate lookup failed: {e}", exc_info=True)
+        return None
+    if match is None:
+        return None
+    curated, similarity = match
+    return {"id": curated['id'], "similarity": round(similarity, 4)}
+
+async def _curated_solution(problem: Dict) -> Optional[Dict]:
+    """Official solution for a curated problem, or for a question matched to one on submit"""
+    if 'official_solution' in problem and not problem.get('user_submitted', False):
+        return problem['official_solution']
+    curated_id = problem.get('curated_id')
+    if curated_id and problem_loader:
+        # Looked up server-side rather than trusting a solution sent by the client
+        curated = await run_in_threadpool(problem_loader.get_problem_by_id, curated_id)
+        if curated and 'official_solution' in curated:
+            return curated['official_solution']
+    return None
+
+async def _similar_to(problem: Dict, limit: int) -> List[Dict]:
+    """Curated problems to recommend next to a submitted one; empty if unavailable"""
+    if not problem_loader or limit <= 0:
+        return []
+    try:
+        return (await run_in_threadpool(problem_loader.similar_problems, [problem], limit))[0]
+    except Exception as e:
+        logger.error(f"Similar problem lookup failed: {e}", exc_info=True)
+        return []
 
 # Submit a new question
 @app.post("/api/question/submit")
 async def submit_question(question: QuestionSubmission):
     try:
-        logger.info(f"Question submitted: {question.text[:100]}...")
+        logger.debug(f"Question submitted: {question.text[:100]}...")
 
         problem = {
             "text": question.text,
@@ -166,15 +399,33 @@ async def submit_question(question: QuestionSubmission):
         if not ai_tutor:
             raise HTTPException(status_code=503, detail="AI Tutor not available. Check API key.")
 
-        initial_message = ai_tutor.get_initial_message(problem)
+        # A pasted copy of a bank problem gets its official solution instead of an AI one
+        curated_match = await _find_curated_match(problem)
+        if curated_match:
+            problem["curated_id"] = curated_match["id"]
+
+        initial_message, similar_problems = await asyncio.gather(
+            ai_tutor.aget_initial_message(problem),
+            # The matched problem itself is not worth recommending
+            _similar_to({**problem, "id": problem.get("curated_id")}, config.SIMILAR_PROBLEMS_LIMIT)
+        )
+
+        logger.debug(f"Initial message generated: {initial_message[:100]}...")
 
-        logger.info(f"Initial message generated: {initial_message[:100]}...")
+        session = session_store.create(problem)
+        session.add_message("assistant", initial_message)
+        _prefetch_next_hint(session)
 
         return {
+            "session_id": session.id,
             "problem": problem,
             "initial_message": initial_message,
+            "curated_match": curated_match,
+            "similar_problems": similar_problems,
             "status": "success"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error submitting question: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -183,27 +434,56 @@ async def submit_question(question: QuestionSubmission):
 @app.post("/api/chat")
 async def chat(request: ChatRequest):
     try:
-        logger.info(f"Chat request - User message: {request.user_message[:100]}...")
+        logger.debug(f"Chat request - User message: {request.user_message[:100]}...")
 
         if not ai_tutor:
             raise HTTPException(status_code=503, detail="AI Tutor not available. Check API key.")
 
-        response = ai_tutor.get_response(
-            problem=request.problem,
-            conversation_history=request.conversation_history,
-            user_message=request.user_message
+        session, problem, history = _resolve_conversation(
+            request.session_id, request.problem, request.conversation_history
+        )
+        if session:
+            _invalidate_hint_prefetch(session)
+            session.add_message("user", request.user_message)
+            history = list(session.conversation_history)
+
+        response = await ai_tutor.aget_response(
+            problem=problem,
+            conversation_history=history,
+            user_message=request.user_message,
+            conversation_id=session.id if session else None
         )
 
-        logger.info(f"AI response: {response[:100]}...")
+        logger.debug(f"AI response: {response[:100]}...")
+
+        if session:
+            session.add_message("assistant", response)
+            _prefetch_next_hint(session)
 
         return {
             "response": response,
             "timestamp": datetime.now().isoformat()
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in chat: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+def _record_hint(session: TutoringSession, hint_level: int, hint: str):
+    """Append a delivered hint to the session's conversation and prefetch the next one"""
+    session.add_message("assistant", hint)
+    session.hint_level = max(session.hint_level, min(hint_level, 3))
+    if hint_level >= 3:
+        session.add_message("assistant", "You've used all 3 hints! Would you like to see the complete solution?")
+    _prefetch_next_hint(session)
+
+async def _prefetched_hint(session: Optional[TutoringSession], hint_level: int) -> Optional[str]:
+    """The session's speculatively generated hint for this level, if still valid"""
+    if session is None or not hint_prefetcher:
+        return None
+    return await hint_prefetcher.take(session, hint_level)
+
 # Get hint
 @app.post("/api/hint")
 async def get_hint(request: HintRequest):
@@ -213,19 +493,31 @@ async def get_hint(request: HintRequest):
         if not ai_tutor:
             raise HTTPException(status_code=503, detail="AI Tutor not available. Check API key.")
 
-        hint = ai_tutor.get_hint(
-            problem=request.problem,
-            conversation_history=request.conversation_history,
-            hint_level=request.hint_level
+        session, problem, history = _resolve_conversation(
+            request.session_id, request.problem, request.conversation_history
         )
 
-        logger.info(f"Hint generated: {hint[:100]}...")
+        hint = await _prefetched_hint(session, request.hint_level)
+        if hint is None:
+            hint = await ai_tutor.aget_hint(
+                problem=problem,
+                conversation_history=list(history),
+                hint_level=request.hint_level,
+                conversation_id=session.id if session else None
+            )
+
+        logger.debug(f"Hint generated: {hint[:100]}...")
+
+        if session:
+            _record_hint(session, request.hint_level, hint)
 
         return {
             "hint": hint,
             "level": request.hint_level,
             "timestamp": datetime.now().isoformat()
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating hint: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -236,12 +528,16 @@ async def get_solution(request: SolutionRequest):
     try:
         logger.info(f"Solution requested for problem")
 
-        # Check if it's a curated problem with official solution
-        if 'official_solution' in request.problem and not request.problem.get('user_submitted', False):
+        _, problem, _ = _resolve_conversation(request.session_id, request.problem)
+
+        # Curated problems, and pasted copies of them, have a vetted official solution
+        official_solution = await _curated_solution(problem)
+        if official_solution is not None:
             logger.info("Returning official solution")
             return {
-                "solution": request.problem['official_solution'],
+                "solution": official_solution,
                 "type": "official",
+                "curated_id": problem.get('curated_id', problem.get('id')),
                 "timestamp": datetime.now().isoformat()
             }
 
@@ -249,7 +545,7 @@ async def get_solution(request: SolutionRequest):
         if not ai_tutor:
             raise HTTPException(status_code=503, detail="AI Tutor not available. Check API key.")
 
-        solution = ai_tutor.generate_solution(request.problem)
+        solution = await ai_tutor.agenerate_solution(problem)
 
         logger.info(f"AI solution generated")
 
@@ -258,10 +554,119 @@ async def get_solution(request: SolutionRequest):
             "type": "ai_generated",
             "timestamp": datetime.now().isoformat()
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating solution: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+# Streaming (Server-Sent Events) variants of chat, hint and solution
+def _sse_event(event: str, data: Dict) -> str:
+    """Encode one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _sse_response(chunks: Optional[AsyncIterator[str]],
+                  metadata: Dict,
+                  on_complete: Optional[Callable[[str], None]] = None) -> StreamingResponse:
+    """Forward text chunks as `chunk` events, then a final `done` event with metadata.
+
+    on_complete receives the full text once the stream has finished.
+    """
+
+    async def event_stream():
+        parts = []
+        if chunks is not None:
+            async for text in chunks:
+                parts.append(text)
+                yield _sse_event("chunk", {"text": text})
+        if on_complete:
+            on_complete("".join(parts))
+        metadata["timestamp"] = datetime.now().isoformat()
+        yield _sse_event("done", metadata)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _single_chunk(text: str) -> AsyncIterator[str]:
+    yield text
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    logger.debug(f"Streaming chat request - User message: {request.user_message[:100]}...")
+
+    if not ai_tutor:
+        raise HTTPException(status_code=503, detail="AI Tutor not available. Check API key.")
+
+    session, problem, history = _resolve_conversation(
+        request.session_id, request.problem, request.conversation_history
+    )
+    on_complete = None
+    if session:
+        _invalidate_hint_prefetch(session)
+        session.add_message("user", request.user_message)
+        history = list(session.conversation_history)
+
+        def on_complete(text: str):
+            session.add_message("assistant", text)
+            _prefetch_next_hint(session)
+
+    chunks = ai_tutor.astream_response(
+        problem=problem,
+        conversation_history=history,
+        user_message=request.user_message,
+        conversation_id=session.id if session else None
+    )
+    return _sse_response(chunks, {}, on_complete)
+
+@app.post("/api/hint/stream")
+async def hint_stream(request: HintRequest):
+    logger.info(f"Streaming hint requested - Level: {request.hint_level}")
+
+    if not ai_tutor:
+        raise HTTPException(status_code=503, detail="AI Tutor not available. Check API key.")
+
+    session, problem, history = _resolve_conversation(
+        request.session_id, request.problem, request.conversation_history
+    )
+    on_complete = None
+    if session:
+        on_complete = lambda text: _record_hint(session, request.hint_level, text)
+
+    prefetched = await _prefetched_hint(session, request.hint_level)
+    if prefetched is not None:
+        chunks = _single_chunk(prefetched)
+    else:
+        chunks = ai_tutor.astream_hint(
+            problem=problem,
+            conversation_history=list(history),
+            hint_level=request.hint_level,
+            conversation_id=session.id if session else None
+        )
+    return _sse_response(chunks, {"level": request.hint_level}, on_complete)
+
+@app.post("/api/solution/stream")
+async def solution_stream(request: SolutionRequest):
+    logger.info(f"Streaming solution requested for problem")
+
+    _, problem, _ = _resolve_conversation(request.session_id, request.problem)
+
+    # Curated problems (and pasted copies) already have a structured solution - send it as one event
+    official_solution = await _curated_solution(problem)
+    if official_solution is not None:
+        return _sse_response(None, {
+            "type": "official",
+            "curated_id": problem.get('curated_id', problem.get('id')),
+            "solution": official_solution
+        })
+
+    if not ai_tutor:
+        raise HTTPException(status_code=503, detail="AI Tutor not available. Check API key.")
+
+    return _sse_response(ai_tutor.astream_solution(problem), {"type": "ai_generated"})
+
 # Error handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -0,0 +1,54 @@
+import asyncio
+import itertools
+import json
+import os
+from pathlib import Path
+
+import httpx
+import pytest
+
+# Every write gets a later mtime, so reload() never mistakes an edit made
+# within the filesystem's timestamp resolution for an unchanged file
+_mtimes = itertools.count(1_700_000_000 * 10 ** 9, 10 ** 9)
+
+
+def make_problem(problem_id: str, text: str, **fields) -> dict:
+    """A valid problem record; `fields` override or add to the defaults"""
+    return {
+        "id": problem_id,
+        "text": text,
+        "year": 2020,
+        "exam": "JEE Main",
+        "chapter": "Kinematics",
+        "topic": "Projectile Motion",
+        "subtopics": [],
+        "difficulty": "easy",
+        **fields,
+    }
+
+
+def write_source(directory: Path, name: str, problems: list) -> Path:
+    """Write one problem source file into `directory`"""
+    path = Path(directory) / name
+    path.write_text(json.dumps(problems), encoding="utf-8")
+    mtime = next(_mtimes)
+    os.utime(path, ns=(mtime, mtime))
+    return path
+
+
+def api_get(path: str, **params) -> httpx.Response:
+    """GET from the FastAPI app in-process"""
+    import main
+
+    async def request():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, params=params)
+    return asyncio.run(request())
+
+
+@pytest.fixture
+def problems_dir(tmp_path: Path) -> Path:
+    directory = tmp_path / "problems"
+    directory.mkdir()
+    return directory
@@ -0,0 +1,52 @@
+import asyncio
+
+from app.services.admission import (
+    INTERACTIVE, AdmissionController, AdmissionMiddleware, TokenBucketLimiter
+)
+
+
+async def _ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def _middleware(trusted_proxy_hops: int = 1) -> AdmissionMiddleware:
+    controller = AdmissionController(max_in_flight=4, interactive_reserved=1, max_queue=4, queue_timeout=1)
+    limiter = TokenBucketLimiter(rate_per_minute=0, burst=2)
+    return AdmissionMiddleware(_ok_app, controller, limiter, {"/api/chat": INTERACTIVE},
+                               trusted_proxy_hops=trusted_proxy_hops)
+
+
+def _status(middleware: AdmissionMiddleware, forwarded_for=None, client=("10.0.0.1", 1234)) -> int:
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    scope = {"type": "http", "method": "POST", "path": "/api/chat", "headers": headers, "client": client}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    return sent[0]["status"]
+
+
+def test_spoofed_leading_forwarded_for_does_not_get_a_new_bucket():
+    middleware = _middleware()
+    # The proxy appends the real address; the client controls everything before it
+    statuses = [_status(middleware, f"198.51.100.{i}, 203.0.113.7") for i in range(3)]
+    assert statuses == [200, 200, 429]
+
+
+def test_client_id_is_the_entry_the_trusted_proxies_appended():
+    middleware = _middleware(trusted_proxy_hops=2)
+    scope = {"headers": [(b"x-forwarded-for", b"1.1.1.1, 203.0.113.7, 10.1.0.2")], "client": ("10.1.0.3", 80)}
+    assert middleware._client_id(scope) == "203.0.113.7"
+
+
+def test_falls_back_to_the_socket_peer_without_a_proxy():
+    assert _middleware()._client_id({"headers": [], "client": ("192.0.2.5", 80)}) == "192.0.2.5"
+    # With no trusted proxies the header is ignored entirely
+    scope = {"headers": [(b"x-forwarded-for", b"203.0.113.7")], "client": ("192.0.2.5", 80)}
+    assert _middleware(trusted_proxy_hops=0)._client_id(scope) == "192.0.2.5"
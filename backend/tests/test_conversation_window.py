@@ -0,0 +1,104 @@
+from app.services.conversation_window import ConversationWindow, estimate_tokens
+
+
+def conversation(count: int, words: int = 10):
+    """Alternating student/tutor messages, each about 2.5 * words tokens"""
+    return [{"role": "user" if i % 2 == 0 else "assistant",
+             "content": f"message {i} " + "word " * words} for i in range(count)]
+
+
+def recent_part(formatted: str) -> str:
+    return formatted.split("RECENT MESSAGES:\n", 1)[-1]
+
+
+def test_empty_conversation():
+    assert ConversationWindow().format([]) == "No conversation yet - this is the first interaction."
+
+
+def test_short_conversation_is_kept_verbatim():
+    history = conversation(4)
+    formatted = ConversationWindow(recent_token_budget=1000).format(history)
+    assert "summary" not in formatted
+    assert formatted.startswith("Student: message 0")
+    assert formatted.count("Tutor: ") == 2
+
+
+def test_older_messages_are_folded_into_a_summary():
+    window = ConversationWindow(recent_token_budget=100, summary_token_budget=1000)
+    formatted = window.format(conversation(20), "c1")
+    summary, recent = formatted.split("RECENT MESSAGES:\n")
+    assert summary.startswith("EARLIER IN THIS CONVERSATION (summary):\n- Student: message 0 ")
+    assert estimate_tokens(recent) <= 100
+    assert recent.rstrip().endswith("message 19 " + "word " * 9 + "word")
+    # Every message appears exactly once, in order
+    positions = [formatted.index(f"message {i} ") for i in range(20)]
+    assert positions == sorted(positions)
+
+
+def test_prompt_size_does_not_grow_with_the_conversation():
+    window = ConversationWindow(recent_token_budget=200, summary_token_budget=100)
+    sizes = [estimate_tokens(window.format(conversation(count))) for count in (40, 400, 4000)]
+    assert max(sizes) <= 200 + 100 + 40  # budgets plus headers and separators
+    assert max(sizes) - min(sizes) <= 20
+
+
+def test_summary_drops_oldest_lines_beyond_its_budget():
+    window = ConversationWindow(recent_token_budget=50, summary_token_budget=60)
+    formatted = window.format(conversation(30))
+    assert "earlier messages omitted)" in formatted
+    assert "message 0 " not in formatted
+    summary = formatted.split("RECENT MESSAGES:\n")[0]
+    lines = [line for line in summary.splitlines() if line.startswith("- ") and "omitted" not in line]
+    assert sum(estimate_tokens(line[2:]) for line in lines) <= 60
+
+
+def test_latest_message_is_kept_even_over_budget():
+    history = conversation(3) + [{"role": "user", "content": "long " * 200}]
+    formatted = ConversationWindow(recent_token_budget=10).format(history)
+    assert recent_part(formatted).strip() == "Student: " + ("long " * 200).strip()
+
+
+def test_summary_lines_are_compressed():
+    window = ConversationWindow(recent_token_budget=5, line_chars=20)
+    history = [{"role": "user", "content": "first   line\n\nwith  gaps and a long tail of words"},
+               {"role": "assistant", "content": "reply"}]
+    formatted = window.format(history)
+    assert "- Student: first line with gaps...\n" in formatted
+
+
+def test_cached_summary_is_only_extended(monkeypatch):
+    window = ConversationWindow(recent_token_budget=60, summary_token_budget=10000)
+    compressed = []
+    original = window._compress
+    monkeypatch.setattr(window, "_compress", lambda msg: compressed.append(msg["content"]) or original(msg))
+
+    window.format(conversation(20), "c1")
+    first = len(compressed)
+    assert first > 0
+    history = conversation(22)
+    window.format(history, "c1")
+    # Only the messages that just left the window are summarized
+    assert len(compressed) - first <= 2
+    assert len(set(compressed)) == len(compressed)
+
+    # Without a conversation id, nothing is cached
+    window.format(history)
+    window.format(history)
+    assert len(compressed) > 2 * first
+
+
+def test_forget_and_capacity():
+    window = ConversationWindow(recent_token_budget=20, max_conversations=2)
+    for conversation_id in ("a", "b", "c"):
+        window.format(conversation(10), conversation_id)
+    assert list(window._summaries) == ["b", "c"]
+    window.forget("b")
+    assert list(window._summaries) == ["c"]
+
+
+def test_shorter_history_for_a_known_id_starts_over():
+    window = ConversationWindow(recent_token_budget=20)
+    window.format(conversation(30), "c1")
+    formatted = window.format(conversation(3), "c1")
+    assert "message 29" not in formatted
+    assert "message 0 " in formatted
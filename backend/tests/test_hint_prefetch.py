@@ -0,0 +1,184 @@
+import asyncio
+
+from app.services.hint_prefetch import HintPrefetcher
+from app.services.session_store import TutoringSession
+
+
+class FakeTutor:
+    """aspeculate_hint held until released; `calls` is what the budget is measured against"""
+
+    def __init__(self, calls: int = 100, error: Exception = None):
+        self.calls = calls
+        self.error = error
+        self.release = asyncio.Event()
+        self.requests = []
+
+    def get_prompt_token_stats(self):
+        return {"calls": self.calls}
+
+    async def aspeculate_hint(self, problem, conversation_history, hint_level, conversation_id):
+        self.requests.append((conversation_id, hint_level, len(conversation_history)))
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return f"hint {hint_level} for {conversation_id}"
+
+
+def session(session_id: str = "s1", messages: int = 2, hint_level: int = 0) -> TutoringSession:
+    session = TutoringSession(session_id, {"id": "P_1"})
+    for i in range(messages):
+        session.add_message("user" if i % 2 == 0 else "assistant", f"message {i}")
+    session.hint_level = hint_level
+    return session
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_prefetched_hint_is_used_for_the_next_level():
+    async def scenario():
+        tutor = FakeTutor()
+        prefetcher = HintPrefetcher(tutor)
+        s = session(hint_level=1)
+        prefetcher.schedule(s)
+        await settle()
+        tutor.release.set()
+        return tutor, prefetcher, await prefetcher.take(s, 2)
+
+    tutor, prefetcher, hint = asyncio.run(scenario())
+    assert hint == "hint 2 for s1"
+    assert tutor.requests == [("s1", 2, 2)]
+    stats = prefetcher.get_stats()
+    assert (stats["started"], stats["hits"], stats["misses"], stats["in_flight"]) == (1, 1, 0, 0)
+    assert stats["hit_rate"] == 1.0
+
+
+def test_take_awaits_a_prefetch_still_running():
+    async def scenario():
+        tutor = FakeTutor()
+        prefetcher = HintPrefetcher(tutor)
+        s = session()
+        prefetcher.schedule(s)
+        taker = asyncio.ensure_future(prefetcher.take(s, 1))
+        await settle()
+        assert not taker.done()
+        tutor.release.set()
+        return await taker, len(tutor.requests)
+
+    assert asyncio.run(scenario()) == ("hint 1 for s1", 1)
+
+
+def test_other_level_or_new_message_is_a_miss():
+    async def scenario():
+        tutor = FakeTutor()
+        tutor.release.set()
+        prefetcher = HintPrefetcher(tutor)
+
+        s = session()
+        prefetcher.schedule(s)
+        await settle()
+        wrong_level = await prefetcher.take(s, 2)
+
+        prefetcher.schedule(s)
+        await settle()
+        s.add_message("user", "something new")
+        stale = await prefetcher.take(s, 1)
+        return prefetcher, wrong_level, stale, await prefetcher.take(s, 1)
+
+    prefetcher, wrong_level, stale, nothing = asyncio.run(scenario())
+    assert (wrong_level, stale, nothing) == (None, None, None)
+    stats = prefetcher.get_stats()
+    assert (stats["hits"], stats["misses"], stats["wasted"]) == (0, 3, 2)
+
+
+def test_invalidate_cancels_a_running_prefetch():
+    async def scenario():
+        tutor = FakeTutor()
+        prefetcher = HintPrefetcher(tutor)
+        s = session()
+        prefetcher.schedule(s)
+        task = s.hint_prefetch.task
+        await settle()
+        prefetcher.invalidate(s)
+        await settle()
+        return prefetcher, s, task
+
+    prefetcher, s, task = asyncio.run(scenario())
+    assert task.cancelled()
+    assert s.hint_prefetch is None
+    stats = prefetcher.get_stats()
+    assert (stats["wasted"], stats["failures"], stats["in_flight"]) == (1, 0, 0)
+
+
+def test_failed_prefetch_falls_back_to_a_normal_hint():
+    async def scenario():
+        tutor = FakeTutor(error=RuntimeError("quota"))
+        tutor.release.set()
+        prefetcher = HintPrefetcher(tutor)
+        s = session()
+        prefetcher.schedule(s)
+        await settle()
+        return prefetcher, await prefetcher.take(s, 1)
+
+    prefetcher, hint = asyncio.run(scenario())
+    assert hint is None
+    stats = prefetcher.get_stats()
+    assert (stats["failures"], stats["misses"], stats["wasted"]) == (1, 1, 0)
+
+
+def test_speculative_calls_stay_within_their_share_of_all_calls():
+    async def scenario():
+        tutor = FakeTutor(calls=3)
+        tutor.release.set()
+        prefetcher = HintPrefetcher(tutor, max_share=0.25, max_in_flight=10)
+        sessions = [session(f"s{i}") for i in range(4)]
+        for s in sessions:
+            prefetcher.schedule(s)
+        await settle()
+        allowed_at_3 = prefetcher.stats["started"]
+
+        tutor.calls = 7
+        for s in sessions:
+            prefetcher.schedule(s)
+        await settle()
+        return allowed_at_3, prefetcher.stats
+
+    allowed_at_3, stats = asyncio.run(scenario())
+    # 1 of (3 + 1) calls, then 2 of (7 + 1)
+    assert allowed_at_3 == 1
+    assert stats["started"] == 2
+    assert stats["skipped_budget"] == 6
+
+
+def test_in_flight_prefetches_are_capped():
+    async def scenario():
+        tutor = FakeTutor()
+        prefetcher = HintPrefetcher(tutor, max_share=1.0, max_in_flight=2)
+        sessions = [session(f"s{i}") for i in range(3)]
+        for s in sessions:
+            prefetcher.schedule(s)
+        await settle()
+        capped = (prefetcher.get_stats()["in_flight"], sessions[2].hint_prefetch)
+        tutor.release.set()
+        await settle()
+        prefetcher.schedule(sessions[2])
+        await settle()
+        return capped, prefetcher.stats
+
+    (in_flight, third), stats = asyncio.run(scenario())
+    assert (in_flight, third) == (2, None)
+    assert stats["started"] == 3
+    assert stats["skipped_budget"] == 1
+
+
+def test_nothing_is_prefetched_past_the_last_level_or_when_disabled():
+    async def scenario():
+        last_level = session(hint_level=3)
+        HintPrefetcher(FakeTutor()).schedule(last_level)
+        disabled = session()
+        HintPrefetcher(FakeTutor(), max_share=0).schedule(disabled)
+        return last_level.hint_prefetch, disabled.hint_prefetch
+
+    assert asyncio.run(scenario()) == (None, None)
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services.utils import ProblemLoader
+from conftest import make_problem, write_source
+
+PROJECTILE = ("A ball is thrown horizontally with a speed of 20 m/s from the top of a cliff "
+              "45 m high. Taking g = 10 m/s², find the horizontal distance from the foot of the "
+              "cliff at which the ball strikes the ground and the time it takes to land.")
+INCLINE = ("A block of mass 2 kg is released from rest at the top of a smooth incline of "
+           "angle 30° and length 5 m. Find its speed at the bottom of the incline.")
+OPTIONS = [{"id": "a", "text": "60 m"}, {"id": "b", "text": "30 m"},
+           {"id": "c", "text": "90 m"}, {"id": "d", "text": "45 m"}]
+
+
+@pytest.fixture
+def loader(problems_dir):
+    write_source(problems_dir, "bank.json", [
+        make_problem("PROJ_1", PROJECTILE, options=OPTIONS),
+        make_problem("INC_1", INCLINE, topic="Inclined Plane",
+                     official_solution={"steps": ["Use v² = 2as"]}),
+    ])
+    return ProblemLoader(problems_dir)
+
+
+def test_exact_copy(loader):
+    match, similarity = loader.find_duplicate({"text": INCLINE})
+    assert match.id == "INC_1"
+    assert similarity == 1.0
+
+
+def test_copy_with_different_formatting(loader):
+    pasted = INCLINE.upper().replace("30°", "30 °").replace(".", " .")
+    match, similarity = loader.find_duplicate({"text": pasted})
+    assert match.id == "INC_1"
+    assert similarity == 1.0
+
+
+def test_near_duplicate_with_an_added_sentence(loader):
+    pasted = PROJECTILE + " Neglect air resistance."
+    match, similarity = loader.find_duplicate({"text": pasted, "options": OPTIONS})
+    assert match.id == "PROJ_1"
+    assert 0.8 <= similarity < 1.0
+
+
+def test_options_in_another_order_still_match(loader):
+    match, _ = loader.find_duplicate({"text": PROJECTILE, "options": list(reversed(OPTIONS))})
+    assert match.id == "PROJ_1"
+
+
+def test_same_wording_with_other_numbers_is_not_a_duplicate(loader):
+    variant = INCLINE.replace("2 kg", "3 kg").replace("5 m", "8 m")
+    assert loader.find_duplicate({"text": variant}) is None
+
+
+def test_different_options_are_not_a_duplicate(loader):
+    options = [{"id": o["id"], "text": f"{int(o['text'].split()[0]) + 5} m"} for o in OPTIONS]
+    assert loader.find_duplicate({"text": PROJECTILE, "options": options}) is None
+
+
+@pytest.mark.parametrize("text", [
+    "Two charges of 1 μC each are placed 10 cm apart in vacuum. Find the force between them.",
+    "A block is released.",
+    "",
+])
+def test_unrelated_text_is_not_a_duplicate(loader, text):
+    assert loader.find_duplicate({"text": text}) is None
+
+
+def test_threshold_is_configurable(problems_dir):
+    write_source(problems_dir, "bank.json", [make_problem("PROJ_1", PROJECTILE)])
+    pasted = PROJECTILE + " Neglect air resistance."
+    assert ProblemLoader(problems_dir, duplicate_threshold=0.99).find_duplicate({"text": pasted}) is None
+    assert ProblemLoader(problems_dir, duplicate_threshold=0.5).find_duplicate({"text": pasted}) is not None
+
+
+def test_reloaded_problems_are_found(loader, problems_dir):
+    write_source(problems_dir, "more.json", [make_problem("NEW_1", PROJECTILE.replace("cliff", "tower"))])
+    loader.reload()
+    match, _ = loader.find_duplicate({"text": PROJECTILE.replace("cliff", "tower")})
+    assert match.id == "NEW_1"
+
+
+def test_matched_official_solution_is_fetched_off_the_event_loop(loader, monkeypatch):
+    import main
+    monkeypatch.setattr(main, "problem_loader", loader)
+    lookups = []
+    original = loader.get_problem_by_id
+    monkeypatch.setattr(loader, "get_problem_by_id",
+                        lambda problem_id: lookups.append(threading.current_thread()) or original(problem_id))
+
+    async def fetch():
+        return threading.current_thread(), await main._curated_solution(
+            {"text": INCLINE, "user_submitted": True, "curated_id": "INC_1"})
+
+    loop_thread, solution = asyncio.run(fetch())
+    assert solution == {"steps": ["Use v² = 2as"]}
+    assert lookups and lookups[0] is not loop_thread
@@ -0,0 +1,194 @@
+import json
+
+import pytest
+
+from app.services.utils import MAX_SEARCH_OFFSET, ProblemLoader, _encode_cursor, _query_hash
+from conftest import api_get, make_problem, write_source
+
+
+def bank(count, prefix, **fields):
+    return [make_problem(f"{prefix}_{i}", f"Projectile problem {prefix} {i}.", **fields) for i in range(count)]
+
+
+def walk(loader, limit, between_pages=None, **filters):
+    """Every id list_page returns, following next_cursor to the end"""
+    seen, cursor, pages = [], None, 0
+    while True:
+        total, page, cursor = loader.list_page(limit, cursor, **filters)
+        seen.extend(problem.id for problem in page)
+        pages += 1
+        if cursor is None:
+            return seen
+        if between_pages:
+            between_pages(pages)
+
+
+@pytest.fixture
+def loader(problems_dir):
+    write_source(problems_dir, "a.json", bank(5, "A"))
+    write_source(problems_dir, "b.json", bank(5, "B", difficulty="hard"))
+    return ProblemLoader(problems_dir)
+
+
+def test_cursor_pages_cover_the_bank_once(loader):
+    expected = [f"A_{i}" for i in range(5)] + [f"B_{i}" for i in range(5)]
+    for limit in (1, 3, 10, 50):
+        assert walk(loader, limit) == expected
+
+
+def test_cursor_pages_with_filters(loader):
+    assert walk(loader, 2, difficulty="hard") == [f"B_{i}" for i in range(5)]
+    total, page, cursor = loader.list_page(2, difficulty="hard")
+    assert (total, cursor is not None) == (5, True)
+
+
+def test_last_page_has_no_cursor(loader):
+    total, page, cursor = loader.list_page(10)
+    assert (total, len(page), cursor) == (10, 10, None)
+
+
+def test_problems_added_between_pages_come_after_the_cursor(loader, problems_dir):
+    def add_file(pages):
+        if pages == 1:
+            write_source(problems_dir, "c.json", bank(2, "C"))
+            loader.reload()
+
+    seen = walk(loader, 3, add_file)
+    assert seen == [f"A_{i}" for i in range(5)] + [f"B_{i}" for i in range(5)] + ["C_0", "C_1"]
+
+
+@pytest.fixture
+def large_loader(problems_dir):
+    """Enough problems that replacing b.json stays below the compaction ratio"""
+    write_source(problems_dir, "a.json", bank(5, "A"))
+    write_source(problems_dir, "b.json", bank(3, "B"))
+    write_source(problems_dir, "c.json", bank(30, "C"))
+    return ProblemLoader(problems_dir)
+
+
+def test_removed_problems_at_the_cursor_are_not_skipped_past(large_loader, problems_dir):
+    def remove_b(pages):
+        if pages == 1:
+            (problems_dir / "b.json").unlink()
+            large_loader.reload()
+
+    # The first page ends on B_0; its tombstone still anchors the cursor
+    seen = walk(large_loader, 6, remove_b)
+    assert seen == [f"A_{i}" for i in range(5)] + ["B_0"] + [f"C_{i}" for i in range(30)]
+
+
+def test_problems_edited_behind_the_cursor_come_again_at_the_end(large_loader, problems_dir):
+    def edit_a(pages):
+        if pages == 1:
+            problems = bank(5, "A")
+            problems[0]["text"] = "Edited."
+            write_source(problems_dir, "a.json", problems)
+            large_loader.reload()
+
+    seen = walk(large_loader, 10, edit_a)
+    assert seen == ([f"A_{i}" for i in range(5)] + [f"B_{i}" for i in range(3)]
+                    + [f"C_{i}" for i in range(30)] + [f"A_{i}" for i in range(5)])
+    assert large_loader._snapshot.tombstones == 5
+
+
+def test_cursor_expires_when_a_compaction_renumbers_the_bank(loader, problems_dir):
+    _, page, cursor = loader.list_page(3)
+    # Replacing b.json leaves 5 tombstones in 15 positions, so the bank is compacted
+    write_source(problems_dir, "b.json", bank(5, "B", difficulty="hard", year=2021))
+    loader.reload()
+    assert loader._snapshot.tombstones == 0
+    with pytest.raises(ValueError, match="start again"):
+        loader.list_page(3, cursor)
+
+
+def test_cursor_is_valid_across_workers_with_the_same_files(loader, problems_dir):
+    _, _, cursor = loader.list_page(3)
+    other_worker = ProblemLoader(problems_dir)
+    assert [p.id for p in other_worker.list_page(3, cursor)[1]] == ["A_3", "A_4", "B_0"]
+
+
+def test_search_cursor_continues_the_same_query(loader):
+    total, offset, hits, cursor = loader.search_page("projectile", limit=4)
+    assert (total, offset, len(hits)) == (10, 0, 4)
+    _, offset, more, _ = loader.search_page("projectile", limit=4, cursor=cursor)
+    assert offset == 4
+    assert not {s.id for s, _ in hits} & {s.id for s, _ in more}
+
+    with pytest.raises(ValueError, match="does not belong"):
+        loader.search_page("projectile", limit=4, cursor=cursor, difficulty="hard")
+    with pytest.raises(ValueError, match="does not belong"):
+        loader.search_page("problem", limit=4, cursor=cursor)
+
+
+def test_search_cursor_cannot_go_past_the_offset_limit(loader):
+    forged = _encode_cursor("offset", MAX_SEARCH_OFFSET + 1, _query_hash("projectile", {}))
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        loader.search_page("projectile", cursor=forged)
+
+
+def test_malformed_listing_cursor_is_rejected(loader):
+    numbering = loader._snapshot.numbering
+    for cursor in ["not-a-cursor", _encode_cursor("after", -1, numbering),
+                   _encode_cursor("offset", 2, numbering), _encode_cursor("after", 10, numbering)]:
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            loader.list_page(3, cursor)
+
+
+def test_row_projection_keeps_the_requested_field_order(loader):
+    summaries = loader.query()[:2]
+    rows = [json.loads(row) for row in loader.row_cache.rows(summaries, ["topic", "id"])]
+    assert rows == [{"topic": "Projectile Motion", "id": "A_0"}, {"topic": "Projectile Motion", "id": "A_1"}]
+    assert list(rows[0]) == ["topic", "id"]
+    full = json.loads(loader.row_cache.rows(summaries[:1])[0])
+    assert full == json.loads(json.dumps(dict(summaries[0])))
+
+
+def test_row_cache_reserializes_problems_changed_by_a_reload(loader, problems_dir):
+    loader.row_cache.rows(loader.query())
+    problems = bank(5, "A")
+    problems[0]["text"] = "Edited."
+    write_source(problems_dir, "a.json", problems)
+    loader.reload()
+    [row] = loader.row_cache.rows([s for s in loader.query() if s.id == "A_0"], ["text"])
+    assert json.loads(row) == {"text": "Edited."}
+
+
+@pytest.fixture
+def api_loader(loader, monkeypatch):
+    import main
+    monkeypatch.setattr(main, "problem_loader", loader)
+    return loader
+
+
+def test_samples_endpoint_pages_and_projects(api_loader):
+    ids, cursor = [], None
+    while True:
+        params = {"limit": 4, "fields": "id,difficulty"}
+        if cursor:
+            params["cursor"] = cursor
+        body = api_get("/api/problems/samples", **params).json()
+        assert body["total"] == 10
+        assert all(set(problem) == {"id", "difficulty"} for problem in body["problems"])
+        ids.extend(problem["id"] for problem in body["problems"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert ids == [f"A_{i}" for i in range(5)] + [f"B_{i}" for i in range(5)]
+
+
+def test_search_endpoint_projects_score(api_loader):
+    body = api_get("/api/problems/search", q="projectile", limit=3, fields="id,score").json()
+    assert body["total"] == 10
+    assert all(set(result) == {"id", "score"} for result in body["results"])
+    assert body["next_cursor"] is not None
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/api/problems/samples", {"fields": "id,colour"}),
+    ("/api/problems/samples", {"fields": "score"}),
+    ("/api/problems/samples", {"cursor": "garbage"}),
+    ("/api/problems/samples", {"cursor": _encode_cursor("after", 2, "another-numbering")}),
+    ("/api/problems/search", {"q": "projectile", "fields": "colour"}),
+])
+def test_bad_fields_and_cursors_are_400(api_loader, path, params):
+    assert api_get(path, **params).status_code == 400
@@ -0,0 +1,74 @@
+import shutil
+
+import pytest
+
+from app.services import problem_bank
+from app.services.problem_bank import (
+    compile_problem_bank, minhash_index_path, search_index_path, vector_index_path,
+)
+from app.services.utils import ProblemLoader
+from conftest import make_problem, write_source
+
+SIDE_FILES = (search_index_path, vector_index_path, minhash_index_path)
+
+
+@pytest.fixture
+def bank_path(problems_dir, tmp_path):
+    write_source(problems_dir, "kinematics.json", [
+        make_problem("KIN_1", "A ball is thrown horizontally from a cliff."),
+        make_problem("KIN_2", "A stone is projected at 45 degrees."),
+    ])
+    path = tmp_path / "bank" / "problems.db"
+    compile_problem_bank(problems_dir, path)
+    return path
+
+
+def origins(loader):
+    stats = loader.get_stats()
+    return stats["vector_index"]["origin"], stats["near_duplicate_index"]["origin"]
+
+
+def test_side_files_from_the_same_build_are_loaded(problems_dir, bank_path):
+    loader = ProblemLoader(problems_dir, bank_path=bank_path)
+    assert origins(loader) == ("loaded", "loaded")
+    assert not list(bank_path.parent.glob("*.tmp"))
+
+
+def test_side_files_from_another_build_are_rebuilt(problems_dir, bank_path, tmp_path):
+    old = tmp_path / "old"
+    old.mkdir()
+    for side_file in SIDE_FILES:
+        shutil.copy(side_file(bank_path), old / side_file(bank_path).name)
+
+    # Same number of problems, different text: only the fingerprint tells the builds apart
+    write_source(problems_dir, "kinematics.json", [
+        make_problem("KIN_1", "A block slides down a rough incline."),
+        make_problem("KIN_2", "A car rounds a banked curve."),
+    ])
+    compile_problem_bank(problems_dir, bank_path)
+    for side_file in SIDE_FILES:
+        shutil.copy(old / side_file(bank_path).name, side_file(bank_path))
+
+    loader = ProblemLoader(problems_dir, bank_path=bank_path)
+    assert origins(loader) == ("built", "built")
+    match, _ = loader.find_duplicate({"text": "A block slides down a rough incline."})
+    assert match["id"] == "KIN_1"
+
+
+def test_bank_is_renamed_into_place_after_its_side_files(problems_dir, tmp_path, monkeypatch):
+    write_source(problems_dir, "kinematics.json", [make_problem("KIN_1", "A ball is thrown.")])
+    renamed = []
+    real_replace = problem_bank.os.replace
+
+    def replace(src, dst):
+        renamed.append(str(dst))
+        real_replace(src, dst)
+    monkeypatch.setattr(problem_bank.os, "replace", replace)
+
+    path = tmp_path / "problems.db"
+    compile_problem_bank(problems_dir, path)
+    final = [name for name in renamed if not name.endswith(".tmp")]
+    assert final[-1] == str(path)
+    assert set(final[:-1]) == {str(side_file(path)) for side_file in SIDE_FILES}
+    # Nothing reaches its final name before every file has been written
+    assert renamed.index(final[0]) == len(renamed) - len(final)
@@ -0,0 +1,92 @@
+import pytest
+
+from app.services.utils import ProblemLoader
+from conftest import api_get, make_problem, write_source
+
+
+@pytest.fixture
+def loader(problems_dir):
+    write_source(problems_dir, "kinematics.json", [
+        make_problem("KIN_1", "A ball is thrown horizontally from a cliff.",
+                     subtopics=["Horizontal projection"], difficulty="easy", year=2019),
+        make_problem("KIN_2", "A stone is projected at 45 degrees.",
+                     subtopics=["Oblique projection", "Range"], difficulty="medium", year=2020,
+                     official_solution={"steps": ["Resolve the velocity"]}),
+    ])
+    write_source(problems_dir, "rotation.json", [
+        make_problem("ROT_1", "Find the moment of inertia of a disc.", chapter="Rotation",
+                     topic="Moment of Inertia", subtopics=["Range"], difficulty="medium",
+                     year=2019, exam="JEE Advanced"),
+    ])
+    return ProblemLoader(problems_dir)
+
+
+def ids(problems):
+    return [problem.id for problem in problems]
+
+
+def test_query_filters_are_combined(loader):
+    assert ids(loader.query()) == ["KIN_1", "KIN_2", "ROT_1"]
+    assert ids(loader.query(difficulty="medium")) == ["KIN_2", "ROT_1"]
+    assert ids(loader.query(difficulty="medium", year=2019)) == ["ROT_1"]
+    assert ids(loader.query(topic="Projectile Motion", exam="JEE Advanced")) == []
+
+
+def test_list_valued_fields_are_indexed_per_value(loader):
+    assert ids(loader.query(subtopic="Range")) == ["KIN_2", "ROT_1"]
+    assert ids(loader.query(subtopic="Horizontal projection")) == ["KIN_1"]
+
+
+def test_empty_filters_are_ignored(loader):
+    assert ids(loader.filter_problems(chapter="", topic=None, difficulty="easy")) == ["KIN_1"]
+
+
+def test_unknown_filter_is_rejected(loader):
+    with pytest.raises(ValueError, match="Unsupported filters: colour"):
+        loader.query(colour="red")
+
+
+def test_field_values(loader):
+    assert loader.get_all_chapters() == ["Kinematics", "Rotation"]
+    assert loader.get_all_topics() == ["Moment of Inertia", "Projectile Motion"]
+    assert loader.get_field_values("year") == [2019, 2020]
+
+
+def test_get_problem_by_id_includes_heavy_fields(loader):
+    problem = loader.get_problem_by_id("KIN_2")
+    assert problem["text"] == "A stone is projected at 45 degrees."
+    assert problem["official_solution"] == {"steps": ["Resolve the velocity"]}
+    # Listings only carry the summary
+    assert "official_solution" not in dict(loader.query(difficulty="medium")[0])
+
+
+def test_get_problem_by_id_unknown(loader):
+    assert loader.get_problem_by_id("NOPE") is None
+
+
+def test_invalid_problems_are_skipped_and_reported(problems_dir):
+    write_source(problems_dir, "mixed.json", [make_problem("OK_1", "Valid."), {"id": "BAD_1"}])
+    loader = ProblemLoader(problems_dir)
+    assert ids(loader.query()) == ["OK_1"]
+    [issue] = loader.get_schema_issues()
+    assert (issue.source, issue.problem_id, issue.field) == ("mixed.json", "BAD_1", "text")
+
+
+@pytest.fixture
+def api_loader(loader, monkeypatch):
+    import main
+    monkeypatch.setattr(main, "problem_loader", loader)
+    return loader
+
+
+def test_problem_endpoint(api_loader):
+    response = api_get("/api/problems/ROT_1")
+    assert response.status_code == 200
+    assert response.json()["topic"] == "Moment of Inertia"
+
+
+@pytest.mark.parametrize("path", ["/api/problems/NOPE", "/api/problems/NOPE/similar"])
+def test_problem_endpoints_404_for_unknown_ids(api_loader, path):
+    response = api_get(path)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Problem NOPE not found"
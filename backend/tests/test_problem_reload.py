@@ -0,0 +1,195 @@
+import threading
+
+from app.services.utils import INDEXED_FIELDS, ProblemLoader, _index_values
+from conftest import make_problem, write_source
+
+
+def ids(problems):
+    return [problem.id for problem in problems]
+
+
+def assert_consistent(snapshot):
+    """Every index entry and id points at a live problem that has that value"""
+    live = [position for position, problem in enumerate(snapshot.problems) if problem is not None]
+    assert len(snapshot.problems) - snapshot.tombstones == len(live)
+    assert sorted(snapshot.by_id.values()) == live
+    for position in live:
+        assert snapshot.by_id[snapshot.problems[position].id] == position
+    for name, field in INDEXED_FIELDS.items():
+        for value, positions in snapshot.indexes[name].items():
+            assert positions == sorted(positions)
+            for position in positions:
+                assert value in _index_values(snapshot.problems[position], field)
+
+
+def bank(count, topic="Projectile Motion", prefix="P"):
+    return [make_problem(f"{prefix}_{i}", f"Problem {prefix} {i}.", topic=topic) for i in range(count)]
+
+
+def test_reload_without_changes_keeps_the_snapshot(problems_dir):
+    write_source(problems_dir, "a.json", bank(3))
+    loader = ProblemLoader(problems_dir)
+    snapshot = loader._snapshot
+    assert loader.reload()["changed_files"] == []
+    assert loader._snapshot is snapshot
+
+
+def test_edited_problem_is_replaced(problems_dir):
+    write_source(problems_dir, "a.json", bank(3))
+    loader = ProblemLoader(problems_dir)
+    problems = bank(3)
+    problems[1]["text"] = "Edited."
+    write_source(problems_dir, "a.json", problems)
+
+    assert loader.reload()["changed_files"] == ["a.json"]
+    assert loader.get_problem_by_id("P_1")["text"] == "Edited."
+    assert loader.get_total_count() == 3
+    assert_consistent(loader._snapshot)
+
+
+def test_topic_move_updates_the_index(problems_dir):
+    write_source(problems_dir, "a.json", bank(2))
+    write_source(problems_dir, "b.json", bank(2, topic="Friction", prefix="F"))
+    loader = ProblemLoader(problems_dir)
+    problems = bank(2)
+    problems[0]["topic"] = "Friction"
+    write_source(problems_dir, "a.json", problems)
+
+    loader.reload()
+    assert sorted(ids(loader.query(topic="Friction"))) == ["F_0", "F_1", "P_0"]
+    assert ids(loader.query(topic="Projectile Motion")) == ["P_1"]
+    assert_consistent(loader._snapshot)
+
+
+def test_topic_emptied_by_a_reload_is_dropped(problems_dir):
+    write_source(problems_dir, "a.json", bank(2))
+    write_source(problems_dir, "b.json", bank(1, topic="Friction", prefix="F"))
+    loader = ProblemLoader(problems_dir)
+    write_source(problems_dir, "b.json", bank(1, topic="Projectile Motion", prefix="F"))
+
+    loader.reload()
+    assert loader.get_all_topics() == ["Projectile Motion"]
+    assert loader.query(topic="Friction") == []
+
+
+def test_deleted_file_and_readded_file(problems_dir):
+    write_source(problems_dir, "a.json", bank(8))
+    path = write_source(problems_dir, "b.json", bank(2, prefix="B"))
+    loader = ProblemLoader(problems_dir)
+
+    path.unlink()
+    assert loader.reload()["changed_files"] == ["b.json"]
+    assert loader.get_problem_by_id("B_0") is None
+    assert loader.get_total_count() == 8
+    assert loader.get_stats()["files"] == 1
+
+    write_source(problems_dir, "b.json", bank(2, prefix="B"))
+    assert loader.reload()["changed_files"] == ["b.json"]
+    assert loader.get_problem_by_id("B_0")["text"] == "Problem B 0."
+    assert loader.get_total_count() == 10
+    assert_consistent(loader._snapshot)
+
+
+def test_touched_file_is_not_reparsed(problems_dir):
+    problems = bank(2)
+    write_source(problems_dir, "a.json", problems)
+    loader = ProblemLoader(problems_dir)
+    before = loader._snapshot
+
+    write_source(problems_dir, "a.json", problems)  # same content, new mtime
+    assert loader.reload()["changed_files"] == []
+    # Same positions and derived indexes; only the file's mtime was updated
+    assert loader._snapshot.problems == before.problems
+    assert loader._snapshot.search is before.search
+    assert loader._snapshot.tombstones == 0
+
+
+def test_unparseable_edit_keeps_the_previous_contents(problems_dir):
+    write_source(problems_dir, "a.json", bank(2))
+    loader = ProblemLoader(problems_dir)
+    (problems_dir / "a.json").write_text("[{", encoding="utf-8")
+
+    result = loader.reload()
+    assert result["errors"] == 1
+    assert ids(loader.query()) == ["P_0", "P_1"]
+    assert loader.get_stats()["unreadable_files"] == 1
+
+
+def test_compaction_removes_tombstones(problems_dir):
+    write_source(problems_dir, "a.json", bank(30))
+    write_source(problems_dir, "b.json", bank(2, topic="Friction", prefix="B"))
+    loader = ProblemLoader(problems_dir)
+
+    # A changed file's old problems all become tombstones: 2 of 34 positions
+    # stays below COMPACT_RATIO
+    problems = bank(2, topic="Friction", prefix="B")
+    problems[0]["text"] = "Edited."
+    write_source(problems_dir, "b.json", problems)
+    loader.reload()
+    assert loader._snapshot.tombstones == 2
+    assert ids(loader.query()) == [f"P_{i}" for i in range(30)] + ["B_0", "B_1"]
+
+    # Replacing a.json makes it 32 of 64
+    write_source(problems_dir, "a.json", bank(30, prefix="A"))
+    loader.reload()
+    snapshot = loader._snapshot
+    assert snapshot.tombstones == 0
+    assert len(snapshot.problems) == 32
+    # Renumbered in file order
+    assert ids(loader.query()) == [f"A_{i}" for i in range(30)] + ["B_0", "B_1"]
+    assert loader.get_problem_by_id("B_0")["text"] == "Edited."
+    assert_consistent(snapshot)
+
+
+def test_published_snapshot_is_never_modified(problems_dir):
+    write_source(problems_dir, "a.json", bank(4))
+    loader = ProblemLoader(problems_dir)
+    old = loader._snapshot
+    problems = list(old.problems)
+    topic_index = {value: list(positions) for value, positions in old.indexes["topic"].items()}
+
+    moved = bank(4)
+    moved[0]["topic"] = "Friction"
+    write_source(problems_dir, "a.json", moved)
+    loader.reload()
+
+    assert loader._snapshot is not old
+    assert old.problems == problems
+    assert old.indexes["topic"] == topic_index
+    assert_consistent(old)
+
+
+def test_concurrent_readers_see_consistent_snapshots(problems_dir):
+    write_source(problems_dir, "a.json", bank(20))
+    write_source(problems_dir, "b.json", bank(20, topic="Friction", prefix="B"))
+    loader = ProblemLoader(problems_dir)
+    stop = threading.Event()
+    failures = []
+
+    def read():
+        while not stop.is_set():
+            try:
+                # A reader only ever sees whole files: 20 or 40 problems, never a mix
+                friction = loader.query(topic="Friction")
+                assert len(friction) in (20, 40)
+                assert all(problem.topic == "Friction" for problem in friction)
+                total, page, _ = loader.list_page(100)
+                assert total == len(page) == 40
+                assert_consistent(loader._snapshot)
+            except Exception as e:
+                failures.append(e)
+                return
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    try:
+        for round_ in range(30):
+            topic = "Friction" if round_ % 2 else "Projectile Motion"
+            write_source(problems_dir, "a.json", bank(20, topic=topic))
+            loader.reload()
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join()
+    assert failures == []
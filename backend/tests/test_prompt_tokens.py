@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from app.services.ai_tutor import PhysicsAITutor
+from app.services.conversation_window import estimate_tokens
+from app.services.solution_cache import SolutionCache
+
+
+class Response:
+    def __init__(self, text):
+        self.text = text
+        self.usage_metadata = None
+
+
+class StubModel:
+    """generate_content returning a fixed reply, streamed as one chunk"""
+
+    def generate_content(self, prompt, stream=False, request_options=None):
+        return [Response("reply")] if stream else Response("reply")
+
+
+PROBLEM = {"id": "P_1", "text": "A ball is thrown horizontally from a cliff.", "topic": "Projectile Motion",
+           "user_submitted": True}
+
+
+@pytest.fixture
+def tutor():
+    tutor = PhysicsAITutor(model=StubModel(), solution_model=StubModel(), solution_cache=SolutionCache())
+    yield tutor
+    tutor._executor.shutdown(wait=True)
+
+
+def extra_inline_tokens(tutor, call) -> int:
+    """How much more the old inline prompt would have sent for one call"""
+    before = tutor.get_prompt_token_stats()
+    call()
+    after = tutor.get_prompt_token_stats()
+    assert after["calls"] == before["calls"] + 1
+    inline = after["inline_prompt_tokens_est"] - before["inline_prompt_tokens_est"]
+    return inline - (after["sent_prompt_tokens_est"] - before["sent_prompt_tokens_est"])
+
+
+def test_chat_and_hint_calls_count_the_system_prompt_they_used_to_inline(tutor):
+    system = estimate_tokens(tutor.system_prompt)
+    history = [{"role": "user", "content": "Where do I start?"}]
+    assert extra_inline_tokens(tutor, lambda: tutor.get_response(PROBLEM, history, "Where do I start?")) == system
+    assert extra_inline_tokens(tutor, lambda: tutor.get_hint(PROBLEM, history, 1)) == system
+    assert extra_inline_tokens(tutor, lambda: asyncio.run(tutor.aget_hint(PROBLEM, history, 2))) == system
+    assert extra_inline_tokens(tutor, lambda: asyncio.run(tutor.aspeculate_hint(PROBLEM, history, 3))) == system
+
+    async def stream():
+        return [text async for text in tutor.astream_response(PROBLEM, history, "Still stuck")]
+    assert extra_inline_tokens(tutor, lambda: asyncio.run(stream())) == system
+
+
+def test_opening_message_and_solution_never_carried_it(tutor):
+    assert extra_inline_tokens(tutor, lambda: tutor.get_initial_message(PROBLEM)) == 0
+    assert extra_inline_tokens(tutor, lambda: tutor.generate_solution(PROBLEM)) == 0
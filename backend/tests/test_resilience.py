@@ -0,0 +1,154 @@
+import pytest
+
+from app.services import resilience
+from app.services.resilience import CircuitBreaker, CircuitOpenError, call_with_retry
+
+
+class FakeClock:
+    """Stands in for the time module: sleep() only advances monotonic()"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class MaxJitter:
+    """Full jitter always picking the top of the range, so delays are predictable"""
+
+    @staticmethod
+    def uniform(low: float, high: float) -> float:
+        return high
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(resilience, "time", clock)
+    monkeypatch.setattr(resilience, "random", MaxJitter)
+    return clock
+
+
+def fail(breaker: CircuitBreaker, times: int):
+    for _ in range(times):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_circuit_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    fail(breaker, 2)
+    assert breaker.state == CircuitBreaker.CLOSED
+    fail(breaker, 1)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.get_state()["retry_in_seconds"] == 30.0
+    assert breaker.stats == {"successes": 0, "failures": 3, "rejected": 1, "opened": 1}
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    fail(breaker, 2)
+    breaker.before_call()
+    breaker.record_success()
+    fail(breaker, 2)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_lets_one_trial_call_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    fail(breaker, 1)
+    clock.now += 29.9
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now += 0.1
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError, match="trial call in flight"):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_failed_trial_reopens_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    fail(breaker, 5)
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened_at == clock.now
+    assert breaker.stats["opened"] == 2
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+class Flaky:
+    """fn(timeout) failing with the given errors before succeeding"""
+
+    def __init__(self, clock: FakeClock, errors, took: float = 0.0):
+        self.clock = clock
+        self.errors = list(errors)
+        self.took = took
+        self.timeouts = []
+
+    def __call__(self, timeout: float) -> str:
+        self.timeouts.append(timeout)
+        self.clock.now += self.took
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def test_transient_errors_are_retried_with_exponential_backoff(clock):
+    fn = Flaky(clock, [TimeoutError(), ConnectionError(), TimeoutError()])
+    assert call_with_retry(fn, max_retries=3, attempt_timeout=10, deadline=60,
+                           base_delay=0.5, max_delay=4) == "ok"
+    assert clock.sleeps == [0.5, 1.0, 2.0]
+    assert len(fn.timeouts) == 4
+
+
+def test_backoff_is_capped_at_max_delay(clock):
+    fn = Flaky(clock, [TimeoutError()] * 5)
+    call_with_retry(fn, max_retries=5, attempt_timeout=10, deadline=60, base_delay=1, max_delay=3)
+    assert clock.sleeps == [1, 2, 3, 3, 3]
+
+
+def test_gives_up_after_max_retries(clock):
+    fn = Flaky(clock, [TimeoutError()] * 3)
+    with pytest.raises(TimeoutError):
+        call_with_retry(fn, max_retries=2, attempt_timeout=10, deadline=60)
+    assert len(fn.timeouts) == 3
+
+
+def test_other_errors_are_not_retried(clock):
+    fn = Flaky(clock, [ValueError("bad request")])
+    with pytest.raises(ValueError):
+        call_with_retry(fn, max_retries=3, attempt_timeout=10, deadline=60)
+    assert clock.sleeps == []
+
+
+def test_attempt_timeouts_shrink_to_the_remaining_deadline(clock):
+    fn = Flaky(clock, [TimeoutError(), TimeoutError()], took=6)
+    call_with_retry(fn, max_retries=3, attempt_timeout=10, deadline=15, base_delay=0.5, max_delay=4)
+    # 6s + 0.5s backoff leaves 8.5s, then 6s + 1s leaves 1.5s
+    assert fn.timeouts == [10, 8.5, 1.5]
+
+
+def test_no_retry_whose_backoff_would_pass_the_deadline(clock):
+    fn = Flaky(clock, [TimeoutError()] * 3, took=4)
+    with pytest.raises(TimeoutError):
+        call_with_retry(fn, max_retries=5, attempt_timeout=10, deadline=10, base_delay=2, max_delay=8)
+    # 4s + 2s backoff, 4s more: a 4s backoff would end at 14s > 10s
+    assert clock.sleeps == [2]
+    assert len(fn.timeouts) == 2
@@ -0,0 +1,101 @@
+import pytest
+
+from app.services.search_index import SearchIndex, tokenize
+from app.services.utils import ProblemLoader
+from conftest import make_problem, write_source
+
+
+@pytest.mark.parametrize("text, tokens", [
+    ("The velocity of the balls", ["velocity", "ball"]),
+    ("v₀ = 5 ms⁻¹", ["v0", "5", "m/s"]),
+    ("ω and θ", ["omega", "theta"]),
+    ("centre of mass, r²", ["center", "mass", "r^2"]),
+])
+def test_tokenize_normalizes_physics_notation(text, tokens):
+    assert tokenize(text) == tokens
+
+
+@pytest.fixture
+def loader(problems_dir):
+    write_source(problems_dir, "mechanics.json", [
+        make_problem("M_1", "A block slides down a rough incline with friction."),
+        make_problem("M_2", "A ball is thrown from a cliff; find the range of the projectile."),
+        make_problem("M_3", "Friction on a block resting on a rough horizontal surface with friction.",
+                     chapter="Laws of Motion", topic="Friction", difficulty="medium"),
+        make_problem("M_4", "A ring rolls down an incline.", chapter="Rotation", topic="Rolling",
+                     subtopics=["Friction in rolling"], difficulty="hard"),
+        make_problem("M_5", "A block is pulled across a table.", chapter="Laws of Motion",
+                     topic="Friction", difficulty="medium"),
+    ])
+    return ProblemLoader(problems_dir)
+
+
+def ranked(hits):
+    return [summary.id for summary, _ in hits]
+
+
+def test_results_are_ranked_by_bm25_score(loader):
+    total, _, hits, _ = loader.search_page("friction block")
+    assert total == 4
+    # Both terms, friction twice, beats both terms once, which beats one term
+    assert ranked(hits)[:2] == ["M_3", "M_1"]
+    assert set(ranked(hits)[2:]) == {"M_4", "M_5"}
+    scores = [score for _, score in hits]
+    assert scores == sorted(scores, reverse=True)
+    assert all(score > 0 for score in scores)
+
+
+def test_subtopic_matches_outweigh_text_matches(loader):
+    _, _, hits, _ = loader.search_page("friction")
+    # M_4 only mentions friction in a subtopic (weight 2) and has a short text
+    assert ranked(hits).index("M_4") < ranked(hits).index("M_1")
+
+
+def test_query_without_known_terms_matches_nothing(loader):
+    assert loader.search_page("electrostatics") == (0, 0, [], None)
+    assert loader.search_page("the of and") == (0, 0, [], None)
+
+
+def test_filters_restrict_matches_and_total(loader):
+    total, _, hits, _ = loader.search_page("friction block", topic="Friction")
+    assert total == 2
+    assert ranked(hits) == ["M_3", "M_5"]
+
+    total, _, hits, _ = loader.search_page("friction", chapter="Laws of Motion", difficulty="medium")
+    assert total == 1
+    assert ranked(hits) == ["M_3"]
+
+    assert loader.search_page("friction", topic="Waves")[0] == 0
+
+
+def test_unknown_filter_is_rejected(loader):
+    with pytest.raises(ValueError):
+        loader.search_page("friction", colour="red")
+
+
+def test_pages_follow_the_full_ranking(loader):
+    _, _, everything, _ = loader.search_page("friction block incline", limit=10)
+    paged = []
+    for offset in range(0, len(everything), 2):
+        total, page_offset, hits, _ = loader.search_page("friction block incline", limit=2, offset=offset)
+        assert (total, page_offset) == (len(everything), offset)
+        paged.extend(hits)
+    assert paged == everything
+    assert loader.search_page("friction block incline", limit=2, offset=len(everything))[2] == []
+
+
+def test_ties_keep_bank_order():
+    docs = [(position, {"text": "identical text"}) for position in range(5)]
+    index = SearchIndex.build(docs, 5)
+    _, hits = index.search("identical", limit=3, offset=1)
+    assert [position for position, _ in hits] == [1, 2, 3]
+
+
+def test_saved_index_ranks_identically(tmp_path):
+    docs = [(0, {"text": "projectile range"}), (2, {"text": "projectile motion under gravity"})]
+    index = SearchIndex.build(docs, 3, fingerprint="abc")
+    path = tmp_path / "search.npz"
+    index.save(path)
+    loaded = SearchIndex.load(path)
+    assert loaded.fingerprint == "abc"
+    assert loaded.search("projectile range") == index.search("projectile range")
@@ -0,0 +1,78 @@
+import pytest
+
+from app.services import session_store
+from app.services.session_store import SessionStore
+
+
+class FakeClock:
+    """Stands in for the time module"""
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(session_store, "time", clock)
+    return clock
+
+
+def test_session_keeps_its_conversation(clock):
+    store = SessionStore()
+    session = store.create({"id": "P_1"})
+    session.add_message("user", "Is energy conserved?")
+    assert store.get(session.id).conversation_history == [{"role": "user", "content": "Is energy conserved?"}]
+    assert store.get("unknown") is None
+
+
+def test_idle_session_expires_on_access(clock):
+    store = SessionStore(idle_timeout=60)
+    session = store.create({})
+    clock.now += 60
+    assert store.get(session.id) is session
+    clock.now += 61
+    assert store.get(session.id) is None
+    assert store.get_stats() == {"created": 1, "expired": 1, "evicted": 0, "active": 0}
+
+
+def test_access_keeps_a_session_alive(clock):
+    store = SessionStore(idle_timeout=60)
+    session = store.create({})
+    for _ in range(5):
+        clock.now += 50
+        assert store.get(session.id) is session
+
+
+def test_creating_a_session_sweeps_idle_ones(clock):
+    store = SessionStore(idle_timeout=60)
+    stale = [store.create({}) for _ in range(3)]
+    clock.now += 30
+    active = store.create({})
+    clock.now += 40  # the first three are now 70s idle, the fourth 40s
+    store.create({})
+    stats = store.get_stats()
+    assert (stats["expired"], stats["active"]) == (3, 2)
+    assert store.get(active.id) is active
+    assert all(store.get(session.id) is None for session in stale)
+
+
+def test_least_recently_used_session_is_evicted_at_capacity(clock):
+    store = SessionStore(max_sessions=2)
+    first, second = store.create({}), store.create({})
+    store.get(first.id)  # second is now the least recently used
+    third = store.create({})
+    assert store.get(second.id) is None
+    assert store.get(first.id) is first and store.get(third.id) is third
+    assert store.get_stats()["evicted"] == 1
+
+
+def test_deleted_session_is_gone(clock):
+    store = SessionStore()
+    session = store.create({})
+    store.delete(session.id)
+    store.delete(session.id)
+    assert store.get(session.id) is None
@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight, prompt_fingerprint
+
+
+class Gated:
+    """An async call that runs until released, counting its executions"""
+
+    def __init__(self, result="answer"):
+        self.result = result
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+async def settle():
+    """Let every ready task run up to its next wait"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    async def scenario():
+        flight, call = SingleFlight(), Gated()
+        waiters = [asyncio.ensure_future(flight.do("key", call)) for _ in range(5)]
+        await settle()
+        call.release.set()
+        results = await asyncio.gather(*waiters)
+        return flight, call, results
+
+    flight, call, results = asyncio.run(scenario())
+    assert results == ["answer"] * 5
+    assert call.calls == 1
+    assert flight.get_stats() == {"calls": 5, "executions": 1, "deduplicated": 4, "in_flight": 0}
+
+
+def test_different_keys_are_not_coalesced():
+    async def scenario():
+        flight, first, second = SingleFlight(), Gated("a"), Gated("b")
+        waiters = [asyncio.ensure_future(flight.do("a", first)),
+                   asyncio.ensure_future(flight.do("b", second))]
+        await settle()
+        first.release.set()
+        second.release.set()
+        return await asyncio.gather(*waiters), first.calls + second.calls
+
+    assert asyncio.run(scenario()) == (["a", "b"], 2)
+
+
+def test_exception_reaches_every_joiner():
+    async def scenario():
+        flight, call = SingleFlight(), Gated(ValueError("quota"))
+        waiters = [asyncio.ensure_future(flight.do("key", call)) for _ in range(3)]
+        await settle()
+        call.release.set()
+        return flight, call, await asyncio.gather(*waiters, return_exceptions=True)
+
+    flight, call, results = asyncio.run(scenario())
+    assert call.calls == 1
+    assert [str(result) for result in results] == ["quota"] * 3
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.get_stats()["in_flight"] == 0
+
+
+def test_finished_call_is_not_reused():
+    async def scenario():
+        flight, call = SingleFlight(), Gated()
+        call.release.set()
+        await flight.do("key", call)
+        await flight.do("key", call)
+        return call.calls
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    async def scenario():
+        flight, call = SingleFlight(), Gated()
+        leaver = asyncio.ensure_future(flight.do("key", call))
+        stayer = asyncio.ensure_future(flight.do("key", call))
+        await settle()
+        leaver.cancel()
+        await settle()
+        call.release.set()
+        return leaver.cancelled(), await stayer, call.calls
+
+    assert asyncio.run(scenario()) == (True, "answer", 1)
+
+
+def test_streaming_leader_releases_joiners():
+    async def scenario():
+        flight = SingleFlight()
+        assert flight.join("key") is None
+        result = flight.lead("key")
+        joiners = [asyncio.ensure_future(flight.join("key")) for _ in range(2)]
+        await settle()
+        result.set_result("streamed")
+        return await asyncio.gather(*joiners), flight.get_stats()
+
+    results, stats = asyncio.run(scenario())
+    assert results == ["streamed", "streamed"]
+    assert stats == {"calls": 3, "executions": 1, "deduplicated": 2, "in_flight": 0}
+
+
+def test_failed_stream_raises_in_joiners():
+    async def scenario():
+        flight = SingleFlight()
+        result = flight.lead("key")
+        joiner = asyncio.ensure_future(flight.join("key"))
+        await settle()
+        result.set_exception(RuntimeError("stream abandoned"))
+        with pytest.raises(RuntimeError, match="stream abandoned"):
+            await joiner
+
+    asyncio.run(scenario())
+
+
+def test_prompt_fingerprint_is_exact():
+    assert prompt_fingerprint("Explain torque.") == prompt_fingerprint("Explain torque.")
+    assert prompt_fingerprint("Explain torque.") != prompt_fingerprint("Explain torque. ")
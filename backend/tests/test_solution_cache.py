@@ -0,0 +1,119 @@
+import pytest
+
+from app.services import solution_cache
+from app.services.solution_cache import SolutionCache, solution_cache_key
+
+
+class FakeClock:
+    """Stands in for the time module"""
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(solution_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "cache" / "solutions.db"
+
+
+def test_key_ignores_case_whitespace_and_option_order():
+    problem = {"text": "A ball  is thrown.\n", "topic": "Projectile Motion",
+               "options": [{"id": "a", "text": "10 m"}, {"id": "b", "text": "20 m"}]}
+    pasted = {"text": "a ball is THROWN.", "topic": "projectile motion",
+              "options": [{"id": "b", "text": "20 m"}, {"id": "a", "text": "10  m"}]}
+    assert solution_cache_key(problem) == solution_cache_key(pasted)
+    assert solution_cache_key(problem) != solution_cache_key({**problem, "topic": "Kinematics"})
+
+
+def test_memory_tier_evicts_least_recently_used(clock):
+    cache = SolutionCache(memory_size=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"  # b is now the least recently used
+    cache.put("c", "C")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("A", "C")
+    stats = cache.get_stats()
+    assert (stats["memory_entries"], stats["evictions"], stats["misses"]) == (2, 1, 1)
+
+
+def test_entries_expire_after_the_ttl(clock, db_path):
+    cache = SolutionCache(db_path, ttl_seconds=60)
+    cache.put("a", "A")
+    clock.now += 60
+    assert cache.get("a") == "A"
+    clock.now += 1
+    assert cache.get("a") is None
+    # The expired row is gone from disk too, not just skipped
+    assert cache.get_stats()["disk_entries"] == 0
+
+
+def test_disk_tier_survives_a_restart(clock, db_path):
+    SolutionCache(db_path).put("a", "A")
+    reopened = SolutionCache(db_path)
+    assert reopened.get("a") == "A"
+    assert reopened.get("a") == "A"
+    stats = reopened.get_stats()
+    assert (stats["disk_hits"], stats["memory_hits"]) == (1, 1)
+
+
+def test_disk_tier_evicts_least_recently_accessed(clock, db_path):
+    cache = SolutionCache(db_path, memory_size=1, disk_size=2)
+    cache.put("a", "A")
+    clock.now += 1
+    cache.put("b", "B")
+    clock.now += 1
+    assert cache.get("a") == "A"  # read from disk: a was accessed after b
+    clock.now += 1
+    cache.put("c", "C")
+
+    reopened = SolutionCache(db_path)
+    assert reopened.get_stats()["disk_entries"] == 2
+    assert reopened.get("b") is None
+    assert (reopened.get("a"), reopened.get("c")) == ("A", "C")
+
+
+def test_expired_rows_are_purged_before_lru_eviction(clock, db_path):
+    cache = SolutionCache(db_path, memory_size=1, disk_size=2, ttl_seconds=60)
+    cache.put("old", "OLD")
+    clock.now += 30
+    cache.put("a", "A")
+    clock.now += 31
+    cache.put("b", "B")  # "old" has expired, so nothing live is evicted
+
+    assert cache.get_stats()["disk_entries"] == 2
+    assert (cache.get("a"), cache.get("b")) == ("A", "B")
+
+
+def test_replacing_an_entry_does_not_grow_the_disk_count(clock, db_path):
+    cache = SolutionCache(db_path, disk_size=5)
+    cache.put("a", "first")
+    cache.put("a", "second")
+    assert cache.get("a") == "second"
+    assert cache.get_stats()["disk_entries"] == 1
+
+
+def test_disk_limit_holds_across_workers_sharing_the_file(clock, db_path):
+    first = SolutionCache(db_path, memory_size=1, disk_size=3)
+    second = SolutionCache(db_path, memory_size=1, disk_size=3)
+    for i in range(4):
+        clock.now += 1
+        first.put(f"first-{i}", "A")
+        clock.now += 1
+        second.put(f"second-{i}", "B")
+
+    assert first.get_stats()["disk_entries"] == second.get_stats()["disk_entries"] == 3
+    reopened = SolutionCache(db_path, memory_size=1)
+    # The three most recent writes, whichever worker made them
+    assert [reopened.get(key) for key in ("second-2", "first-3", "second-3")] == ["B", "A", "B"]
+    assert reopened.get("first-2") is None
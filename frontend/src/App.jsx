@@ -6,6 +6,7 @@ import './App.css'
 
 function App() {
   const [currentProblem, setCurrentProblem] = useState(null)
+  const [sessionId, setSessionId] = useState(null)
   const [conversationHistory, setConversationHistory] = useState([])
   const [hintLevel, setHintLevel] = useState(0)
   const [showSolution, setShowSolution] = useState(false)
@@ -33,8 +34,9 @@ function App() {
     try {
       const response = await tutorApi.submitQuestion(questionData)
 
-      // Set the problem
+      // Set the problem and the server-side session it belongs to
       setCurrentProblem(response.problem)
+      setSessionId(response.session_id)
 
       // Initialize conversation with AI's first message
       setConversationHistory([
@@ -69,14 +71,15 @@ function App() {
     setIsLoading(true)
 
     try {
-      // Get AI response
-      const response = await tutorApi.chat(currentProblem, newHistory, message)
-
-      // Add AI response to conversation
-      setConversationHistory([
-        ...newHistory,
-        { role: 'assistant', content: response.response }
-      ])
+      // Stream AI response into the conversation as it is generated
+      let streamed = ''
+      await tutorApi.streamChat(sessionId, message, (chunk) => {
+        streamed += chunk
+        setConversationHistory([
+          ...newHistory,
+          { role: 'assistant', content: streamed }
+        ])
+      })
     } catch (error) {
       console.error('Error getting AI response:', error)
       setConversationHistory([
@@ -95,13 +98,16 @@ function App() {
     setIsLoading(true)
 
     try {
-      const response = await tutorApi.getHint(currentProblem, conversationHistory, newHintLevel)
+      let streamed = ''
+      await tutorApi.streamHint(sessionId, newHintLevel, (chunk) => {
+        streamed += chunk
+        setConversationHistory([
+          ...conversationHistory,
+          { role: 'assistant', content: streamed }
+        ])
+      })
 
       setHintLevel(newHintLevel)
-      setConversationHistory([
-        ...conversationHistory,
-        { role: 'assistant', content: response.hint }
-      ])
 
       if (newHintLevel >= 3) {
         setConversationHistory(prev => [
@@ -122,8 +128,12 @@ function App() {
 
     setIsLoading(true)
     try {
-      const response = await tutorApi.getSolution(currentProblem)
-      setShowSolution(response)
+      let streamed = ''
+      const metadata = await tutorApi.streamSolution(sessionId, (chunk) => {
+        streamed += chunk
+        setShowSolution({ type: 'ai_generated', solution: streamed })
+      })
+      setShowSolution(metadata.type === 'official' ? metadata : { ...metadata, solution: streamed })
     } catch (error) {
       console.error('Error getting solution:', error)
       alert('Failed to get solution. Please try again.')
@@ -134,6 +144,7 @@ function App() {
 
   const handleReset = () => {
     setCurrentProblem(null)
+    setSessionId(null)
     setConversationHistory([])
     setHintLevel(0)
     setShowSolution(false)
@@ -34,6 +34,47 @@ api.interceptors.response.use(
   }
 );
 
+// POST to a Server-Sent Events endpoint, calling onChunk with each text
+// chunk as it arrives. Resolves with the metadata of the final `done` event.
+const streamEvents = async (path, body, onChunk) => {
+  const response = await fetch(`${API_BASE_URL}${path}`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body),
+  });
+  if (!response.ok) {
+    throw new Error(`Stream request failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let metadata = null;
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = 'message';
+      let data = '';
+      for (const line of rawEvent.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      const payload = JSON.parse(data);
+      if (event === 'chunk') onChunk(payload.text);
+      else if (event === 'done') metadata = payload;
+    }
+  }
+  return metadata;
+};
+
 export const tutorApi = {
   // Health check
   healthCheck: async () => {
@@ -70,33 +111,47 @@ export const tutorApi = {
     return response.data;
   },
 
-  // Chat with AI
-  chat: async (problem, conversationHistory, userMessage) => {
+  // Chat with AI - the server keeps the problem and history for the session
+  chat: async (sessionId, userMessage) => {
     const response = await api.post('/api/chat', {
-      problem,
-      conversation_history: conversationHistory,
+      session_id: sessionId,
       user_message: userMessage,
     });
     return response.data;
   },
 
   // Get hint
-  getHint: async (problem, conversationHistory, hintLevel) => {
+  getHint: async (sessionId, hintLevel) => {
     const response = await api.post('/api/hint', {
-      problem,
-      conversation_history: conversationHistory,
+      session_id: sessionId,
       hint_level: hintLevel,
     });
     return response.data;
   },
 
   // Get solution
-  getSolution: async (problem) => {
+  getSolution: async (sessionId) => {
     const response = await api.post('/api/solution', {
-      problem,
+      session_id: sessionId,
     });
     return response.data;
   },
+
+  // Streaming variants - onChunk receives text as the model produces it
+  streamChat: (sessionId, userMessage, onChunk) =>
+    streamEvents('/api/chat/stream', {
+      session_id: sessionId,
+      user_message: userMessage,
+    }, onChunk),
+
+  streamHint: (sessionId, hintLevel, onChunk) =>
+    streamEvents('/api/hint/stream', {
+      session_id: sessionId,
+      hint_level: hintLevel,
+    }, onChunk),
+
+  streamSolution: (sessionId, onChunk) =>
+    streamEvents('/api/solution/stream', { session_id: sessionId }, onChunk),
 };
 
 export default tutorApi;
@@ -0,0 +1,139 @@
+"""Benchmark validated ProblemSummary records against plain problem dicts.
+
+Generates synthetic problems shaped like backend/data/template.json and
+compares, for the resident summary fields: retained memory, validation and
+construction time, and field access in the loops the loader's indexes and
+filters run.
+
+Usage (from project root):
+    python scripts/benchmark_problem_models.py
+    python scripts/benchmark_problem_models.py --problems 20000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, os.path.abspath(BACKEND_DIR))
+
+from app.models.problem import HEAVY_FIELDS, validate_problem  # noqa: E402
+
+CHAPTERS = {
+    "Laws of Motion": ["Newton's Laws", "Friction", "Circular Motion"],
+    "Work, Energy and Power": ["Work-Energy Theorem", "Power", "Collisions"],
+    "Rotational Motion": ["Moment of Inertia", "Torque", "Rolling Motion"],
+    "System of Particles": ["Center of Mass", "Momentum Conservation"],
+}
+SUBTOPICS = ["Kinematics", "Resistance Forces", "Energy Conservation", "Angular Momentum",
+             "Impulse", "Pulleys", "Springs", "Inclined Plane"]
+CONCEPTS = ["Newton's Second Law", "Conservation of Energy", "Parallel Axis Theorem",
+            "Equations of Motion (v² = u² + 2as)", "Unit conversion"]
+
+
+def synthetic_problems(count: int, seed: int = 7):
+    """Problems as json.load would return them (fresh strings, like separate files)"""
+    rng = random.Random(seed)
+    problems = []
+    for i in range(count):
+        chapter = rng.choice(list(CHAPTERS))
+        problem = {
+            "id": f"JEE_{2005 + i % 20}_MAIN_SYN_Q{i}",
+            "year": 2005 + i % 20,
+            "exam": rng.choice(["JEE Main", "JEE Advanced"]),
+            "date": f"{rng.randint(1, 28)} April {rng.choice(['I', 'II'])}",
+            "chapter": chapter,
+            "topic": rng.choice(CHAPTERS[chapter]),
+            "subtopics": rng.sample(SUBTOPICS, 3),
+            "text": f"A block of mass {rng.randint(1, 20)} kg slides {rng.randint(1, 9)} m "
+                    f"down a rough incline of angle {rng.choice([30, 37, 45, 53])}°. Find its speed.",
+            "type": "objective_single_correct",
+            "options": [{"id": label, "text": f"{rng.randint(1, 30)} m/s"} for label in "abcd"],
+            "correct_answer": rng.choice("abcd"),
+            "numerical_answer": round(rng.uniform(0, 30), 2),
+            "units": "m/s",
+            "difficulty": rng.choice(["easy", "medium", "hard"]),
+            "marks": 4,
+            "concepts_required": rng.sample(CONCEPTS, 2),
+            "formulas_used": ["F = ma", "v² = u² + 2as"],
+            "tags": ["kinematics", "friction"],
+            "has_diagram": False,
+            "diagram_essential": False,
+            "official_solution": {"steps": [{"step_number": 1, "description": "..."}]},
+            "metadata": {"source": "synthetic"},
+        }
+        # Round-trip so no two problems share string objects, as with real files
+        problems.append(json.loads(json.dumps(problem)))
+    return problems
+
+
+def retained(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def timed(label, fn, repeat=3):
+    best = min(_run(fn) for _ in range(repeat))
+    print(f"  {label:<34} {best * 1000:8.1f} ms")
+    return best
+
+
+def _run(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--problems", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"Generating {args.problems} synthetic problems...")
+    raw = synthetic_problems(args.problems)
+
+    dicts, dict_bytes = retained(
+        lambda: [{k: v for k, v in json.loads(json.dumps(p)).items() if k not in HEAVY_FIELDS} for p in raw])
+    records, record_bytes = retained(
+        lambda: [validate_problem(json.loads(json.dumps(p)), "synthetic.json", i)[0][0]
+                 for i, p in enumerate(raw)])
+
+    print(f"\nResident summaries ({args.problems} problems)")
+    print(f"  {'dicts':<34} {dict_bytes / 2 ** 20:8.1f} MiB")
+    print(f"  {'ProblemSummary records':<34} {record_bytes / 2 ** 20:8.1f} MiB "
+          f"({100 * (1 - record_bytes / dict_bytes):.0f}% less)")
+
+    print("\nLoad")
+    timed("split into summary dicts", lambda: [{k: v for k, v in p.items() if k not in HEAVY_FIELDS}
+                                                for p in raw])
+    timed("validate into records", lambda: [validate_problem(p, "synthetic.json", i) for i, p in enumerate(raw)])
+
+    print("\nField access (chapter/topic/difficulty/year of every problem)")
+    timed("dict['field']", lambda: [(p['chapter'], p['topic'], p['difficulty'], p['year']) for p in dicts])
+    timed("dict.get('field')", lambda: [(p.get('chapter'), p.get('topic'), p.get('difficulty'), p.get('year'))
+                                        for p in dicts])
+    timed("record.field", lambda: [(p.chapter, p.topic, p.difficulty, p.year) for p in records])
+    timed("record.get('field')", lambda: [(p.get('chapter'), p.get('topic'), p.get('difficulty'),
+                                           p.get('year')) for p in records])
+    timed("filter topic == ... (dicts)", lambda: [p for p in dicts if p['topic'] == "Friction"])
+    timed("filter topic is ... (interned records)",
+          lambda: [p for p in records if p.topic is sys.intern("Friction")])
+
+    invalid = dict(raw[0], year="2019", options=[{"id": "a"}], correct_answer="e")
+    del invalid["text"]
+    _, issues = validate_problem(invalid, "synthetic.json", 0)
+    print("\nSample validation report")
+    for issue in issues:
+        print(f"  {issue}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Benchmark memory and startup cost per Streamlit session: per-session vs shared resources.
+
+Before, app.py built a ProblemLoader and a PhysicsAITutor in every
+browser session's st.session_state; now both are process-wide
+(st.cache_resource) and a session only holds its conversation. This
+replays both layouts without a Streamlit server: N sessions are opened
+one after another against a synthetic bank, and the time and retained
+memory each additional session adds are reported, then extrapolated to
+--project-sessions students. Times are taken under tracemalloc, so
+compare them between layouts rather than reading them as load times.
+
+No Gemini requests are made; constructing the tutor only configures the
+client (a placeholder GOOGLE_API_KEY is used if none is set).
+
+Usage (from project root):
+    python scripts/benchmark_streamlit_sessions.py
+    python scripts/benchmark_streamlit_sessions.py --problems 20000 --sessions 5
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.abspath(os.path.join(SCRIPTS_DIR, ".."))
+BACKEND_DIR = os.path.join(PROJECT_DIR, "backend")
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(1, PROJECT_DIR)
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-placeholder")
+
+from ai_tutor import PhysicsAITutor  # noqa: E402
+from app.services.utils import ProblemLoader  # noqa: E402
+from benchmark_problem_models import synthetic_problems  # noqa: E402
+
+
+def write_bank(directory: str, count: int, shard_size: int = 2000):
+    problems = synthetic_problems(count)
+    for start in range(0, count, shard_size):
+        path = os.path.join(directory, f"synthetic_{start // shard_size:04d}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(problems[start:start + shard_size], f)
+
+
+def new_conversation() -> dict:
+    """What a session keeps once the loader and tutor are shared"""
+    return {"selected_problem": None, "show_solution": False, "chat_messages": [],
+            "hint_level": 0, "user_question": None, "question_submitted": False}
+
+
+def per_session(problems_dir: str):
+    """The old layout: every session loads its own bank and tutor"""
+    def open_session():
+        state = new_conversation()
+        state["problem_loader"] = ProblemLoader(problems_dir)
+        state["ai_tutor"] = PhysicsAITutor()
+        return state
+    return open_session
+
+
+def shared(problems_dir: str):
+    """The new layout: one loader and tutor per process"""
+    resources = {}
+
+    def open_session():
+        if not resources:
+            resources["problem_loader"] = ProblemLoader(problems_dir)
+            resources["ai_tutor"] = PhysicsAITutor()
+        return new_conversation()
+    return open_session
+
+
+def measure(open_session, sessions: int):
+    """(seconds, retained bytes) for each session opened in turn"""
+    results = []
+    kept = []
+    gc.collect()
+    tracemalloc.start()
+    for _ in range(sessions):
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        kept.append(open_session())
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        results.append((elapsed, tracemalloc.get_traced_memory()[0] - before))
+    tracemalloc.stop()
+    return results
+
+
+def report(label: str, results, project: int):
+    first_seconds, first_bytes = results[0]
+    extra = results[1:]
+    extra_seconds = sum(seconds for seconds, _ in extra) / max(1, len(extra))
+    extra_bytes = sum(size for _, size in extra) / max(1, len(extra))
+    total_bytes = first_bytes + extra_bytes * (project - 1)
+    print(f"\n{label}")
+    print(f"  first session        {first_seconds * 1000:10.1f} ms {first_bytes / 2 ** 20:10.2f} MiB")
+    print(f"  each extra session   {extra_seconds * 1000:10.1f} ms {extra_bytes / 2 ** 20:10.2f} MiB")
+    print(f"  {project} sessions (projected) {total_bytes / 2 ** 20:13.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--problems", type=int, default=10000)
+    parser.add_argument("--sessions", type=int, default=5, help="sessions actually opened per layout")
+    parser.add_argument("--project-sessions", type=int, default=200,
+                        help="concurrent sessions to extrapolate memory to")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as problems_dir:
+        print(f"Writing {args.problems} synthetic problems...")
+        write_bank(problems_dir, args.problems)
+        print(f"Opening {args.sessions} sessions per layout (memory traced with tracemalloc)...")
+        report("Per-session loader and tutor (old app.py)",
+               measure(per_session(problems_dir), args.sessions), args.project_sessions)
+        report("Shared loader and tutor (st.cache_resource)",
+               measure(shared(problems_dir), args.sessions), args.project_sessions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Compile the JSON problem files into the SQLite problem bank the backend loads.
+
+The backend falls back to the JSON files when the compiled bank is missing
+or older than the sources, so run this after editing backend/data/problems
+(the Render build runs it on every deploy). Problems that do not match the
+template.json schema are listed and left out, and the build exits with an
+error unless --allow-invalid is given.
+
+Usage (from project root):
+    python scripts/build_problem_bank.py
+    python scripts/build_problem_bank.py --compare   # load time / memory, JSON vs compiled
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, os.path.abspath(BACKEND_DIR))
+
+from app.core import config  # noqa: E402
+from app.services.problem_bank import compile_problem_bank  # noqa: E402
+from app.services.utils import ProblemLoader  # noqa: E402
+
+
+def measure_load(problems_dir: str, bank_path: str = None):
+    tracemalloc.start()
+    start = time.perf_counter()
+    loader = ProblemLoader(problems_dir, bank_path=bank_path)
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return loader, elapsed, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--problems-dir", default=os.path.join(BACKEND_DIR, "data", "problems"))
+    parser.add_argument("--output", default=config.PROBLEM_BANK_PATH)
+    parser.add_argument("--compare", action="store_true",
+                        help="also compare loading from JSON and from the compiled bank")
+    parser.add_argument("--allow-invalid", action="store_true",
+                        help="exit successfully even if some problems were left out as invalid")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = compile_problem_bank(args.problems_dir, args.output)
+    print(f"Compiled {result['problems']} problems into {result['path']} "
+          f"({result['bytes'] / 1024:.1f} KiB) in {time.perf_counter() - start:.2f}s")
+    if result['issues']:
+        print(f"\nLeft out because of {len(result['issues'])} schema issues:")
+        for issue in result['issues']:
+            print(f"  {issue}")
+
+    if args.compare:
+        for label, bank_path in (("json", None), ("compiled", args.output)):
+            loader, elapsed, retained = measure_load(args.problems_dir, bank_path)
+            print(f"{label:>9}: source={loader.source} problems={loader.get_total_count()} "
+                  f"load={elapsed * 1000:.1f}ms resident={retained / 1024:.1f} KiB")
+
+    if result['issues'] and not args.allow_invalid:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Import problems from JSON files, JSONL dumps or directories into the problem bank.
+
+Problems are validated against backend/data/template.json on a process
+pool; invalid ones, ids already used by a different problem and
+near-verbatim copies of existing problems are reported and left out.
+Problems without an id get a stable, content-derived one. Accepted
+problems are appended to per-chapter shards in backend/data/problems and
+the compiled bank and its indexes are rewritten in the same pass.
+
+Usage (from project root):
+    python scripts/ingest_problems.py dumps/2024_main.jsonl new_questions/
+    python scripts/ingest_problems.py dumps/ --dry-run --report issues.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, os.path.abspath(BACKEND_DIR))
+
+from app.core import config  # noqa: E402
+from app.services.problem_ingest import SHARD_SIZE, ingest_problems  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help=".json / .jsonl files or directories of them")
+    parser.add_argument("--problems-dir", default=os.path.join(BACKEND_DIR, "data", "problems"))
+    parser.add_argument("--bank", default=config.PROBLEM_BANK_PATH)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    parser.add_argument("--threshold", type=float, default=config.DUPLICATE_MATCH_THRESHOLD,
+                        help="text similarity from which a problem counts as a near-duplicate")
+    parser.add_argument("--allow-near-duplicates", action="store_true")
+    parser.add_argument("--dry-run", action="store_true", help="validate and report without writing anything")
+    parser.add_argument("--report", help="write every rejected problem to this JSONL file")
+    args = parser.parse_args()
+
+    try:
+        result = ingest_problems(
+            args.inputs, args.problems_dir, args.bank, workers=args.workers, shard_size=args.shard_size,
+            duplicate_threshold=args.threshold, check_near_duplicates=not args.allow_near_duplicates,
+            dry_run=args.dry_run,
+        )
+    except FileNotFoundError as e:
+        sys.exit(str(e))
+
+    timings = result["timings"]
+    print(f"Read {result['read']} problems from {result['inputs']} inputs "
+          f"(+{result['existing']} already in the bank) with {result['workers']} workers")
+    print(f"  accepted {result['accepted']}, invalid {result['invalid']}, "
+          f"duplicate ids {result['duplicate_ids']}, near-duplicates {result['near_duplicates']}, "
+          f"already imported {result['unchanged']} ({result['generated_ids']} ids generated)")
+    shards = result["shards"]
+    if shards:
+        print(f"  {'would append' if args.dry_run else 'appended'} {sum(shards.values())} problems "
+              f"to {len(shards)} shard files: {', '.join(sorted(shards)[:5])}{', ...' if len(shards) > 5 else ''}")
+    if result["bank"]:
+        print(f"  bank: {result['bank']['problems']} problems, {result['bank']['bytes'] / 2 ** 20:.1f} MiB "
+              f"-> {result['bank']['path']}")
+    print(f"validate {timings['validate_seconds']}s, dedup {timings['dedup_seconds']}s, "
+          f"shards {timings['write_shards_seconds']}s, bank {timings['write_bank_seconds']}s; "
+          f"total {timings['total_seconds']}s ({result['problems_per_second']} problems/s)")
+
+    issues = result["issues"]
+    if issues:
+        print(f"\n{len(issues)} issues{' (first 20)' if len(issues) > 20 else ''}:")
+        for issue in issues[:20]:
+            print(f"  {issue}")
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            for issue in issues:
+                f.write(json.dumps(issue.to_dict(), ensure_ascii=False) + "\n")
+        print(f"\nFull report: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Extract and cache the NCERT textbook passages the tutor retrieves into chat prompts.
+
+The backend does the same in the background at startup; running this ahead
+of time (the Render build does) means the passages are available straight
+away. Only PDFs whose content changed since the last run are re-extracted.
+
+Usage (from project root):
+    python scripts/ingest_textbooks.py
+    python scripts/ingest_textbooks.py --query "tension in a string over a pulley"
+"""
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, os.path.abspath(BACKEND_DIR))
+
+from app.core import config  # noqa: E402
+from app.services.textbooks import TextbookLibrary  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--textbooks-dir", default=config.TEXTBOOKS_DIR)
+    parser.add_argument("--cache-dir", default=config.TEXTBOOK_CACHE_DIR)
+    parser.add_argument("--workers", type=int, default=config.TEXTBOOK_INGEST_WORKERS)
+    parser.add_argument("--query", help="show the passages retrieved for this text")
+    args = parser.parse_args()
+
+    library = TextbookLibrary(args.textbooks_dir, args.cache_dir, max_workers=args.workers)
+    library.ingest()
+    stats = library.get_stats()
+    if stats["error"]:
+        sys.exit(f"Ingestion failed: {stats['error']}")
+    print(f"{stats['chunks']} passages from {stats['files']} files "
+          f"({stats['extracted']} extracted, {stats['cached']} from cache) in {stats['ingest_seconds']}s")
+
+    if args.query:
+        start = time.perf_counter()
+        passages = library.retrieve(args.query, config.TEXTBOOK_CONTEXT_TOKEN_BUDGET)
+        print(f"Retrieved {len(passages)} passages in {(time.perf_counter() - start) * 1000:.2f}ms")
+        for passage in passages:
+            print(f"\n[{passage['source']}, p. {passage['page']}]\n{passage['text'][:300]}...")
+
+
+if __name__ == "__main__":
+    main()
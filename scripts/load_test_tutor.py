@@ -0,0 +1,121 @@
+"""Load test for the FastAPI tutor endpoints against a stubbed Gemini model.
+
+Fires batches of concurrent /api/chat requests at the app in-process and
+reports throughput, so you can check that one worker keeps many tutoring
+conversations in flight instead of serving them one at a time.
+
+Every request sends a different message by default, so each one is a
+real model call and the figures measure the tutor's pool. With
+--identical all requests send the same prompt and concurrent ones are
+coalesced by single-flight; the report shows real and coalesced calls
+separately either way.
+
+Needs httpx from backend/requirements-dev.txt.
+
+Usage (from project root):
+    python scripts/load_test_tutor.py --latency 0.5 --requests 64
+    python scripts/load_test_tutor.py --pool 1 --identical
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import httpx
+
+# All load-test traffic comes from one client - lift the per-client rate limit
+os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "1000000")
+os.environ.setdefault("RATE_LIMIT_BURST", "1000000")
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, os.path.abspath(BACKEND_DIR))
+
+import main  # noqa: E402
+from app.services.ai_tutor import PhysicsAITutor  # noqa: E402
+from app.services.solution_cache import SolutionCache  # noqa: E402
+
+
+class StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubModel:
+    """Stands in for genai.GenerativeModel with a fixed blocking latency"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return StubResponse("What is the problem asking you to find?")
+
+
+CHAT_PAYLOAD = {
+    "problem": {"text": "A ball is thrown from a 45m cliff at 20 m/s horizontally. Find the range.",
+                "topic": "Projectile Motion"},
+    "conversation_history": [{"role": "assistant", "content": "What is the problem asking you to find?"}],
+    "user_message": "The range of the projectile",
+}
+
+
+def chat_payload(request_number: int, identical: bool) -> dict:
+    if identical:
+        return CHAT_PAYLOAD
+    # A different message per request, so single-flight has nothing to merge
+    return {**CHAT_PAYLOAD, "user_message": f"{CHAT_PAYLOAD['user_message']} (attempt {request_number})"}
+
+
+async def run_batch(client: httpx.AsyncClient, total: int, concurrency: int, identical: bool) -> float:
+    """Send `total` chat requests with at most `concurrency` open at once"""
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(request_number: int):
+        async with gate:
+            response = await client.post("/api/chat", json=chat_payload(request_number, identical))
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return time.perf_counter() - start
+
+
+async def main_async(args):
+    model = StubModel(args.latency)
+    main.ai_tutor = PhysicsAITutor(model=model,
+                                   max_concurrency=args.pool,
+                                   solution_cache=SolutionCache())
+    transport = httpx.ASGITransport(app=main.app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+        print(f"stub latency {args.latency:.2f}s, pool size {args.pool}, {args.requests} requests per run, "
+              f"{'identical' if args.identical else 'distinct'} prompts")
+        print(f"{'concurrency':>12} {'elapsed (s)':>12} {'req/s':>10} {'real calls':>11} {'coalesced':>10} "
+              f"{'calls/s':>9}")
+        for concurrency in args.levels:
+            calls_before = model.calls
+            elapsed = await run_batch(client, args.requests, concurrency, args.identical)
+            real = model.calls - calls_before
+            print(f"{concurrency:>12} {elapsed:>12.2f} {args.requests / elapsed:>10.1f} {real:>11} "
+                  f"{args.requests - real:>10} {real / elapsed:>9.1f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="Stubbed Gemini latency in seconds")
+    parser.add_argument("--requests", type=int, default=64, help="Requests per concurrency level")
+    parser.add_argument("--pool", type=int, default=32, help="Tutor max concurrency")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--identical", action="store_true",
+                        help="Send the same prompt every time (measures single-flight coalescing)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main_async(parse_args()))